@@ -1,13 +1,27 @@
 import unittest
 import pytest
 import os
+import json
+import gzip
+import sys
+import subprocess
+from contextlib import redirect_stdout
+from io import StringIO
 from datetime import datetime
 from tkinter import Tk
 from memory_profiler import profile
 import timeit
-from animal_manager import Dog
+from animal_manager import Dog, Cat, AnimalStore, SPECIES_BY_NAME, SPECIES_NAMES, parse_timestamp, format_timestamp
 from data_manager import DataManager
+from storage import SqliteStorage
+from sorted_view import SortedViewCache, animal_column_keys, adoption_column_keys, animal_row_key, adoption_row_key, row_order
+from query import AnimalQuery, AdoptionQuery, ResultPages, SearchCancelled
+from live_search import LiveSearch
 from main import ShelterApp
+import cli
+import benchmark
+from decorators import instrumentation
+from csv_import import parse_animal_row, parse_csv_rows, parse_csv_parallel
 
 class TestAll(unittest.TestCase):
     def setUp(self):
@@ -23,6 +37,13 @@ class TestAll(unittest.TestCase):
             os.remove("test_zwierzeta.json")
         if os.path.exists("test_adopcje.json"):
             os.remove("test_adopcje.json")
+        for filename in ("test_zwierzeta.json", "test_adopcje.json"):
+            for suffix in (".journal", ".bak", ".tmp", ".corrupt", ".bak.corrupt", ".journal.corrupt"):
+                if os.path.exists(filename + suffix):
+                    os.remove(filename + suffix)
+        for filename in ("test_schronisko.db", "test_zwierzeta.bin"):
+            if os.path.exists(filename):
+                os.remove(filename)
         self.root.destroy()
 
     # === Testy jednostkowe ===
@@ -36,6 +57,49 @@ class TestAll(unittest.TestCase):
         animal.last_fed = "invalid_date"
         self.assertEqual(animal.get_feeding_status(), "Nieprawidłowy format daty")
 
+    # Testuje przechowywanie dat jako liczb sekund i ich formatowanie przy odczycie
+    def test_timestamps(self):
+        self.assertEqual(format_timestamp(parse_timestamp("2025-06-20 02:00:00")), "2025-06-20 02:00:00")
+        self.assertEqual(parse_timestamp("2025-6-2 2:0:0"), parse_timestamp("2025-06-02 02:00:00"))
+        self.assertRaises(ValueError, parse_timestamp, "2025-02-30 00:00:00")
+        animal = Dog("1", "Reksio", 5)
+        animal.last_fed = "2025-06-20 02:00:00"
+        self.assertEqual(animal.last_fed_ts, parse_timestamp("2025-06-20 02:00:00"))
+        self.assertEqual(animal.get_feeding_status(animal.last_fed_ts + 5 * 3600), "5 godziny temu")
+
+    # Testuje kolumnowy magazyn zwierząt: odczyt gatunku i atrybutów, kolejność ID i usuwanie
+    def test_animal_store_columns(self):
+        store = AnimalStore()
+        cat = Cat("10", "Mruczek", 3)
+        cat.is_vaccinated = True
+        cat.last_fed = "2025-06-20 02:00:00"
+        store["10"] = cat
+        store["2"] = Dog("2", "Reksio", 5)
+        self.assertEqual(list(store), ["2", "10"])
+        self.assertIsInstance(store["10"], Cat)
+        self.assertTrue(store["10"].is_vaccinated)
+        self.assertEqual(store["10"].last_fed, "2025-06-20 02:00:00")
+        self.assertIsNone(store["2"].admission_date)
+        del store["2"]
+        self.assertNotIn("2", store)
+        self.assertIsNone(store.get("2"))
+
+    # Testuje budowę magazynu z nieposortowanego słownika: te same kolumny co przy wstawianiu po jednym zwierzęciu
+    def test_animal_store_bulk(self):
+        animals = {}
+        for i in range(300, 0, -1):
+            animal = (Dog if i % 2 else Cat)(str(i), f"Zwierzę{i}", i % 9)
+            animal.is_adopted = i % 3 == 0
+            animal.last_fed = "invalid_date" if i == 7 else f"2025-06-{i % 28 + 1:02d} 12:00:00"
+            animals[str(i)] = animal
+        bulk = AnimalStore(animals)
+        single = AnimalStore()
+        for key, animal in animals.items():
+            single[key] = animal
+        self.assertEqual(list(bulk), [str(i) for i in range(1, 301)])
+        self.assertEqual(list(bulk.rows()), list(single.rows()))
+        self.assertEqual(bulk["7"].last_fed, "invalid_date")
+
     # Testuje zapis i odczyt danych zwierząt w DataManager
     def test_data_manager_save_load_animals(self):
         animal = Dog("1", "Reksio", 5)
@@ -48,6 +112,251 @@ class TestAll(unittest.TestCase):
         self.assertEqual(self.data_manager.animals["1"].name, "Reksio")
         self.assertTrue(self.data_manager.animals["1"].is_vaccinated)
 
+    # Testuje zapis pojedynczych zmian w dzienniku i ich odtworzenie po ponownym wczytaniu
+    def test_data_manager_journal_replay(self):
+        data_manager = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True)
+        data_manager.save_animals({}, 1, 1)
+        data_manager.set_animal(Dog("1", "Reksio", 5))
+        data_manager.set_animal(Dog("2", "Azor", 3))
+        data_manager.delete_animal("1")
+        self.assertTrue(os.path.exists("test_zwierzeta.json.journal"))
+        reloaded = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True)
+        self.assertNotIn("1", reloaded.animals)
+        self.assertEqual(reloaded.animals["2"].name, "Azor")
+        self.assertEqual(reloaded.get_next_id(), 3)
+        reloaded.compact()
+        self.assertFalse(os.path.exists("test_zwierzeta.json.journal"))
+
+    # Testuje zapis pojedynczych wierszy w bazie SQLite i eksport do JSON
+    def test_data_manager_sqlite_storage(self):
+        storage = SqliteStorage("test_schronisko.db")
+        data_manager = DataManager("test_zwierzeta.json", "test_adopcje.json", storage=storage)
+        data_manager.set_animal(Dog("1", "Reksio", 5))
+        data_manager.set_adoption("1", {"animal_id": "1", "surname": "Kowalski", "pesel": "80051234567", "phone_number": "123456789", "adoption_date": parse_timestamp("2025-05-15 14:22:35")})
+        reloaded = DataManager("test_zwierzeta.json", "test_adopcje.json", storage=storage)
+        self.assertEqual(reloaded.animals["1"].name, "Reksio")
+        self.assertEqual(reloaded.adoptions["1"]["surname"], "Kowalski")
+        reloaded.export_json()
+        storage.close()
+        self.assertEqual(DataManager("test_zwierzeta.json", "test_adopcje.json").animals["1"].name, "Reksio")
+
+    # Testuje indeksy wyszukiwania: podciągi imion i nazwisk, prefiksy PESEL, zakres dat i aktualizację po zmianach
+    def test_search_indexes(self):
+        self.data_manager.save_animals({}, 1, 1)
+        self.data_manager.save_adoptions({})
+        reksio = Dog("1", "Reksio", 5)
+        reksio.admission_date = "2025-06-20 02:00:00"
+        self.data_manager.set_animal(reksio)
+        self.data_manager.set_animal(Cat("2", "Mruczek", 3))
+        self.assertEqual(self.data_manager.search_animals(name="EKS"), ["1"])
+        self.assertEqual(self.data_manager.search_animals(name="r"), ["1", "2"])
+        self.assertEqual(self.data_manager.search_animals(species=Cat), ["2"])
+        day = parse_timestamp("2025-06-20 00:00:00")
+        self.assertEqual(self.data_manager.search_animals(admission_from=day, admission_to=day + 86399), ["1"])
+        renamed = self.data_manager.animals["2"]
+        renamed.name = "Azor"
+        self.data_manager.set_animal(renamed)
+        self.assertEqual(self.data_manager.search_animals(name="ruc"), [])
+        self.data_manager.set_adoption("1", {"animal_id": "1", "surname": "Kowalski", "pesel": "80051234567", "phone_number": "123456789", "adoption_date": parse_timestamp("2025-05-15 14:22:35")})
+        self.assertEqual(self.data_manager.search_adoptions(surname="wal", pesel="8005"), ["1"])
+        self.assertEqual(self.data_manager.search_adoptions(pesel="0512"), [])
+        self.data_manager.delete_adoption("1")
+        self.assertEqual(self.data_manager.search_adoptions(animal_id="1"), [])
+
+    # Testuje odrzucanie ID w postaci niekanonicznej (np. "007") przy imporcie i zapisie, aby adopcje wskazywały ID z magazynu
+    def test_canonical_ids(self):
+        self.data_manager.save_adoptions({})
+        self.data_manager.save_animals({"7": Dog("7", "Reksio", 5)}, 8, 1)
+        with open(self.test_csv, 'w', encoding='utf-8') as f:
+            f.write("ID;Imię;Wiek;Gatunek;Zaszczepione;Ostatnie karmienie;Data przyjęcia;Status\n")
+            f.write("008;Azor;3;Pies;Nie;;;W schronisku\n")
+            f.write("9;Burek;3;Pies;Nie;;;W schronisku\n")
+        errors = self.data_manager.import_animals_csv(self.test_csv, replace=False)
+        self.assertEqual(errors, ["Wiersz 2: Nieprawidłowe ID zwierzęcia: 008"])
+        self.assertEqual(list(self.data_manager.animals), ["7", "9"])
+        with open(self.test_csv, 'w', encoding='utf-8') as f:
+            f.write("ID;ID zwierzęcia;Nazwisko;PESEL;Numer telefonu;Data adopcji\n")
+            f.write("1;007;Kowalski;80051234567;123456789;2025-05-15 14:22:35\n")
+            f.write("02;7;Nowak;80051234568;123456780;2025-05-15 14:22:35\n")
+            f.write("3;7;Nowak;80051234568;123456780;2025-05-15 14:22:35\n")
+        errors = self.data_manager.import_adoptions_csv(self.test_csv, replace=False)
+        self.assertEqual(errors, ["Wiersz 2: Nieprawidłowe ID zwierzęcia: 007", "Wiersz 3: Nieprawidłowe ID adopcji: 02"])
+        self.assertEqual(self.data_manager.get_animal_adoptions("7"), ["3"])
+        with self.assertRaises(ValueError):
+            self.data_manager.set_animal(Dog("010", "Szarik", 2))
+        with self.assertRaises(ValueError):
+            self.data_manager.set_adoption("4", {"animal_id": "07", "surname": "Nowak", "pesel": "80051234568", "phone_number": "123456780", "adoption_date": None})
+        self.assertNotIn("10", self.data_manager.animals)
+        self.assertEqual(self.data_manager.get_animal_adoptions("7"), ["3"])
+
+    # Testuje indeks adopcji według zwierzęcia przy imporcie kilku adopcji jednego zwierzęcia, ponownym imporcie eksportu i usuwaniu adopcji
+    def test_animal_adoptions_index(self):
+        self.data_manager.save_adoptions({})
+        self.data_manager.save_animals({"1": Dog("1", "Reksio", 5), "2": Cat("2", "Mruczek", 3)}, 3, 1)
+        with open(self.test_csv, 'w', encoding='utf-8') as f:
+            f.write("ID;ID zwierzęcia;Nazwisko;PESEL;Numer telefonu;Data adopcji\n")
+            f.write("1;1;Kowalski;80051234567;123456789;2025-05-15 14:22:35\n")
+            f.write("2;1;Nowak;80051234568;123456780;2025-05-16 14:22:35\n")
+        self.assertEqual(self.data_manager.import_adoptions_csv(self.test_csv, replace=True), [])
+        self.assertEqual(self.data_manager.get_animal_adoptions("1"), ["1", "2"])
+        self.assertEqual(self.data_manager.get_animal_adoptions("2"), [])
+        self.data_manager.export_adoptions_csv(self.test_csv)
+        self.assertEqual(self.data_manager.import_adoptions_csv(self.test_csv, replace=True), [])
+        self.assertEqual(self.data_manager.get_animal_adoptions("1"), ["1", "2"])
+        self.assertTrue(self.data_manager.animals["1"].is_adopted)
+        self.data_manager.delete_adoption("1")
+        self.assertEqual(self.data_manager.get_animal_adoptions("1"), ["2"])
+
+    # Testuje liczniki statystyk aktualizowane przy zmianach i imporcie, także dla dużej liczby zwierząt
+    def test_animal_stats(self):
+        self.data_manager.save_animals({str(i): Dog(str(i), f"Pies{i}", 3) for i in range(1, 5001)}, 5001, 1)
+        stats = self.data_manager.animal_stats
+        self.assertEqual(stats.count(species=Dog, adopted=False), 5000)
+        cat = Cat("5001", "Mruczek", 2)
+        cat.is_vaccinated = True
+        self.data_manager.set_animal(cat)
+        self.data_manager.delete_animal("1")
+        animal = self.data_manager.animals["2"]
+        animal.is_adopted = True
+        self.data_manager.set_animal(animal)
+        stats = self.data_manager.animal_stats
+        self.assertEqual(stats.count(species=Dog, adopted=False), 4998)
+        self.assertEqual(stats.count(vaccinated=True, adopted=False), 1)
+        self.assertEqual(stats.count(), 5000)
+        self.data_manager.export_animals_csv(self.test_csv)
+        self.data_manager.import_animals_csv(self.test_csv, replace=True)
+        self.assertEqual(self.data_manager.animal_stats.count(adopted=True), 1)
+
+    # Testuje zapis w tle: łączenie szybkich zmian w jeden zapis, zapis przy zamknięciu i zgłaszanie błędów
+    def test_background_storage(self):
+        self.data_manager.save_animals({}, 1, 1)
+        errors = []
+        data_manager = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True, background=True, on_error=errors.append)
+        data_manager.set_animal(Dog("1", "Reksio", 5))
+        for i in range(10):
+            animal = data_manager.animals["1"]
+            animal.last_fed_ts = parse_timestamp("2025-06-20 02:00:00") + i
+            data_manager.set_animal(animal)
+        data_manager.close()
+        with open("test_zwierzeta.json.journal", encoding="utf-8") as f:
+            self.assertLess(len(f.readlines()), 11)
+        reloaded = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True)
+        self.assertEqual(reloaded.animals["1"].last_fed_ts, parse_timestamp("2025-06-20 02:00:09"))
+        failing = DataManager(os.path.join("brak_katalogu", "zwierzeta.json"), "test_adopcje.json", background=True, on_error=errors.append)
+        failing.set_animal(Dog("1", "Reksio", 5))
+        failing.flush()
+        failing.close()
+        self.assertEqual(len(errors), 1)
+        self.assertIn("Błąd zapisu zwierząt", errors[0])
+
+    # Testuje atomowy zapis migawki: wykrycie uszkodzenia sumą kontrolną, odczyt kopii zapasowej i odłożenie
+    # obu plików, gdy uszkodzona jest także kopia, aby kolejne zapisy ich nie nadpisały
+    def test_atomic_snapshot_recovery(self):
+        self.data_manager.save_animals({"1": Dog("1", "Reksio", 5)}, 2, 1)
+        self.data_manager.save_animals({"1": Dog("1", "Reksio", 5), "2": Cat("2", "Mruczek", 3)}, 3, 1)
+        self.assertFalse(os.path.exists("test_zwierzeta.json.tmp"))
+        with open("test_zwierzeta.json", encoding="utf-8") as f:
+            content = f.read()
+        with open("test_zwierzeta.json", "w", encoding="utf-8") as f:
+            f.write(content.replace("Mruczek", "Mruczes"))
+        errors = []
+        reloaded = DataManager("test_zwierzeta.json", "test_adopcje.json", on_error=errors.append)
+        self.assertEqual(sorted(reloaded.animals), ["1"])
+        self.assertIn("wczytano kopię zapasową", errors[0])
+        with open("test_zwierzeta.json.bak", "w", encoding="utf-8") as f:
+            f.write(content[:len(content) // 2])
+        os.replace("test_zwierzeta.json.corrupt", "test_zwierzeta.json")
+        errors = []
+        reloaded = DataManager("test_zwierzeta.json", "test_adopcje.json", on_error=errors.append)
+        self.assertEqual(len(reloaded.animals), 0)
+        self.assertIn("Błąd odczytu zwierząt", errors[0])
+        self.assertFalse(os.path.exists("test_zwierzeta.json"))
+        reloaded.set_animal(Dog("1", "Azor", 2))
+        reloaded.set_animal(Dog("2", "Burek", 3))
+        with open("test_zwierzeta.json.corrupt", encoding="utf-8") as f:
+            self.assertIn("Mruczes", f.read())
+        with open("test_zwierzeta.json.bak.corrupt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), content[:len(content) // 2])
+
+    # Testuje zachowanie daty adopcji w nieprawidłowym formacie przy zapisie JSON, eksporcie CSV i w migawce binarnej
+    def test_invalid_adoption_date_kept(self):
+        record = {"animal_id": "1", "surname": "Nowak", "pesel": "80051234567", "phone_number": "123456789", "adoption_date": "15.05.2025"}
+        with open("test_adopcje.json", "w", encoding="utf-8") as f:
+            json.dump({"adoptions": {"1": record}}, f)
+        data_manager = DataManager("test_zwierzeta.json", "test_adopcje.json", binary=True)
+        data_manager.save_animals({"1": Dog("1", "Reksio", 5)}, 2, 2)
+        data_manager.save_adoptions(data_manager.adoptions)
+        with open("test_adopcje.json", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["adoptions"]["1"]["adoption_date"], "15.05.2025")
+        data_manager.export_adoptions_csv(self.test_csv)
+        with open(self.test_csv, encoding="utf-8") as f:
+            self.assertTrue(f.read().splitlines()[1].endswith(";15.05.2025"))
+        data_manager.close()
+        for lazy in (False, True):
+            reloaded = DataManager("test_zwierzeta.json", "test_adopcje.json", binary=True, lazy=lazy)
+            self.assertIsNotNone(reloaded.binary_stamps)
+            self.assertEqual(reloaded.adoption_to_record(reloaded.adoptions["1"]), record)
+            reloaded.close()
+
+    # Testuje migawkę binarną: wczytanie, gdy jest aktualna, i powrót do JSON po nowym wpisie w dzienniku
+    def test_binary_snapshot(self):
+        data_manager = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True, binary=True)
+        data_manager.save_animals({}, 1, 1)
+        reksio = Dog("1", "Reksio", 5)
+        reksio.last_fed = "invalid_date"
+        data_manager.set_animal(reksio)
+        data_manager.set_adoption("1", {"animal_id": "1", "surname": "Kowalski", "pesel": "80051234567", "phone_number": "123456789", "adoption_date": parse_timestamp("2025-05-15 14:22:35")})
+        data_manager.close()
+        self.assertTrue(os.path.exists("test_zwierzeta.bin"))
+        reloaded = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True, binary=True)
+        self.assertTrue(reloaded.load_binary_snapshot())
+        self.assertEqual(reloaded.animals["1"].last_fed, "invalid_date")
+        self.assertEqual(reloaded.adoptions["1"]["surname"], "Kowalski")
+        self.assertEqual(reloaded.search_animals(name="eks"), ["1"])
+        self.assertEqual(reloaded.storage.animals_journal_entries, 1)
+        reloaded.set_animal(Cat("2", "Mruczek", 3))
+        self.assertFalse(reloaded.load_binary_snapshot())
+        self.assertEqual(DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True, binary=True).animals["2"].name, "Mruczek")
+
+    # Testuje leniwe wczytanie zmapowanej migawki: odczyt pojedynczych rekordów i kopiowanie przy pierwszej zmianie
+    def test_lazy_snapshot(self):
+        data_manager = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True, binary=True)
+        data_manager.save_animals({str(i): Dog(str(i), f"Pies{i}", 3) for i in range(1, 101)}, 101, 3)
+        data_manager.save_adoptions({"2": {"animal_id": "5", "surname": "Nowak", "pesel": "80051234567", "phone_number": "123456789", "adoption_date": None}})
+        data_manager.close()
+        lazy = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True, binary=True, lazy=True)
+        self.assertIsNone(lazy.animal_index_cache)
+        self.assertEqual(lazy.animals["42"].name, "Pies42")
+        self.assertEqual(lazy.adoptions["2"]["surname"], "Nowak")
+        self.assertEqual(lazy.animal_stats.count(species=Dog), 100)
+        self.assertEqual(lazy.search_adoptions(surname="nowa"), ["2"])
+        animal = lazy.animals["42"]
+        animal.name = "Azor"
+        lazy.set_animal(animal)
+        lazy.delete_adoption("2")
+        self.assertEqual(lazy.search_animals(name="azor"), ["42"])
+        lazy.close()
+        reloaded = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True, binary=True, lazy=True)
+        self.assertEqual(reloaded.animals["42"].name, "Azor")
+        self.assertEqual(len(reloaded.adoptions), 0)
+        reloaded.close()
+
+    # Testuje, że leniwe wczytanie sprawdza sumę kontrolną migawki i przy uszkodzonych danych wczytuje pliki JSON
+    def test_lazy_snapshot_checksum(self):
+        data_manager = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True, binary=True)
+        data_manager.save_animals({str(i): Dog(str(i), f"Pies{i}", 3) for i in range(1, 101)}, 101, 1)
+        data_manager.save_adoptions({})
+        data_manager.close()
+        with open("test_zwierzeta.bin", 'r+b') as f:
+            data = f.read()
+            f.seek(data.rindex(b"Pies42"))
+            f.write(b"Pies4X")
+        lazy = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True, binary=True, lazy=True)
+        self.assertIsNone(lazy.snapshot)
+        self.assertEqual(lazy.animals["42"].name, "Pies42")
+        self.assertEqual(lazy.search_animals(name="pies4x"), [])
+        lazy.close()
+
     # === Testy funkcjonalne ===
     # Testuje dodawanie nowego zwierzęcia
     def test_add_animal(self):
@@ -66,6 +375,39 @@ class TestAll(unittest.TestCase):
         self.assertEqual(values[2], 5)
         self.assertEqual(values[3], "Pies")
 
+    # Testuje wirtualną tabelę: tylko widoczne wiersze w drzewie, przewijanie i zachowanie zaznaczenia
+    def test_virtual_animals_tree(self):
+        self.app.animals = AnimalStore({str(i): Dog(str(i), f"Pies{i}", i % 15) for i in range(1, 5001)})
+        self.app.refresh_animals_tree()
+        view = self.app.animals_view
+        self.assertLess(len(self.app.animals_tree.get_children()), 100)
+        self.assertEqual(self.app.animals_tree.get_children()[0], "1")
+        view.move_selection(1)
+        self.assertEqual(view.selection(), ("1",))
+        view.yview("moveto", "0.5")
+        self.assertEqual(self.app.animals_tree.get_children()[0], "2501")
+        self.assertEqual(view.selection(), ("1",))
+        self.app.sort_column("ID", False)
+        self.app.sort_column("ID", False)
+        self.assertEqual(view.keys[0], "5000")
+        view.yview("moveto", "0")
+        self.assertEqual(self.app.animals_tree.item("5000")["values"][1], "Pies5000")
+
+    # Testuje aktualizację pojedynczego wiersza: przeniesienie na właściwą pozycję i usunięcie bez przebudowy tabeli
+    def test_update_animal_row(self):
+        self.app.animals = AnimalStore({str(i): Dog(str(i), f"Pies{i:04}", 3) for i in range(1, 1001)})
+        self.app.sort_column("Imię", False)
+        animal = self.app.animals["500"]
+        animal.name = "Azor"
+        self.app.animals["500"] = animal
+        self.app.update_animal_row("500")
+        self.assertEqual(self.app.animals_view.keys[0], "500")
+        self.assertEqual(self.app.animals_tree.item("500")["values"][1], "Azor")
+        del self.app.animals["1"]
+        self.app.update_animal_row("1")
+        self.assertNotIn("1", self.app.animals_view.keys)
+        self.assertEqual(len(self.app.animals_view.keys), 999)
+
     # === Testy integracyjne ===
     # Testuje eksport i import danych zwierząt
     def test_export_import_animals(self):
@@ -80,7 +422,231 @@ class TestAll(unittest.TestCase):
         self.assertEqual(self.data_manager.animals["1"].name, "Reksio")
         self.assertTrue(self.data_manager.animals["1"].is_vaccinated)
 
+    # Testuje rejestr gatunków: kody, nazwy i odczyt gatunku bez przeszukiwania mapy
+    def test_species_registry(self):
+        self.assertIs(SPECIES_BY_NAME["Kot"], Cat)
+        self.assertEqual(SPECIES_NAMES[Cat.species_code], "Kot")
+        self.assertEqual(Dog("1", "Reksio", 5).species_name, "Pies")
+        self.assertEqual(self.data_manager.animal_to_record(Cat("2", "Mruczek", 3))["species"], "Kot")
+        store = AnimalStore({"2": Cat("2", "Mruczek", 3)})
+        self.assertEqual(store.species[0], Cat.species_code)
+        self.assertIsInstance(store["2"], Cat)
+
+    # Testuje pamięć podręczną kolejności: odwracanie bez sortowania, remisy według ID i unieważnianie po zmianie
+    def test_sorted_view_cache(self):
+        cache = SortedViewCache(animal_column_keys)
+        for i, age in enumerate([3, 1, 3, 2], start=1):
+            self.data_manager.set_animal(Dog(str(i), f"Pies{i}", age))
+        animals, version = self.data_manager.animals, self.data_manager.animals_version
+        self.assertEqual(cache.order(animals, version, "Wiek"), ["2", "4", "1", "3"])
+        self.assertEqual(cache.order(animals, version, "Wiek", reverse=True), ["1", "3", "4", "2"])
+        self.assertIs(cache.order(animals, version, "Wiek"), cache.order(animals, version, "Wiek"))
+        self.assertEqual(cache.order(animals, version, None, reverse=True), ["4", "3", "2", "1"])
+        self.data_manager.set_animal(Dog("5", "Pies5", 0))
+        self.assertGreater(self.data_manager.animals_version, version)
+        self.assertEqual(cache.order(animals, self.data_manager.animals_version, "Wiek")[0], "5")
+
+    # Testuje, że klucze pojedynczych wierszy i kolejność wstawiania wiersza są zgodne z kolejnością całych kolumn
+    def test_sorted_view_row_keys(self):
+        for i, age in enumerate([3, 1, 3, 2], start=1):
+            animal = (Dog if i % 2 else Cat)(str(i), f"Zwierzę{5 - i}", age)
+            animal.is_vaccinated = i % 3 == 0
+            if i > 1:
+                animal.last_fed = f"2025-06-0{i} 12:00:00"
+            self.data_manager.set_animal(animal)
+            self.data_manager.set_adoption(str(i), {"animal_id": str(5 - i), "surname": f"Nowak{i % 2}", "pesel": f"8000000000{i}", "phone_number": f"50000000{i}", "adoption_date": None})
+        for column_keys, row_key, records in ((animal_column_keys, animal_row_key, self.data_manager.animals), (adoption_column_keys, adoption_row_key, self.data_manager.adoptions)):
+            for column in (None, "ID", "Imię", "Wiek", "Gatunek", "Zaszczepione", "Ostatnie karmienie", "Data przyjęcia", "Status", "ID zwierzęcia", "Nazwisko", "PESEL", "Data adopcji"):
+                ids, keys = column_keys(records, column)
+                key = row_key(records, column)
+                self.assertEqual([key(record_id) for record_id in ids], keys or [int(record_id) for record_id in ids])
+                for reverse in (False, True):
+                    order = SortedViewCache(column_keys).order(records, 0, column, reverse)
+                    before = row_order(key, reverse)
+                    self.assertTrue(all(before(a, b) for a, b in zip(order, order[1:])))
+
+    # Testuje silnik zapytań: zgodność z przecięciem indeksów, warunki sprawdzane na rekordach, dopasowanie pojedynczego wiersza
+    # i przerwanie zapytania, które przestało być potrzebne
+    def test_query_engine(self):
+        self.data_manager.save_animals({}, 1, 1)
+        self.data_manager.save_adoptions({})
+        for i in range(1, 61):
+            animal = (Dog if i % 3 else Cat)(str(i), f"Reksio{i % 7}", i % 5)
+            animal.is_vaccinated = i % 2 == 0
+            animal.admission_date = f"2025-06-{i % 28 + 1:02d} 12:00:00"
+            self.data_manager.set_animal(animal)
+            self.data_manager.set_adoption(str(i), {"animal_id": str(i % 10), "surname": f"Nowak{i % 4}", "pesel": f"80{i:09d}", "phone_number": f"5{i % 3}0000000", "adoption_date": parse_timestamp("2025-05-15 14:22:35") + i * 86400})
+        day = parse_timestamp("2025-06-05 00:00:00")
+        for filters in ({}, {"name": "reksio3"}, {"name": "o1", "age": 2}, {"species": Cat, "vaccinated": True}, {"animal_id": "12", "age": 2},
+                        {"animal_id": "012"}, {"age": 4, "admission_from": day, "admission_to": day + 5 * 86400}, {"name": "xyz", "adopted": False}):
+            self.assertEqual(self.data_manager.search_animals(**filters), self.data_manager.animal_index.search(**filters))
+        self.assertEqual(self.data_manager.search_animals(AnimalQuery(name="o1", age=2)), ["22", "57"])
+        for filters in ({"surname": "nowak1", "phone_number": "51"}, {"animal_id": "3", "pesel": "8000000001"}, {"adoption_id": "7", "surname": "wak"},
+                        {"animal_id": "5", "adoption_from": day, "adoption_to": day + 30 * 86400}):
+            self.assertEqual(self.data_manager.search_adoptions(**filters), self.data_manager.adoption_index.search(**filters))
+        query = AnimalQuery(name="reksio1", vaccinated=True)
+        self.assertTrue(query.matches(self.data_manager.animals, "8"))
+        self.assertFalse(query.matches(self.data_manager.animals, "1"))
+        self.assertFalse(query.matches(self.data_manager.animals, "999"))
+        self.assertTrue(query.matches({"8": self.data_manager.animals["8"]}, "8"))
+        self.assertTrue(AdoptionQuery(surname="NOWAK2", pesel="800").matches(self.data_manager.adoptions, "6"))
+        self.assertEqual(self.data_manager.search_animals(AnimalQuery(animal_id="12", name="reksio"), lambda: False), ["12"])
+        with self.assertRaises(SearchCancelled):
+            self.data_manager.search_animals(AnimalQuery(animal_id="12", name="reksio"), lambda: True)
+
+    # Testuje stronicowanie wyników: liczba wyników od razu, kolejne strony na żądanie
+    def test_result_pages(self):
+        for i in range(1, 8):
+            self.data_manager.set_animal(Dog(str(i), f"Pies{i}", 2))
+        pages = ResultPages(self.data_manager.search_animals(AnimalQuery(species=Dog)), page_size=3)
+        self.assertEqual(len(pages), 7)
+        self.assertEqual(pages.next_page(), ["1", "2", "3"])
+        self.assertEqual(pages.next_page(), ["4", "5", "6"])
+        self.assertTrue(pages.has_more())
+        self.assertEqual(pages.next_page(), ["7"])
+        self.assertFalse(pages.has_more())
+        self.assertEqual(pages.next_page(), [])
+
+    # Testuje wyszukiwanie w trakcie pisania: zawężanie poprzednich wyników, pomijanie starszych zapytań i zmianę danych
+    def test_live_search(self):
+        self.assertTrue(AdoptionQuery(pesel="8005", surname="kowal").refines(AdoptionQuery(pesel="80", surname="wal")))
+        self.assertFalse(AdoptionQuery(pesel="8105").refines(AdoptionQuery(pesel="80")))
+        self.assertFalse(AdoptionQuery(pesel="80", animal_id="1").refines(AdoptionQuery(pesel="80")))
+        self.assertFalse(AnimalQuery(name="rek").refines(AnimalQuery(name="reks")))
+        self.data_manager.save_adoptions({})
+        for i in range(1, 31):
+            self.data_manager.set_adoption(str(i), {"animal_id": "1", "surname": "Nowak", "pesel": f"80{i % 3}{i:08d}", "phone_number": "123456789", "adoption_date": None})
+        searches = []
+        def search(query, cancelled):
+            searches.append(query)
+            return self.data_manager.search_adoptions(query, cancelled)
+        live_search = LiveSearch(search, lambda: self.data_manager.adoptions, lambda: self.data_manager.adoptions_version, self.data_manager.lock)
+        live_search.submit(AdoptionQuery(pesel="80"))
+        self.assertEqual(len(live_search.take(timeout=5)), 30)
+        live_search.submit(AdoptionQuery(pesel="801"))
+        self.assertEqual(live_search.take(timeout=5), self.data_manager.search_adoptions(pesel="801"))
+        self.assertEqual(len(searches), 1)
+        live_search.submit(AdoptionQuery(pesel="802"))
+        live_search.submit(AdoptionQuery(pesel="8020000000"))
+        self.assertEqual(live_search.take(timeout=5), ["2", "5", "8"])
+        self.data_manager.delete_adoption("2")
+        live_search.submit(AdoptionQuery(pesel="80200000002"))
+        self.assertEqual(live_search.take(timeout=5), [])
+        live_search.close()
+
+    # Testuje spójność wyszukiwania z danymi: indeks zbudowany dla starszej wersji danych jest porzucany,
+    # a wynik obliczony przed zmianą danych jest liczony ponownie
+    def test_live_search_stale_data(self):
+        self.data_manager.save_animals({}, 1, 1)
+        for i in range(1, 6):
+            self.data_manager.set_animal(Dog(str(i), f"Pies{i}", 2))
+        self.data_manager.animal_index
+        renamed = self.data_manager.animals["3"]
+        renamed.name = "Unikalny"
+        self.data_manager.animals["3"] = renamed
+        self.data_manager.animals_version += 1
+        self.assertEqual(self.data_manager.search_animals(name="unikalny"), ["3"])
+        def search(query, cancelled):
+            found = self.data_manager.search_animals(query, cancelled)
+            if not searches:
+                self.data_manager.set_animal(Dog("6", "Unikalny2", 2))
+            searches.append(found)
+            return found
+        searches = []
+        live_search = LiveSearch(search, lambda: self.data_manager.animals, lambda: self.data_manager.animals_version, self.data_manager.lock)
+        live_search.submit(AnimalQuery(name="unikalny"))
+        self.assertEqual(live_search.take(timeout=5), ["3", "6"])
+        self.assertEqual(searches, [["3"], ["3", "6"]])
+        live_search.close()
+
+    # Testuje kolejkę karmienia: kolejność od najpilniejszych, pomijanie adoptowanych i aktualizację po karmieniu i adopcji
+    def test_overdue_feeding(self):
+        self.data_manager.save_animals({}, 1, 1)
+        now = parse_timestamp("2025-06-20 12:00:00")
+        for i, hours in enumerate([30, 2, None, 48, 13], start=1):
+            animal = Dog(str(i), f"Pies{i}", 2)
+            animal.last_fed_ts = None if hours is None else now - hours * 3600
+            self.data_manager.set_animal(animal)
+        self.assertEqual(self.data_manager.overdue_feeding(12, now), ["3", "4", "1", "5"])
+        self.assertEqual(self.data_manager.overdue_feeding(24, now), ["3", "4", "1"])
+        fed = self.data_manager.animals["4"]
+        fed.last_fed_ts = now
+        self.data_manager.set_animal(fed)
+        adopted = self.data_manager.animals["1"]
+        adopted.is_adopted = True
+        self.data_manager.set_animal(adopted)
+        self.assertEqual(self.data_manager.overdue_feeding(12, now), ["3", "5"])
+        self.data_manager.index_animals(self.data_manager.animals)
+        self.assertEqual(self.data_manager.overdue_feeding(12, now), ["3", "5"])
+        self.assertEqual(DataManager("test_zwierzeta.json", "test_adopcje.json").overdue_feeding(12, now), ["3", "5"])
+
+    # Testuje eksport strumieniowy: kolejność ID, nieprawidłowe daty i plik skompresowany gzip
+    def test_export_csv_streaming(self):
+        animals = {str(i): Cat(str(i), f"Kot{i}", i) for i in (3, 1, 2)}
+        animals["2"].last_fed = "zła data"
+        animals["3"].admission_date = "2025-06-19 02:00:00"
+        self.data_manager.save_animals(animals, 4, 3)
+        self.data_manager.save_adoptions({"2": {"animal_id": "1", "surname": "Nowak", "pesel": "12345678901", "phone_number": "123456789", "adoption_date": parse_timestamp("2025-06-20 10:30:00")},
+                                          "1": {"animal_id": "2", "surname": "Kowalski", "pesel": "12345678902", "phone_number": "123456788", "adoption_date": None}})
+        self.data_manager.export_animals_csv(self.test_csv)
+        self.data_manager.export_animals_csv(self.test_csv + ".gz")
+        with open(self.test_csv, 'rb') as f, gzip.open(self.test_csv + ".gz", 'rb') as g:
+            data = f.read()
+            self.assertEqual(g.read(), data)
+        lines = data.decode('utf-8').splitlines()
+        self.assertEqual([line.split(";")[0] for line in lines[1:]], ["1", "2", "3"])
+        self.assertEqual(lines[2], "2;Kot2;2;Kot;Nie;zła data;;W schronisku")
+        self.assertEqual(lines[3], "3;Kot3;3;Kot;Nie;;2025-06-19 02:00:00;W schronisku")
+        self.data_manager.export_adoptions_csv(self.test_csv)
+        with open(self.test_csv, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines()[1:], ["1;2;Kowalski;12345678902;123456788;", "2;1;Nowak;12345678901;123456789;2025-06-20 10:30:00"])
+        os.remove(self.test_csv + ".gz")
+
     # === Testy graniczne / błędne dane ===
+    # Testuje import wierszy w kolejności malejącej oraz dopisywanie ID wypadających pomiędzy istniejącymi
+    def test_import_unsorted_ids(self):
+        data_manager = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True)
+        data_manager.save_animals({}, 1, 1)
+        data_manager.save_adoptions({})
+        for file_ids, replace in ((range(3000, 0, -2), True), (range(2999, 0, -2), False)):
+            with open(self.test_csv, 'w', encoding='utf-8') as f:
+                f.write("ID;Imię;Wiek;Gatunek;Zaszczepione;Ostatnie karmienie;Data przyjęcia;Status\n")
+                for i in file_ids:
+                    f.write(f"{i};Pies{i};3;Pies;Nie;;;W schronisku\n")
+            self.assertEqual(data_manager.import_animals_csv(self.test_csv, replace=replace, chunk_size=100), [])
+        self.assertEqual(list(data_manager.animals), [str(i) for i in range(1, 3001)])
+        self.assertEqual(data_manager.search_animals(name="pies2999"), ["2999"])
+        self.assertEqual(data_manager.animal_stats.count(species=Dog), 3000)
+        reloaded = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True)
+        self.assertEqual(list(reloaded.animals), [str(i) for i in range(1, 3001)])
+        self.assertEqual(reloaded.next_id, 3001)
+
+    # Testuje, że import przerwany błędem odczytu pliku nie usuwa dotychczasowych zwierząt ani adopcji
+    def test_import_failure_keeps_data(self):
+        data_manager = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True)
+        data_manager.save_animals({}, 1, 1)
+        data_manager.save_adoptions({})
+        for i in range(1, 51):
+            data_manager.set_animal(Dog(str(i), f"Pies{i}", 2))
+        data_manager.set_adoption("1", {"animal_id": "1", "surname": "Nowak", "pesel": "12345678901", "phone_number": "123456789", "adoption_date": None})
+        with open(self.test_csv, 'wb') as f:
+            f.write("ID;Imię;Wiek;Gatunek;Zaszczepione;Ostatnie karmienie;Data przyjęcia;Status\n".encode('utf-8'))
+            for i in range(100, 3100):
+                f.write(f"{i};Kot{i};3;Kot;Nie;;;W schronisku\n".encode('utf-8'))
+            f.write(b"3100;Z\xff;3;Kot;Nie;;;W schronisku\n")
+        self.assertTrue(data_manager.import_animals_csv(self.test_csv, chunk_size=1000)[0].startswith("Błąd importu"))
+        with open(self.test_csv, 'wb') as f:
+            f.write("ID;ID zwierzęcia;Nazwisko;PESEL;Numer telefonu;Data adopcji\n".encode('utf-8'))
+            f.write("2;2;Kowalski;12345678902;123456788;\n".encode('utf-8'))
+            f.write(b"3;3;Z\xff;12345678903;123456787;\n")
+        self.assertTrue(data_manager.import_adoptions_csv(self.test_csv)[0].startswith("Błąd importu"))
+        self.assertEqual(len(data_manager.animals), 50)
+        self.assertEqual(list(data_manager.adoptions), ["1"])
+        reloaded = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True)
+        self.assertEqual(len(reloaded.animals), 50)
+        self.assertEqual(list(reloaded.adoptions), ["1"])
+        self.assertFalse(reloaded.animals["2"].is_adopted)
+
     # Testuje import pliku CSV z błędnymi danymi
     def test_import_invalid_csv(self):
         with open(self.test_csv, 'w', encoding='utf-8') as f:
@@ -92,6 +658,56 @@ class TestAll(unittest.TestCase):
         self.assertIn("Nieprawidłowy gatunek", errors[0])
         self.assertIn("Nieprawidłowy format daty", errors[0])
 
+    # Testuje import partiami z raportowaniem postępu i limitem komunikatów o błędach
+    def test_import_csv_chunks_progress(self):
+        with open(self.test_csv, 'w', encoding='utf-8') as f:
+            f.write("ID;Imię;Wiek;Gatunek;Zaszczepione;Ostatnie karmienie;Data przyjęcia;Status\n")
+            for i in range(1, 26):
+                f.write(f"{i};Animal{i};5;Pies;Tak;2025-06-20 02:00:00;2025-06-19 02:00:00;W schronisku\n")
+            for i in range(5):
+                f.write("1;;-1;Nieznany;Tak;;;W schronisku\n")
+        progress = []
+        errors = self.data_manager.import_animals_csv(self.test_csv, replace=True, chunk_size=10, max_errors=2,
+                                                      progress=lambda rows, position, size: progress.append(rows))
+        self.assertEqual(len(self.data_manager.animals), 25)
+        self.assertEqual(progress, [10, 20, 30, 30])
+        self.assertEqual(len(errors), 3)
+        self.assertIn("Wiersz 27", errors[0])
+        self.assertIn("Pominięto kolejne błędy: 3", errors[-1])
+
+    # Testuje, czy import równoległy daje te same dane i numery wierszy w błędach co import sekwencyjny
+    def test_import_csv_parallel_matches_sequential(self):
+        with open(self.test_csv, 'w', encoding='utf-8') as f:
+            f.write("ID;Imię;Wiek;Gatunek;Zaszczepione;Ostatnie karmienie;Data przyjęcia;Status\n")
+            for i in range(1, 101):
+                f.write(f"{i};Animal{i};5;Kot;Nie;;2025-06-19 02:00:00;W schronisku\n" if i % 10 else f"{i - 1};;x;Pies;Tak;;;W schronisku\n")
+        sequential_errors = self.data_manager.import_animals_csv(self.test_csv, replace=True)
+        sequential_ids = sorted(self.data_manager.animals)
+        parallel_errors = self.data_manager.import_animals_csv(self.test_csv, replace=True, workers=2)
+        self.assertEqual(parallel_errors, sequential_errors)
+        self.assertEqual(sorted(self.data_manager.animals), sequential_ids)
+        self.assertIn("Wiersz 11:", parallel_errors[0])
+
+    # Testuje import równoległy z małymi zakresami, gdy pole w cudzysłowie zawiera znak nowego wiersza,
+    # także po cudzysłowie wewnątrz pola bez cudzysłowów (przejście do sprawdzania kolejnego)
+    def test_import_csv_parallel_multiline_field(self):
+        for literal_quote in (False, True):
+            with open(self.test_csv, 'w', encoding='utf-8') as f:
+                f.write("ID;Imię;Wiek;Gatunek;Zaszczepione;Ostatnie karmienie;Data przyjęcia;Status\n")
+                for i in range(1, 40):
+                    name = {7: 'Ab"c' if literal_quote else "Azor", 12: '"Ala\nMa;Kota"', 30: "x"}.get(i, f"Pies{i}")
+                    f.write(f"{i};{name};{'x' if i == 30 else 3};Pies;Nie;;;W schronisku\n")
+            with open(self.test_csv, 'r', encoding='utf-8') as f:
+                f.readline()
+                sequential = [(line_number, animal_id, animal and animal.name, row_errors)
+                              for line_number, position, (animal_id, animal, row_errors) in parse_csv_rows(f, parse_animal_row, SPECIES_BY_NAME)]
+            parallel = [(line_number, animal_id, animal and animal.name, row_errors)
+                        for line_number, position, (animal_id, animal, row_errors) in parse_csv_parallel(self.test_csv, 2, parse_animal_row, SPECIES_BY_NAME, range_size=10)]
+            self.assertEqual(len(sequential), 39)
+            self.assertEqual(parallel, sequential)
+            self.assertEqual(sequential[11][2], "Ala\nMa;Kota")
+            self.assertEqual(sequential[29][0], 31)
+
     # === Testy wydajności ===
     @pytest.mark.performance
     def test_performance_save_animals(self):
@@ -120,5 +736,110 @@ class TestAll(unittest.TestCase):
         animals = {str(i): Dog(str(i), f"Animal{i}", 5) for i in range(1000)}
         self.data_manager.save_animals(animals, 1001, 1)
 
+# Testy wiersza poleceń: działają bez ekranu, więc nie tworzą okna Tk
+class TestCli(unittest.TestCase):
+    def tearDown(self):
+        for filename in ("test_zwierzeta.json", "test_adopcje.json", "test_zwierzeta.bin", "test_zwierzeta.csv", "test_wykres.png", "test_schronisko.db"):
+            for suffix in ("", ".journal", ".bak"):
+                if os.path.exists(filename + suffix):
+                    os.remove(filename + suffix)
+
+    # Uruchamia polecenie na plikach testowych i zwraca kod wyjścia oraz wypisany tekst
+    def run_cli(self, *args):
+        output = StringIO()
+        with redirect_stdout(output):
+            code = cli.main(["--animals", "test_zwierzeta.json", "--adoptions", "test_adopcje.json", *args])
+        return code, output.getvalue()
+
+    # Testuje import, statystyki, eksport i wykres w trybie wsadowym
+    def test_cli_batch(self):
+        with open("test_zwierzeta.csv", 'w', encoding='utf-8') as f:
+            f.write("ID;Imię;Wiek;Gatunek;Zaszczepione;Ostatnie karmienie;Data przyjęcia;Status\n")
+            f.write("1;Reksio;5;Pies;Tak;2025-06-20 02:00:00;2025-06-19 02:00:00;W schronisku\n")
+            f.write("2;Mruczek;3;Kot;Nie;;2025-06-19 02:00:00;W schronisku\n")
+        self.assertEqual(self.run_cli("import-animals", "test_zwierzeta.csv")[0], 0)
+        code, output = self.run_cli("stats")
+        self.assertEqual(code, 0)
+        self.assertIn("Zwierzęta: 2", output)
+        self.assertIn("Psy: 1, Koty: 1", output)
+        self.assertEqual(self.run_cli("compact")[0], 0)
+        self.assertEqual(self.run_cli("export-animals", "test_zwierzeta.csv")[0], 0)
+        self.assertEqual(DataManager("test_zwierzeta.json", "test_adopcje.json").animals["2"].name, "Mruczek")
+        self.assertEqual(self.run_cli("chart", "test_wykres.png", "--data", "Gatunki")[0], 0)
+        self.assertTrue(os.path.exists("test_wykres.png"))
+
+    # Testuje przechowywanie danych w bazie SQLite wybranej opcją --sqlite oraz import i eksport plików JSON
+    def test_cli_sqlite(self):
+        with open("test_zwierzeta.csv", 'w', encoding='utf-8') as f:
+            f.write("ID;Imię;Wiek;Gatunek;Zaszczepione;Ostatnie karmienie;Data przyjęcia;Status\n")
+            f.write("1;Reksio;5;Pies;Tak;;2025-06-19 02:00:00;W schronisku\n")
+        self.assertEqual(self.run_cli("--sqlite", "test_schronisko.db", "import-animals", "test_zwierzeta.csv")[0], 0)
+        self.assertFalse(os.path.exists("test_zwierzeta.json"))
+        self.assertIn("Zwierzęta: 1", self.run_cli("--sqlite", "test_schronisko.db", "stats")[1])
+        self.assertEqual(self.run_cli("--sqlite", "test_schronisko.db", "export-json")[0], 0)
+        self.assertEqual(DataManager("test_zwierzeta.json", "test_adopcje.json").animals["1"].name, "Reksio")
+        os.remove("test_schronisko.db")
+        self.assertEqual(self.run_cli("--sqlite", "test_schronisko.db", "import-json")[0], 0)
+        self.assertIn("Zwierzęta: 1", self.run_cli("--sqlite", "test_schronisko.db", "stats")[1])
+
+    # Testuje, czy wiersz poleceń nie importuje tkinter
+    def test_cli_without_tkinter(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-c", "import sys, cli; print('tkinter' in sys.modules)"], cwd=root, capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(), "False")
+
+# Testy zestawu pomiarów wydajności: małe dane, bez pomiarów interfejsu
+class TestBenchmark(unittest.TestCase):
+    def tearDown(self):
+        if os.path.exists("test_benchmark.json"):
+            os.remove("test_benchmark.json")
+
+    # Testuje wykonanie wybranych pomiarów oraz zapis i porównanie z plikiem bazowym
+    def test_benchmark_baseline(self):
+        results = benchmark.Benchmark([50], repeat=1, gui=False, only=["save_animals", "search_animals"], output=lambda line: None).run()
+        self.assertEqual([result["name"] for result in results][:2], ["save_animals", "search_animals_animal_id"])
+        self.assertTrue(all(result["size"] == 50 and result["seconds"] > 0 and result["peak_memory"] is not None for result in results))
+        benchmark.save_baseline("test_benchmark.json", results)
+        self.assertEqual(benchmark.compare_baseline("test_benchmark.json", results, output=lambda line: None), [])
+        slower = [dict(result, seconds=result["seconds"] * 2) for result in results]
+        self.assertEqual(len(benchmark.compare_baseline("test_benchmark.json", slower, output=lambda line: None)), len(results))
+
+# Testy pomiarów czasu operacji: działają bez ekranu, więc nie tworzą okna Tk
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        instrumentation.reset()
+        instrumentation.enable()
+
+    def tearDown(self):
+        instrumentation.enable(False)
+        instrumentation.reset()
+        for filename in ("test_zwierzeta.json", "test_adopcje.json", "test_pomiary.json"):
+            for suffix in ("", ".journal", ".bak"):
+                if os.path.exists(filename + suffix):
+                    os.remove(filename + suffix)
+
+    # Testuje zliczanie czasu, wierszy i bajtów operacji oraz zapis raportu do pliku
+    def test_instrumentation_report(self):
+        data_manager = DataManager("test_zwierzeta.json", "test_adopcje.json", journal=True)
+        data_manager.set_animal(Dog("1", "Reksio", 5))
+        data_manager.set_animal(Cat("2", "Mruczek", 3))
+        data_manager.search_animals(name="reks")
+        summary = instrumentation.summary()
+        self.assertEqual(summary["DataManager.set_animal"]["count"], 2)
+        self.assertEqual(summary["DataManager.set_animal"]["rows"], 2)
+        self.assertGreater(summary["DataManager.set_animal"]["bytes"], 0)
+        self.assertEqual(summary["JsonStorage.update_animals"]["bytes"], summary["DataManager.set_animal"]["bytes"])
+        self.assertEqual(summary["DataManager.search_animals"]["rows"], 1)
+        self.assertIn("DataManager.set_animal", instrumentation.report())
+        instrumentation.export("test_pomiary.json")
+        with open("test_pomiary.json", 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["DataManager.set_animal"]["count"], 2)
+
+    # Testuje, czy wyłączone pomiary niczego nie zapisują
+    def test_instrumentation_disabled(self):
+        instrumentation.enable(False)
+        DataManager("test_zwierzeta.json", "test_adopcje.json").search_animals(name="reks")
+        self.assertEqual(instrumentation.summary(), {})
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
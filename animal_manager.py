@@ -1,7 +1,61 @@
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping, ItemsView, ValuesView
 from datetime import datetime, timedelta
 
-# Bazowa klasa dla zwierząt
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+EPOCH = datetime(1970, 1, 1)
+SECOND = timedelta(seconds=1)
+NO_TIMESTAMP = -2 ** 63
+INVALID_TIMESTAMP = NO_TIMESTAMP + 1
+VACCINATED = 1
+ADOPTED = 2
+
+# Zamienia datę w formacie "RRRR-MM-DD GG:MM:SS" na liczbę sekund od 1970 roku;
+# inne zapisy akceptowane przez strptime są sprawdzane wolniejszą ścieżką
+def parse_timestamp(text):
+    if len(text) == 19 and text[4] == text[7] == "-" and text[10] == " " and text[13] == text[16] == ":":
+        try:
+            return (datetime.fromisoformat(text) - EPOCH) // SECOND
+        except ValueError:
+            pass
+    return (datetime.strptime(text, TIMESTAMP_FORMAT) - EPOCH) // SECOND
+
+# Zamienia liczbę sekund od 1970 roku na datę w formacie tekstowym (None, gdy brak daty)
+def format_timestamp(seconds):
+    if seconds is None:
+        return None
+    return (EPOCH + timedelta(seconds=seconds)).isoformat(" ")
+
+# Zwraca datę adopcji w formacie tekstowym; data w nieprawidłowym formacie (zachowana w invalid_dates) jest zwracana
+# w pierwotnej postaci, a brak daty jako pusty tekst
+def format_adoption_date(adoption):
+    invalid_dates = adoption.get("invalid_dates")
+    if invalid_dates:
+        return invalid_dates["adoption_date"]
+    return format_timestamp(adoption["adoption_date"]) or ""
+
+# Zamienia obiekt datetime na liczbę sekund od 1970 roku
+def to_timestamp(moment):
+    return (moment - EPOCH) // SECOND
+
+# Zwraca bieżący czas jako liczbę sekund od 1970 roku
+def now_timestamp():
+    return to_timestamp(datetime.now())
+
+# Sprawdza, czy tekst jest ID w postaci, w jakiej ID są przechowywane w magazynie: liczba bez zer wiodących i innych znaków
+def is_canonical_id(text):
+    return isinstance(text, str) and text.isascii() and text.isdigit() and str(int(text)) == text
+
+# Zwraca klucz sortowania dla znacznika czasu, w którym brak daty jest najwcześniejszy
+def timestamp_key(seconds):
+    return NO_TIMESTAMP if seconds is None else seconds
+
+# Bazowa klasa dla zwierząt; daty przechowywane jako liczby sekund, formatowane dopiero przy odczycie
 class Animal:
+    __slots__ = ("id", "name", "age", "is_adopted", "is_vaccinated", "last_fed_ts", "admission_ts", "invalid_dates")
+
     # Inicjalizacja zwierzęcia z podstawowymi atrybutami
     def __init__(self, id, name, age):
         self.id = id
@@ -9,41 +63,275 @@ class Animal:
         self.age = age
         self.is_adopted = False
         self.is_vaccinated = False
-        self.last_fed = None
-        self.admission_date = None
+        self.last_fed_ts = None
+        self.admission_ts = None
+        self.invalid_dates = None
 
-    # Zwraca status ostatniego karmienia
-    def get_feeding_status(self):
-        if not self.last_fed:
-            return "Brak danych"
+    # Zwraca datę ostatniego karmienia w formacie tekstowym
+    @property
+    def last_fed(self):
+        return self.format_date("last_fed", self.last_fed_ts)
+
+    # Ustawia datę ostatniego karmienia z tekstu
+    @last_fed.setter
+    def last_fed(self, text):
+        self.last_fed_ts = self.parse_date("last_fed", text)
+
+    # Zwraca datę przyjęcia w formacie tekstowym
+    @property
+    def admission_date(self):
+        return self.format_date("admission_date", self.admission_ts)
+
+    # Ustawia datę przyjęcia z tekstu
+    @admission_date.setter
+    def admission_date(self, text):
+        self.admission_ts = self.parse_date("admission_date", text)
+
+    # Zamienia tekst daty na liczbę sekund, zachowując osobno tekst w nieprawidłowym formacie
+    def parse_date(self, field, text):
+        if self.invalid_dates:
+            self.invalid_dates.pop(field, None)
+        if not text:
+            return None
         try:
-            last_fed_time = datetime.strptime(self.last_fed, "%Y-%m-%d %H:%M:%S")
-            delta = datetime.now() - last_fed_time
-            hours = int(delta.total_seconds() // 3600)
-            return f"{hours} godziny temu"
+            return parse_timestamp(text)
         except ValueError:
-            return "Nieprawidłowy format daty"
+            self.invalid_dates = self.invalid_dates or {}
+            self.invalid_dates[field] = text
+            return None
+
+    # Zwraca tekst daty dla liczby sekund lub zachowany tekst w nieprawidłowym formacie
+    def format_date(self, field, seconds):
+        if seconds is not None:
+            return format_timestamp(seconds)
+        return self.invalid_dates.get(field) if self.invalid_dates else None
+
+    # Zwraca status ostatniego karmienia; now pozwala policzyć bieżący czas raz dla wielu zwierząt
+    def get_feeding_status(self, now=None):
+        if self.last_fed_ts is None:
+            return "Nieprawidłowy format daty" if self.invalid_dates and "last_fed" in self.invalid_dates else "Brak danych"
+        hours = ((now_timestamp() if now is None else now) - self.last_fed_ts) // 3600
+        return f"{hours} godziny temu"
 
 # Klasa dla psów, dziedzicząca po Animal
 class Dog(Animal):
-    pass
+    __slots__ = ()
 
 # Klasa dla kotów, dziedzicząca po Animal
 class Cat(Animal):
-    pass
+    __slots__ = ()
 
 # Klasa dla ptaków, dziedzicząca po Animal
 class Bird(Animal):
-    pass
+    __slots__ = ()
 
 # Klasa dla królików, dziedzicząca po Animal
 class Rabbit(Animal):
-    pass
+    __slots__ = ()
 
 # Klasa dla chomików, dziedzicząca po Animal
 class Hamster(Animal):
-    pass
+    __slots__ = ()
 
 # Klasa dla żółwi, dziedzicząca po Animal
 class Turtle(Animal):
-    pass
\ No newline at end of file
+    __slots__ = ()
+
+# Rejestr gatunków: tabele indeksowane kodem gatunku (zapisywanym w kolumnach magazynu i w migawce binarnej)
+# oraz słowniki klasa -> kod i nazwa -> klasa
+SPECIES_CLASSES = []
+SPECIES_NAMES = []
+SPECIES_PLURALS = []
+SPECIES_CODES = {}
+SPECIES_BY_NAME = {}
+
+# Dodaje gatunek do rejestru i zapisuje w jego klasie kod oraz nazwy; kody są nadawane kolejno,
+# więc nowe gatunki należy dopisywać na końcu listy, aby nie zmienić kodów w istniejących migawkach
+def register_species(cls, name, plural):
+    cls.species_code = len(SPECIES_CLASSES)
+    cls.species_name = name
+    cls.species_plural = plural
+    SPECIES_CLASSES.append(cls)
+    SPECIES_NAMES.append(name)
+    SPECIES_PLURALS.append(plural)
+    SPECIES_CODES[cls] = cls.species_code
+    SPECIES_BY_NAME[name] = cls
+    return cls
+
+for cls, name, plural in ((Dog, "Pies", "Psy"), (Cat, "Kot", "Koty"), (Bird, "Ptak", "Ptaki"),
+                          (Rabbit, "Królik", "Króliki"), (Hamster, "Chomik", "Chomiki"), (Turtle, "Żółw", "Żółwie")):
+    register_species(cls, name, plural)
+
+# Kolumnowy magazyn zwierząt: dane trzymane w tablicach typowanych posortowanych po ID,
+# a obiekty Dog, Cat itd. tworzone dopiero przy odczycie
+class AnimalStore(MutableMapping):
+    # Inicjalizacja pustych kolumn i opcjonalne wczytanie zwierząt ze słownika
+    def __init__(self, animals=None):
+        self.ids = array('q')
+        self.species = array('B')
+        self.ages = array('q')
+        self.flags = array('B')
+        self.last_fed = array('q')
+        self.admission_dates = array('q')
+        self.names = []
+        self.invalid_dates = {}
+        if animals:
+            self.fill(animals)
+
+    # Wypełnia pusty magazyn zwierzętami z mapowania w dowolnej kolejności: ID są sortowane raz, a kolumny
+    # wypełniane jednym przebiegiem, bez wstawiania każdego wiersza w środek tablic
+    def fill(self, animals):
+        keys = {int(key): key for key in animals}
+        for animal_id in sorted(keys):
+            self.ids.append(animal_id)
+            for column, value in self.column_values(animal_id, animals[keys[animal_id]]):
+                column.append(value)
+
+    # Zwraca numer wiersza zwierzęcia o podanym ID lub -1, gdy go nie ma
+    def find(self, key):
+        try:
+            animal_id = int(key)
+        except (TypeError, ValueError):
+            return -1
+        row = bisect_left(self.ids, animal_id)
+        return row if row < len(self.ids) and self.ids[row] == animal_id else -1
+
+    # Zwraca zwierzę o podanym ID jako obiekt odpowiedniego gatunku
+    def __getitem__(self, key):
+        row = self.find(key)
+        if row < 0:
+            raise KeyError(key)
+        return self.make_animal(row)
+
+    # Zapisuje zwierzę w kolumnach, nadpisując istniejący wiersz lub wstawiając nowy w kolejności ID
+    def __setitem__(self, key, animal):
+        self.materialize()
+        animal_id = int(key)
+        row = bisect_left(self.ids, animal_id)
+        values = self.column_values(animal_id, animal)
+        if row < len(self.ids) and self.ids[row] == animal_id:
+            for column, value in values:
+                column[row] = value
+        else:
+            self.ids.insert(row, animal_id)
+            for column, value in values:
+                column.insert(row, value)
+
+    # Zwraca pary (kolumna, wartość) wiersza zwierzęcia, bez kolumny ID
+    def column_values(self, animal_id, animal):
+        flags = (VACCINATED if animal.is_vaccinated else 0) | (ADOPTED if animal.is_adopted else 0)
+        return (
+            (self.species, animal.species_code),
+            (self.ages, animal.age),
+            (self.flags, flags),
+            (self.last_fed, self.encode_timestamp(animal_id, "last_fed", animal.last_fed_ts, animal.invalid_dates)),
+            (self.admission_dates, self.encode_timestamp(animal_id, "admission_date", animal.admission_ts, animal.invalid_dates)),
+            (self.names, sys.intern(animal.name))
+        )
+
+    # Usuwa wiersz zwierzęcia ze wszystkich kolumn
+    def __delitem__(self, key):
+        self.materialize()
+        row = self.find(key)
+        if row < 0:
+            raise KeyError(key)
+        animal_id = self.ids[row]
+        for column in (self.ids, self.species, self.ages, self.flags, self.last_fed, self.admission_dates, self.names):
+            del column[row]
+        self.invalid_dates.pop((animal_id, "last_fed"), None)
+        self.invalid_dates.pop((animal_id, "admission_date"), None)
+
+    # Kopiuje kolumny wskazujące na zmapowaną migawkę do zwykłych tablic, aby można je było zmieniać
+    def materialize(self):
+        for name in ("ids", "species", "ages", "flags", "last_fed", "admission_dates"):
+            column = getattr(self, name)
+            if not isinstance(column, array):
+                copy = array(column.format)
+                copy.frombytes(column.cast("B"))
+                setattr(self, name, copy)
+        if not isinstance(self.names, list):
+            self.names = list(self.names)
+
+    # Sprawdza obecność ID bez tworzenia obiektu zwierzęcia
+    def __contains__(self, key):
+        return self.find(key) >= 0
+
+    # Zwraca ID zwierząt w kolejności rosnącej
+    def __iter__(self):
+        return (str(animal_id) for animal_id in self.ids)
+
+    # Zwraca liczbę zwierząt
+    def __len__(self):
+        return len(self.ids)
+
+    # Zwraca krotki (ID, imię, wiek, klasa gatunku, zaszczepione, adoptowane, data przyjęcia, ostatnie karmienie) wprost z kolumn,
+    # bez tworzenia obiektów zwierząt
+    def rows(self):
+        for animal_id, species, name, age, flags, admission, last_fed in zip(self.ids, self.species, self.names, self.ages, self.flags, self.admission_dates, self.last_fed):
+            yield (animal_id, name, age, SPECIES_CLASSES[species], bool(flags & VACCINATED), bool(flags & ADOPTED),
+                   None if admission <= INVALID_TIMESTAMP else admission, None if last_fed <= INVALID_TIMESTAMP else last_fed)
+
+    # Zwraca krotkę w formacie rows() dla zwierzęcia o podanym ID lub None, gdy go nie ma
+    def row(self, key):
+        row = self.find(key)
+        if row < 0:
+            return None
+        admission = self.admission_dates[row]
+        last_fed = self.last_fed[row]
+        flags = self.flags[row]
+        return (self.ids[row], self.names[row], self.ages[row], SPECIES_CLASSES[self.species[row]], bool(flags & VACCINATED),
+                bool(flags & ADOPTED), None if admission <= INVALID_TIMESTAMP else admission, None if last_fed <= INVALID_TIMESTAMP else last_fed)
+
+    # Zwraca pary (ID, zwierzę) odczytywane kolejno z wierszy
+    def items(self):
+        return AnimalItemsView(self)
+
+    # Zwraca zwierzęta odczytywane kolejno z wierszy
+    def values(self):
+        return AnimalValuesView(self)
+
+    # Tworzy obiekt zwierzęcia na podstawie wiersza kolumn
+    def make_animal(self, row):
+        animal_id = self.ids[row]
+        animal = SPECIES_CLASSES[self.species[row]](str(animal_id), self.names[row], self.ages[row])
+        flags = self.flags[row]
+        animal.is_vaccinated = bool(flags & VACCINATED)
+        animal.is_adopted = bool(flags & ADOPTED)
+        animal.last_fed_ts = self.decode_timestamp(animal, "last_fed", self.last_fed[row])
+        animal.admission_ts = self.decode_timestamp(animal, "admission_date", self.admission_dates[row])
+        return animal
+
+    # Zwraca wartość kolumny dla znacznika czasu, zachowując osobno tekst dat w nieprawidłowym formacie
+    def encode_timestamp(self, animal_id, field, seconds, invalid_dates):
+        self.invalid_dates.pop((animal_id, field), None)
+        if seconds is not None:
+            return seconds
+        if invalid_dates and field in invalid_dates:
+            self.invalid_dates[(animal_id, field)] = invalid_dates[field]
+            return INVALID_TIMESTAMP
+        return NO_TIMESTAMP
+
+    # Zamienia wartość kolumny na znacznik czasu, odtwarzając w zwierzęciu tekst nieprawidłowej daty
+    def decode_timestamp(self, animal, field, seconds):
+        if seconds == NO_TIMESTAMP:
+            return None
+        if seconds == INVALID_TIMESTAMP:
+            animal.invalid_dates = animal.invalid_dates or {}
+            animal.invalid_dates[field] = self.invalid_dates[(int(animal.id), field)]
+            return None
+        return seconds
+
+# Widok par (ID, zwierzę) przechodzący bezpośrednio po wierszach magazynu
+class AnimalItemsView(ItemsView):
+    def __iter__(self):
+        store = self._mapping
+        for row in range(len(store)):
+            animal = store.make_animal(row)
+            yield animal.id, animal
+
+# Widok zwierząt przechodzący bezpośrednio po wierszach magazynu
+class AnimalValuesView(ValuesView):
+    def __iter__(self):
+        store = self._mapping
+        for row in range(len(store)):
+            yield store.make_animal(row)
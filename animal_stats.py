@@ -0,0 +1,36 @@
+from collections import Counter
+from animal_manager import AnimalStore, SPECIES_CLASSES, VACCINATED, ADOPTED
+
+# Liczniki zwierząt według gatunku, szczepienia i statusu adopcji, aktualizowane przy każdej zmianie
+class AnimalStats:
+    # Inicjalizacja liczników i opcjonalne przeliczenie ich dla istniejących zwierząt
+    def __init__(self, animals=None):
+        if isinstance(animals, AnimalStore):
+            self.counts = Counter({(SPECIES_CLASSES[species], bool(flags & VACCINATED), bool(flags & ADOPTED)): n
+                                   for (species, flags), n in Counter(zip(animals.species, animals.flags)).items()})
+        else:
+            self.counts = Counter(self.key(animal) for animal in (animals.values() if animals else ()))
+
+    # Zwraca klucz licznika dla zwierzęcia
+    @staticmethod
+    def key(animal):
+        return animal.__class__, bool(animal.is_vaccinated), bool(animal.is_adopted)
+
+    # Zwiększa licznik dla zwierzęcia
+    def add(self, animal):
+        self.counts[self.key(animal)] += 1
+
+    # Zmniejsza licznik dla zwierzęcia, usuwając klucze z zerową liczbą
+    def remove(self, animal):
+        key = self.key(animal)
+        self.counts[key] -= 1
+        if self.counts[key] <= 0:
+            del self.counts[key]
+
+    # Zwraca liczbę zwierząt spełniających podane warunki (None oznacza brak warunku);
+    # sumuje co najwyżej kilkadziesiąt liczników niezależnie od liczby zwierząt
+    def count(self, species=None, vaccinated=None, adopted=None):
+        return sum(n for (cls, is_vaccinated, is_adopted), n in self.counts.items()
+                   if (species is None or cls == species)
+                   and (vaccinated is None or is_vaccinated == vaccinated)
+                   and (adopted is None or is_adopted == adopted))
@@ -0,0 +1,274 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from animal_manager import Dog, Cat, Bird, Rabbit, Hamster, Turtle, AnimalStore, parse_timestamp
+from animal_stats import AnimalStats
+from data_manager import DataManager
+from report_chart import draw_report
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+SPECIES = [Dog, Cat, Bird, Rabbit, Hamster, Turtle]
+SURNAMES = ["Kowalski", "Nowak", "Wiśniewski", "Wójcik", "Kowalczyk", "Kamiński", "Lewandowski", "Zieliński"]
+ANIMAL_COLUMNS = ("ID", "Imię", "Wiek", "Gatunek", "Zaszczepione", "Ostatnie karmienie", "Data przyjęcia", "Status")
+ADOPTION_COLUMNS = ("ID", "ID zwierzęcia", "Nazwisko", "PESEL", "Numer telefonu", "Data adopcji")
+
+# Tworzy powtarzalny zbiór zwierząt; co drugie zwierzę jest zaszczepione, a co czwarte zwierzę adoptowane
+def make_animals(size):
+    first_day = parse_timestamp("2020-01-01 00:00:00")
+    animals = {}
+    for i in range(1, size + 1):
+        animal = SPECIES[i % len(SPECIES)](str(i), f"Zwierzę{i % 5000}", i % 20)
+        animal.is_vaccinated = i % 2 == 0
+        animal.is_adopted = i % 4 == 0
+        animal.admission_ts = first_day + (i % 2000) * 86400
+        animal.last_fed_ts = animal.admission_ts + 3600
+        animals[animal.id] = animal
+    return AnimalStore(animals)
+
+# Tworzy adopcje wszystkich adoptowanych zwierząt z podanego magazynu
+def make_adoptions(animals):
+    first_day = parse_timestamp("2021-01-01 00:00:00")
+    adoptions = {}
+    for i, animal_id in enumerate(animal_id for animal_id in animals.ids if animal_id % 4 == 0):
+        adoptions[str(i + 1)] = {
+            "animal_id": str(animal_id),
+            "surname": SURNAMES[i % len(SURNAMES)] + str(i % 1000),
+            "pesel": f"{90010100000 + i:011d}",
+            "phone_number": f"{500000000 + i:09d}",
+            "adoption_date": first_day + (i % 1000) * 86400
+        }
+    return adoptions
+
+# Mierzy najkrótszy czas z kilku powtórzeń oraz szczytowe zużycie pamięci w osobnym przebiegu
+# (tracemalloc spowalnia kod, więc nie jest włączony podczas pomiaru czasu)
+def measure(func, repeat, memory):
+    seconds = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return seconds, peak
+
+# Zestaw pomiarów wykonywany w katalogu tymczasowym, aby nie naruszyć danych schroniska
+class Benchmark:
+    # Inicjalizacja z listą rozmiarów danych, liczbą powtórzeń i opcjonalnym filtrem nazw pomiarów
+    def __init__(self, sizes=None, repeat=3, memory=True, gui=True, only=None, output=print):
+        self.sizes = sizes or DEFAULT_SIZES
+        self.repeat = repeat
+        self.memory = memory
+        self.gui = gui
+        self.only = only
+        self.output = output
+        self.results = []
+
+    # Wykonuje wszystkie pomiary dla każdego rozmiaru i zwraca listę wyników
+    def run(self):
+        directory = tempfile.mkdtemp(prefix="schronisko_benchmark_")
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            for size in self.sizes:
+                self.run_size(size)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(directory, ignore_errors=True)
+        return self.results
+
+    # Zapisuje wynik jednego pomiaru (przepustowość liczona w wierszach na sekundę) i wypisuje go
+    def record(self, name, size, rows, func, repeat=None):
+        if self.only and not any(part in name for part in self.only):
+            return
+        seconds, peak = measure(func, repeat or self.repeat, self.memory)
+        result = {
+            "name": name,
+            "size": size,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds else None,
+            "peak_memory": peak
+        }
+        self.results.append(result)
+        self.output(format_result(result))
+
+    # Wykonuje pomiary dla danych o podanej liczbie zwierząt
+    def run_size(self, size):
+        animals = make_animals(size)
+        adoptions = make_adoptions(animals)
+        next_id, next_adoption_id = size + 1, len(adoptions) + 1
+        data_manager = DataManager(f"zwierzeta_{size}.json", f"adopcje_{size}.json", binary=True)
+        data_manager.save_animals(animals, next_id, next_adoption_id)
+        data_manager.save_adoptions(adoptions)
+        self.record("save_animals", size, size, lambda: data_manager.save_animals(data_manager.animals, next_id, next_adoption_id))
+        self.record("save_adoptions", size, len(adoptions), lambda: data_manager.save_adoptions(data_manager.adoptions))
+        self.record("load_json", size, size, lambda: DataManager(f"zwierzeta_{size}.json", f"adopcje_{size}.json"))
+        data_manager.write_binary_snapshot()
+        self.record("load_binary", size, size, lambda: DataManager(f"zwierzeta_{size}.json", f"adopcje_{size}.json", binary=True))
+        self.record("load_binary_lazy", size, size, lambda: DataManager(f"zwierzeta_{size}.json", f"adopcje_{size}.json", binary=True, lazy=True).close())
+        self.record("export_animals_csv", size, size, lambda: data_manager.export_animals_csv(f"zwierzeta_{size}.csv"))
+        self.record("export_adoptions_csv", size, len(adoptions), lambda: data_manager.export_adoptions_csv(f"adopcje_{size}.csv"))
+        self.record("export_animals_csv_gzip", size, size, lambda: data_manager.export_animals_csv(f"zwierzeta_{size}.csv.gz"))
+        importer = DataManager(f"import_zwierzeta_{size}.json", f"import_adopcje_{size}.json", journal=True)
+        self.record("import_animals_csv", size, size, lambda: importer.import_animals_csv(f"zwierzeta_{size}.csv"))
+        self.record("import_adoptions_csv", size, len(adoptions), lambda: importer.import_adoptions_csv(f"adopcje_{size}.csv"))
+        self.run_search(data_manager, size, len(adoptions))
+        self.record("report_stats", size, size, lambda: AnimalStats(data_manager.animals))
+        self.run_report(data_manager, size)
+        if self.gui:
+            self.run_gui(data_manager, size)
+
+    # Mierzy budowę indeksów oraz wyszukiwanie po każdym filtrze osobno i po wszystkich naraz
+    def run_search(self, data_manager, size, adoption_count):
+        first_day, last_day = parse_timestamp("2021-01-01 00:00:00"), parse_timestamp("2021-12-31 23:59:59")
+        self.record("build_animal_index", size, size, lambda: data_manager.index_animals(data_manager.animals) or data_manager.animal_index, repeat=1)
+        self.record("build_adoption_index", size, adoption_count, lambda: data_manager.index_adoptions() or data_manager.adoption_index, repeat=1)
+        animal_filters = {
+            "animal_id": {"animal_id": str(size // 2)},
+            "name": {"name": "wierzę12"},
+            "age": {"age": 7},
+            "species": {"species": Cat},
+            "vaccinated": {"vaccinated": True},
+            "adopted": {"adopted": False},
+            "admission": {"admission_from": first_day, "admission_to": last_day},
+            "all": {"name": "zwierz", "age": 4, "species": Hamster, "vaccinated": True, "adopted": False,
+                    "admission_from": first_day, "admission_to": last_day}
+        }
+        for name, filters in animal_filters.items():
+            self.record(f"search_animals_{name}", size, size, lambda: data_manager.search_animals(**filters))
+        self.record("overdue_feeding", size, size, lambda: data_manager.overdue_feeding(24, now=first_day))
+        adoption_filters = {
+            "adoption_id": {"adoption_id": "1"},
+            "animal_id": {"animal_id": "4"},
+            "surname": {"surname": "nowak1"},
+            "pesel": {"pesel": "9001010"},
+            "phone_number": {"phone_number": "50000"},
+            "adoption": {"adoption_from": first_day, "adoption_to": last_day},
+            "all": {"surname": "kowal", "pesel": "900", "phone_number": "5", "adoption_from": first_day, "adoption_to": last_day}
+        }
+        for name, filters in adoption_filters.items():
+            self.record(f"search_adoptions_{name}", size, adoption_count, lambda: data_manager.search_adoptions(**filters))
+
+    # Mierzy narysowanie i zapis wykresów raportu bez użycia Tk
+    def run_report(self, data_manager, size):
+        from matplotlib.figure import Figure
+        for chart_data in ("Szczepienia", "Gatunki"):
+            for chart_type in ("Słupkowy", "Kołowy"):
+                def draw():
+                    fig = Figure(figsize=(6, 4))
+                    draw_report(fig.subplots(), data_manager.animal_stats, chart_data, chart_type)
+                    fig.savefig(f"wykres_{size}.png")
+                self.record(f"report_{chart_data}_{chart_type}", size, size, draw)
+
+    # Mierzy sortowanie i odświeżanie tabel aplikacji; pomija pomiary, gdy nie ma dostępnego ekranu
+    def run_gui(self, data_manager, size):
+        try:
+            import tkinter as tk
+            root = tk.Tk()
+        except Exception as e:
+            self.output(f"Pominięto pomiary interfejsu: {e}")
+            self.gui = False
+            return
+        from main import ShelterApp
+        for source, target in ((data_manager.animals_filename, "zwierzeta.json"), (data_manager.adoptions_filename, "adopcje.json")):
+            shutil.copyfile(source, target)
+        for filename in ("zwierzeta.bin", "zwierzeta.json.journal", "adopcje.json.journal"):
+            if os.path.exists(filename):
+                os.remove(filename)
+        app = ShelterApp(root)
+        try:
+            self.record("refresh_animals_tree", size, size, app.refresh_animals_tree)
+            self.record("refresh_adoptions_tree", size, len(app.adoptions), app.refresh_adoptions_tree)
+            for column in ANIMAL_COLUMNS:
+                self.record(f"sort_animals_{column}", size, size, lambda: app.sort_column(column, False), repeat=1)
+            for column in ADOPTION_COLUMNS:
+                self.record(f"sort_adoptions_{column}", size, len(app.adoptions), lambda: app.sort_column(column, True), repeat=1)
+        finally:
+            app.close()
+
+# Zwraca wynik pomiaru w postaci jednego wiersza tekstu
+def format_result(result):
+    throughput = f"{result['rows_per_second']:>14,.0f} wierszy/s" if result["rows_per_second"] else " " * 24
+    memory = f"{result['peak_memory'] / 2 ** 20:>9.1f} MiB" if result["peak_memory"] is not None else ""
+    return f"{result['name']:<32} {result['size']:>9} {result['seconds'] * 1000:>11.2f} ms {throughput} {memory}"
+
+# Zwraca skrót bieżącego commita lub None poza repozytorium git
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Zapisuje wyniki jako plik bazowy JSON razem z opisem środowiska
+def save_baseline(filename, results):
+    baseline = {
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+
+# Porównuje wyniki z plikiem bazowym i zwraca listę opisów pomiarów wolniejszych o więcej niż tolerance
+def compare_baseline(filename, results, tolerance=0.25, output=print):
+    with open(filename, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(result["name"], result["size"]): result for result in baseline["results"]}
+    output(f"Porównanie z {filename} (commit {baseline.get('commit') or '?'}):")
+    regressions = []
+    for result in results:
+        old = previous.get((result["name"], result["size"]))
+        if not old or not old["seconds"]:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        line = f"{result['name']:<32} {result['size']:>9} {ratio:>7.2f}x"
+        if ratio > 1 + tolerance:
+            line += " REGRESJA"
+            regressions.append(line.strip())
+        output(line)
+    return regressions
+
+# Tworzy parser argumentów zestawu pomiarów
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmark.py", description="Pomiary wydajności danych i interfejsu schroniska")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="liczby zwierząt, np. 1000 10000 100000 1000000")
+    parser.add_argument("--repeat", type=int, default=3, help="liczba powtórzeń pomiaru czasu")
+    parser.add_argument("--only", nargs="+", help="mierzy tylko pomiary, których nazwa zawiera podany tekst")
+    parser.add_argument("--no-memory", action="store_true", help="pomija pomiar szczytowego zużycia pamięci")
+    parser.add_argument("--no-gui", action="store_true", help="pomija pomiary tabel aplikacji")
+    parser.add_argument("--save", help="zapisuje wyniki do pliku bazowego JSON")
+    parser.add_argument("--compare", help="porównuje wyniki z plikiem bazowym JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="dopuszczalne spowolnienie względem pliku bazowego")
+    return parser
+
+# Uruchamia pomiary i zwraca kod wyjścia: 1, gdy porównanie wykazało regresje
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    benchmark = Benchmark(args.sizes, args.repeat, not args.no_memory, not args.no_gui, args.only)
+    results = benchmark.run()
+    if args.save:
+        save_baseline(args.save, results)
+    if args.compare:
+        return 1 if compare_baseline(args.compare, results, args.tolerance) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import argparse
+import sys
+from data_manager import DataManager
+from storage import SqliteStorage
+from decorators import instrumentation
+from animal_manager import SPECIES_CLASSES
+from report_chart import draw_report
+
+# Tworzy parser argumentów z poleceniami do importu, eksportu, raportów i konserwacji danych
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Obsługa danych schroniska bez interfejsu graficznego")
+    parser.add_argument("--animals", default="zwierzeta.json", help="plik JSON ze zwierzętami")
+    parser.add_argument("--adoptions", default="adopcje.json", help="plik JSON z adopcjami")
+    parser.add_argument("--sqlite", help="baza SQLite używana zamiast plików JSON (pliki JSON służą wtedy do importu i eksportu)")
+    parser.add_argument("--metrics", help="zapisuje czasy operacji do pliku (JSON dla rozszerzenia .json, inaczej tabela)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("import-animals", "importuje zwierzęta z pliku CSV"), ("import-adoptions", "importuje adopcje z pliku CSV")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("file")
+        command.add_argument("--append", action="store_true", help="dopisuje dane zamiast je zastępować")
+        command.add_argument("--workers", type=int, default=0, help="liczba procesów sprawdzających wiersze")
+        command.add_argument("--chunk-size", type=int, default=1000, help="liczba wierszy w jednej partii zapisu")
+    for name, help_text in (("export-animals", "eksportuje zwierzęta do pliku CSV (.csv.gz lub .csv.zst z kompresją)"), ("export-adoptions", "eksportuje adopcje do pliku CSV (.csv.gz lub .csv.zst z kompresją)")):
+        commands.add_parser(name, help=help_text).add_argument("file")
+    commands.add_parser("import-json", help="wczytuje dane z plików JSON (--animals, --adoptions), zastępując bieżące")
+    commands.add_parser("export-json", help="zapisuje bieżące dane do plików JSON (--animals, --adoptions)")
+    commands.add_parser("compact", help="zapisuje pełne migawki i czyści dzienniki zmian")
+    commands.add_parser("stats", help="wypisuje statystyki zwierząt i adopcji")
+    chart = commands.add_parser("chart", help="zapisuje wykres statystyk do pliku PNG")
+    chart.add_argument("file")
+    chart.add_argument("--data", choices=["Szczepienia", "Gatunki"], default="Szczepienia")
+    chart.add_argument("--type", choices=["Słupkowy", "Kołowy"], default="Słupkowy")
+    return parser
+
+# Wypisuje statystyki zwierząt w schronisku i liczbę adopcji
+def print_stats(data_manager):
+    stats = data_manager.animal_stats
+    print(f"Zwierzęta: {stats.count()} (w schronisku: {stats.count(adopted=False)}, adoptowane: {stats.count(adopted=True)})")
+    print(f"Zaszczepione w schronisku: {stats.count(vaccinated=True, adopted=False)}, niezaszczepione: {stats.count(vaccinated=False, adopted=False)}")
+    print("Gatunki w schronisku: " + ", ".join(f"{cls.species_plural}: {stats.count(species=cls, adopted=False)}" for cls in SPECIES_CLASSES))
+    print(f"Adopcje: {len(data_manager.adoptions)}")
+
+# Zapisuje wykres do pliku PNG bez użycia Tk (matplotlib jest importowany dopiero tutaj)
+def save_chart(data_manager, file_path, chart_data, chart_type):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(6, 4))
+    draw_report(fig.subplots(), data_manager.animal_stats, chart_data, chart_type)
+    fig.tight_layout()
+    fig.savefig(file_path)
+
+# Wykonuje polecenie i zwraca kod wyjścia: 0 przy powodzeniu, 1 gdy wystąpiły błędy
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.metrics:
+        instrumentation.enable()
+    errors = []
+    storage = SqliteStorage(args.sqlite) if args.sqlite else None
+    data_manager = DataManager(args.animals, args.adoptions, journal=True, storage=storage, on_error=errors.append, binary=True)
+    try:
+        if args.command == "import-animals":
+            errors.extend(data_manager.import_animals_csv(args.file, not args.append, args.chunk_size, workers=args.workers))
+        elif args.command == "import-adoptions":
+            errors.extend(data_manager.import_adoptions_csv(args.file, not args.append, args.chunk_size, workers=args.workers))
+        elif args.command == "export-animals":
+            data_manager.export_animals_csv(args.file)
+        elif args.command == "export-adoptions":
+            data_manager.export_adoptions_csv(args.file)
+        elif args.command == "import-json":
+            data_manager.import_json()
+        elif args.command == "export-json":
+            data_manager.export_json()
+        elif args.command == "compact":
+            data_manager.compact()
+        elif args.command == "stats":
+            print_stats(data_manager)
+        elif args.command == "chart":
+            save_chart(data_manager, args.file, args.data, args.type)
+    finally:
+        data_manager.close()
+        if args.metrics:
+            instrumentation.export(args.metrics)
+    for error in errors:
+        print(error, file=sys.stderr)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import csv
+import gzip
+import io
+from datetime import timedelta
+from itertools import islice
+from animal_manager import AnimalStore, VACCINATED, ADOPTED, NO_TIMESTAMP, INVALID_TIMESTAMP, EPOCH
+
+BUFFER_SIZE = 1 << 20
+COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+# Zwraca rodzaj kompresji wynikający z rozszerzenia pliku ("gzip", "zstd") lub None dla zwykłego pliku
+def compression_for(file_path):
+    for extension, compression in COMPRESSIONS.items():
+        if file_path.lower().endswith(extension):
+            return compression
+    return None
+
+# Otwiera plik CSV do zapisu tekstu z dużym buforem i opcjonalną kompresją gzip lub zstd;
+# zstd wymaga modułu zstandard, więc jest importowany dopiero tutaj
+def open_csv_output(file_path, compression=None):
+    if compression is None:
+        return open(file_path, 'w', newline='', encoding='utf-8', buffering=BUFFER_SIZE)
+    if compression == "gzip":
+        stream = gzip.open(file_path, 'wb', compresslevel=6)
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Kompresja zstd wymaga modułu zstandard")
+        stream = zstandard.ZstdCompressor().stream_writer(open(file_path, 'wb'), closefd=True)
+    else:
+        raise ValueError(f"Nieznany rodzaj kompresji: {compression}")
+    return io.TextIOWrapper(io.BufferedWriter(stream, BUFFER_SIZE), encoding='utf-8', newline='')
+
+# Zwraca funkcję formatującą znaczniki czasu tak jak format_timestamp; zapamiętuje tekst dnia i godziny,
+# bo w eksporcie te same dni i pory powtarzają się w wielu wierszach (najwyżej 86400 różnych godzin)
+def timestamp_formatter():
+    days = {}
+    clocks = {}
+    def format(seconds):
+        if seconds is None:
+            return None
+        day, rest = divmod(seconds, 86400)
+        date = days.get(day)
+        if date is None:
+            date = days[day] = (EPOCH + timedelta(days=day)).date().isoformat() + " "
+        clock = clocks.get(rest)
+        if clock is None:
+            hours, minutes = divmod(rest, 3600)
+            clock = clocks[rest] = "%02d:%02d:%02d" % (hours, *divmod(minutes, 60))
+        return date + clock
+    return format
+
+# Zapisuje nagłówek i wiersze CSV partiami po batch_size wierszy i zwraca liczbę zapisanych wierszy
+def write_csv(f, headers, rows, batch_size=10000):
+    writer = csv.writer(f, delimiter=';')
+    writer.writerow(headers)
+    count = 0
+    while batch := list(islice(rows, batch_size)):
+        writer.writerows(batch)
+        count += len(batch)
+    return count
+
+# Zwraca wiersze CSV zwierząt wprost z kolumn magazynu, który jest już uporządkowany po ID;
+# species_labels to nazwy gatunków indeksowane kodem gatunku (SPECIES_NAMES)
+def animal_csv_rows(animals, species_labels):
+    store = animals if isinstance(animals, AnimalStore) else AnimalStore(animals)
+    invalid_dates = store.invalid_dates
+    format_timestamp = timestamp_formatter()
+    def date(animal_id, field, seconds):
+        if seconds == NO_TIMESTAMP:
+            return ""
+        if seconds == INVALID_TIMESTAMP:
+            return invalid_dates[(animal_id, field)]
+        return format_timestamp(seconds)
+    for animal_id, name, age, species, flags, last_fed, admission in zip(
+            store.ids, store.names, store.ages, store.species, store.flags, store.last_fed, store.admission_dates):
+        yield (
+            animal_id, name, age, species_labels[species],
+            "Tak" if flags & VACCINATED else "Nie",
+            date(animal_id, "last_fed", last_fed),
+            date(animal_id, "admission_date", admission),
+            "Adoptowane" if flags & ADOPTED else "W schronisku"
+        )
+
+# Zwraca wiersze CSV adopcji w kolejności ID; adopcje dodawane z rosnącymi ID (oraz zmapowana migawka)
+# są już uporządkowane, więc sortowanie odbywa się tylko wtedy, gdy kolejność została zaburzona
+def adoption_csv_rows(adoptions):
+    keys = [int(adoption_id) for adoption_id in adoptions]
+    items = adoptions.items()
+    if any(a > b for a, b in zip(keys, islice(keys, 1, None))):
+        items = sorted(items, key=lambda item: int(item[0]))
+    format_timestamp = timestamp_formatter()
+    for adoption_id, adoption in items:
+        invalid_dates = adoption.get("invalid_dates")
+        yield (
+            adoption_id, adoption["animal_id"], adoption["surname"], adoption["pesel"], adoption["phone_number"],
+            invalid_dates["adoption_date"] if invalid_dates else format_timestamp(adoption["adoption_date"]) or ""
+        )
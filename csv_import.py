@@ -0,0 +1,170 @@
+import csv
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from animal_manager import parse_timestamp, is_canonical_id
+
+ANIMAL_CSV_HEADERS = ["ID", "Imię", "Wiek", "Gatunek", "Zaszczepione", "Ostatnie karmienie", "Data przyjęcia", "Status"]
+ADOPTION_CSV_HEADERS = ["ID", "ID zwierzęcia", "Nazwisko", "PESEL", "Numer telefonu", "Data adopcji"]
+
+# Zwraca kolejne wiersze pliku CSV z numerami wierszy, czytając plik tylko raz
+def read_csv_rows(f, start=1):
+    return enumerate(csv.reader(f, delimiter=';'), start=start)
+
+# Sprawdza wiersz CSV zwierzęcia i zwraca jego ID, obiekt zwierzęcia oraz listę błędów (także dla wyjątków)
+def parse_animal_row(row, species_map):
+    row_errors = []
+    try:
+        animal_id = row[0].strip()
+        name = row[1].strip()
+        age = int(row[2].strip()) if row[2].strip() else 0
+        species = row[3].strip()
+        is_vaccinated = row[4].strip().lower() == "tak"
+        last_fed = row[5].strip() if row[5].strip() else None
+        admission_date = row[6].strip() if row[6].strip() else None
+        is_adopted = row[7].strip().lower() == "adoptowane"
+        if not is_canonical_id(animal_id):
+            row_errors.append(f"Nieprawidłowe ID zwierzęcia: {animal_id}")
+        if not name:
+            row_errors.append("Imię nie może być puste")
+        if age < 0:
+            row_errors.append("Wiek musi być nieujemny")
+        if species not in species_map:
+            row_errors.append(f"Nieprawidłowy gatunek: {species}")
+        last_fed_ts = None
+        admission_ts = None
+        if last_fed:
+            try:
+                last_fed_ts = parse_timestamp(last_fed)
+            except ValueError:
+                row_errors.append(f"Nieprawidłowy format daty ostatniego karmienia: {last_fed}")
+        if admission_date:
+            try:
+                admission_ts = parse_timestamp(admission_date)
+            except ValueError:
+                row_errors.append(f"Nieprawidłowy format daty przyjęcia: {admission_date}")
+        if row_errors:
+            return animal_id, None, row_errors
+        animal = species_map[species](animal_id, name, age)
+        animal.is_vaccinated = is_vaccinated
+        animal.is_adopted = is_adopted
+        animal.last_fed_ts = last_fed_ts
+        animal.admission_ts = admission_ts
+    except Exception as e:
+        return None, None, [f"Błąd: {str(e)}"]
+    return animal_id, animal, row_errors
+
+# Sprawdza wiersz CSV adopcji i zwraca jej ID, rekord z datą jako liczbą sekund oraz błąd danych i błąd daty
+def parse_adoption_row(row):
+    try:
+        adoption_id = row[0].strip()
+        record = {
+            "animal_id": row[1].strip(),
+            "surname": row[2].strip(),
+            "pesel": row[3].strip(),
+            "phone_number": row[4].strip(),
+            "adoption_date": row[5].strip()
+        }
+    except Exception as e:
+        return None, None, f"Błąd: {str(e)}", None
+    data_error = None
+    date_error = None
+    pesel, phone_number = record["pesel"], record["phone_number"]
+    if not is_canonical_id(adoption_id):
+        data_error = f"Nieprawidłowe ID adopcji: {adoption_id}"
+    elif not is_canonical_id(record["animal_id"]):
+        data_error = f"Nieprawidłowe ID zwierzęcia: {record['animal_id']}"
+    elif not record["surname"] or not pesel.isdigit() or len(pesel) != 11 or not phone_number.isdigit() or len(phone_number) != 9:
+        data_error = "Nieprawidłowe dane: nazwisko niepuste, PESEL 11 cyfr, telefon 9 cyfr"
+    try:
+        record["adoption_date"] = parse_timestamp(record["adoption_date"])
+    except ValueError:
+        date_error = f"Nieprawidłowy format daty adopcji: {record['adoption_date']}"
+    return adoption_id, record, data_error, date_error
+
+# Zwraca sprawdzone wiersze pliku CSV z numerami wierszy (od start) i pozycją w pliku, czytając plik jednym przebiegiem
+def parse_csv_rows(f, parse_row, *args, start=2):
+    for line_number, row in read_csv_rows(f, start=start):
+        yield line_number, f.buffer.tell(), parse_row(row, *args)
+
+# Dzieli plik CSV (bez nagłówka) na zakresy bajtów zaczynające się i kończące na granicy rekordów; zakres jest
+# przedłużany do końca wiersza, po którym liczba cudzysłowów jest parzysta, aby nie przecinać pola w cudzysłowie
+# zawierającego znak nowego wiersza
+def split_csv_ranges(file_path, range_size):
+    size = os.path.getsize(file_path)
+    ranges = []
+    with open(file_path, 'rb') as f:
+        f.readline()
+        start = f.tell()
+        while start < size:
+            quotes = f.read(range_size).count(b'"')
+            line = f.readline()
+            quotes += line.count(b'"')
+            while quotes % 2 and line:
+                line = f.readline()
+                quotes += line.count(b'"')
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+# Sprawdza wiersze z zakresu bajtów pliku CSV; uruchamiane w osobnym procesie; zwraca wyniki i informację,
+# czy zakres kończy się na granicy rekordu (ostatnie pole kończące się znakiem nowego wiersza oznacza,
+# że plik przecięto wewnątrz pola w cudzysłowie)
+def parse_csv_range(file_path, start, end, parse_row, *args):
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    rows = list(csv.reader(io.StringIO(text), delimiter=';'))
+    complete = not (rows and rows[-1] and rows[-1][-1].endswith(("\n", "\r")))
+    return [parse_row(row, *args) for row in rows], complete
+
+# Zwraca sprawdzone wiersze pliku CSV walidowane w puli procesów, w kolejności z pliku i z oryginalnymi numerami wierszy;
+# gdy zakres nie kończy się na granicy rekordu (np. przy cudzysłowie wewnątrz pola bez cudzysłowów), pozostała
+# część pliku jest sprawdzana kolejno, od początku tego zakresu
+def parse_csv_parallel(file_path, workers, parse_row, *args, range_size=4 * 1024 * 1024):
+    line_number = 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        ranges = iter(split_csv_ranges(file_path, range_size))
+        while True:
+            for start, end in ranges:
+                pending.append((start, end, executor.submit(parse_csv_range, file_path, start, end, parse_row, *args)))
+                if len(pending) > workers * 2:
+                    break
+            if not pending:
+                return
+            start, end, future = pending.popleft()
+            results, complete = future.result()
+            if not complete:
+                for _, _, future in pending:
+                    future.cancel()
+                break
+            for result in results:
+                line_number += 1
+                yield line_number, end, result
+    with open(file_path, 'r', encoding='utf-8') as f:
+        f.seek(start)
+        yield from parse_csv_rows(f, parse_row, *args, start=line_number + 1)
+
+# Lista błędów importu ograniczona do podanej liczby komunikatów
+class ImportErrors(list):
+    # Inicjalizacja listy z limitem przechowywanych komunikatów
+    def __init__(self, max_errors):
+        super().__init__()
+        self.max_errors = max_errors
+        self.skipped = 0
+
+    # Dodaje komunikat lub tylko go zlicza, gdy limit został osiągnięty
+    def append(self, message):
+        if len(self) < self.max_errors:
+            super().append(message)
+        else:
+            self.skipped += 1
+
+    # Zwraca listę błędów z podsumowaniem pominiętych komunikatów
+    def finish(self):
+        if self.skipped:
+            super().append(f"Pominięto kolejne błędy: {self.skipped}")
+        return self
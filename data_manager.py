@@ -1,78 +1,470 @@
 import json
-import csv
-from datetime import datetime
-from animal_manager import Animal, Dog, Cat, Bird, Rabbit, Hamster, Turtle
+import os
+import threading
+from collections import ChainMap
+from animal_manager import AnimalStore, SPECIES_BY_NAME, SPECIES_NAMES, parse_timestamp, format_adoption_date, now_timestamp, is_canonical_id
+from storage import JsonStorage, BackgroundStorage
+from search_index import AnimalIndex, AdoptionIndex
+from query import AnimalQuery, AdoptionQuery
+from animal_stats import AnimalStats
+from binary_snapshot import write_snapshot, read_snapshot
+from decorators import log_action, synchronized, count_rows, count_bytes
+from csv_export import compression_for, open_csv_output, write_csv, animal_csv_rows, adoption_csv_rows
+from csv_import import ANIMAL_CSV_HEADERS, ADOPTION_CSV_HEADERS, ImportErrors, read_csv_rows, parse_animal_row, parse_adoption_row, parse_csv_rows, parse_csv_parallel
 
 # Klasa zarządzająca danymi zwierząt i adopcji
 class DataManager:
-    # Inicjalizacja menedżera danych z nazwami plików
-    def __init__(self, animals_filename, adoptions_filename):
+    # Inicjalizacja menedżera danych z nazwami plików JSON i opcjonalnym magazynem danych;
+    # przy background=True zapisy wykonuje osobny wątek, a błędy trafiają do funkcji on_error;
+    # przy binary=True obok plików JSON zapisywana jest migawka binarna, wczytywana, gdy jest aktualna;
+    # przy lazy=True migawka jest mapowana w pamięci, a rekordy dekodowane dopiero przy odczycie;
+    # zmiany danych i wyszukiwanie odbywają się pod blokadą lock, więc wyszukiwanie może działać w osobnym wątku
+    def __init__(self, animals_filename, adoptions_filename, journal=False, compact_threshold=1000, storage=None, background=False, on_error=None, binary=False, lazy=False):
         self.animals_filename = animals_filename
         self.adoptions_filename = adoptions_filename
-        self.animals = {}
+        self.on_error = on_error
+        self.json_storage = None if storage else JsonStorage(animals_filename, adoptions_filename, journal, self.report_error)
+        self.binary_filename = os.path.splitext(animals_filename)[0] + ".bin" if binary and self.json_storage else None
+        self.lazy = lazy
+        self.snapshot = None
+        self.binary_stamps = None
+        self.storage = storage or self.json_storage
+        if background:
+            self.storage = BackgroundStorage(self.storage, self.report_error)
+        self.compact_threshold = compact_threshold
+        self.lock = threading.RLock()
+        self.animals_version = 0
+        self.adoptions_version = 0
+        self.animals = AnimalStore()
         self.adoptions = {}
-        self.species_map = {"Pies": Dog, "Kot": Cat, "Ptak": Bird, "Królik": Rabbit, "Chomik": Hamster, "Żółw": Turtle}
-        self.load_animals()
-        self.load_adoptions()
+        self.index_animals()
+        self.index_adoptions()
+        self.species_map = SPECIES_BY_NAME
+        if not self.load_binary_snapshot():
+            self.load_animals()
+            self.load_adoptions()
+
+    # Wczytuje dane z migawki binarnej, jeśli pliki JSON i dzienniki nie zmieniły się od jej zapisu
+    @log_action
+    def load_binary_snapshot(self):
+        if not self.binary_filename:
+            return False
+        try:
+            animals, adoptions, meta, snapshot = read_snapshot(self.binary_filename, self.lazy)
+        except (OSError, ValueError, KeyError):
+            return False
+        if meta["stamps"] != self.file_stamps():
+            del animals, adoptions
+            if snapshot:
+                snapshot.close()
+            return False
+        self.release_snapshot()
+        self.snapshot = snapshot
+        self.binary_stamps = meta["stamps"]
+        self.animals = animals
+        self.adoptions = adoptions
+        self.index_animals(animals)
+        self.index_adoptions()
+        self.next_id = meta["next_id"]
+        self.next_adoption_id = meta["next_adoption_id"]
+        self.storage.restore_journal_entries(*meta["journal_entries"])
+        count_rows(len(animals) + len(adoptions))
+        return True
+
+    # Zapisuje migawkę binarną bieżących danych po zapisaniu wszystkich zmian w plikach JSON;
+    # pomija zapis, gdy pliki nie zmieniły się od wczytania lub zapisu migawki
+    @log_action
+    def write_binary_snapshot(self):
+        if not self.binary_filename:
+            return
+        self.flush()
+        stamps = self.file_stamps()
+        if stamps == self.binary_stamps:
+            return
+        self.release_snapshot()
+        meta = {
+            "next_id": self.next_id,
+            "next_adoption_id": self.next_adoption_id,
+            "journal_entries": [self.json_storage.animals_journal_entries, self.json_storage.adoptions_journal_entries],
+            "stamps": stamps
+        }
+        try:
+            write_snapshot(self.binary_filename, self.animals, self.adoptions, meta)
+            self.binary_stamps = stamps
+            count_rows(len(self.animals) + len(self.adoptions))
+        except (OSError, ValueError) as e:
+            self.report_error(f"Błąd zapisu migawki binarnej: {e}")
+
+    # Kopiuje dane ze zmapowanej migawki do pamięci i zamyka mapowanie, aby plik można było nadpisać
+    def release_snapshot(self):
+        if self.snapshot is None:
+            return
+        if isinstance(self.animals, AnimalStore):
+            self.animals.materialize()
+        if hasattr(self.adoptions, "materialize"):
+            self.adoptions.materialize()
+        self.snapshot.close()
+        self.snapshot = None
+
+    # Zwraca rozmiar i czas modyfikacji plików JSON i dzienników (None dla brakujących plików)
+    def file_stamps(self):
+        stamps = []
+        for filename in (self.animals_filename, self.adoptions_filename,
+                         self.json_storage.animals_journal_filename, self.json_storage.adoptions_journal_filename):
+            try:
+                stat = os.stat(filename)
+                stamps.append([stat.st_size, stat.st_mtime_ns])
+            except FileNotFoundError:
+                stamps.append(None)
+        return stamps
 
     # Wczytuje dane zwierząt z pliku JSON
+    @log_action
     def load_animals(self):
         try:
-            with open(self.animals_filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.animals = {str(k): self.species_map[v["species"]](str(k), v["name"], v["age"]) for k, v in data["animals"].items()}
-                for k, v in data["animals"].items():
-                    self.animals[str(k)].is_adopted = v["is_adopted"]
-                    self.animals[str(k)].is_vaccinated = v["is_vaccinated"]
-                    self.animals[str(k)].last_fed = v["last_fed"]
-                    self.animals[str(k)].admission_date = v["admission_date"]
-                self.next_id = data.get("next_id", 1)
-                self.next_adoption_id = data.get("next_adoption_id", 1)
-        except (FileNotFoundError, json.JSONDecodeError, KeyError):
-            self.animals = {}
+            records, meta = self.storage.load_animals()
+            animals = AnimalStore({k: self.animal_from_record(k, v) for k, v in records.items()})
+            self.animals = animals
+            self.index_animals(animals)
+            count_rows(len(animals))
+            self.next_id = meta["next_id"]
+            self.next_adoption_id = meta["next_adoption_id"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                self.report_error(f"Błąd odczytu zwierząt: {e}" + self.set_aside(self.animals_filename))
+            self.animals = AnimalStore()
+            self.index_animals()
             self.next_id = 1
             self.next_adoption_id = 1
 
     # Wczytuje dane adopcji z pliku JSON
+    @log_action
     def load_adoptions(self):
         try:
-            with open(self.adoptions_filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.adoptions = {str(k): v for k, v in data.get("adoptions", {}).items()}
-        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            records, next_adoption_id = self.storage.load_adoptions()
+            self.adoptions = {k: self.adoption_from_record(v) for k, v in records.items()}
+            self.index_adoptions()
+            count_rows(len(records))
+            if next_adoption_id:
+                self.next_adoption_id = max(self.next_adoption_id, next_adoption_id)
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                self.report_error(f"Błąd odczytu adopcji: {e}" + self.set_aside(self.adoptions_filename))
             self.adoptions = {}
+            self.index_adoptions()
+
+    # Odkłada pliki JSON, których nie udało się wczytać, jako .corrupt, aby zapis pustych danych ich nie nadpisał,
+    # i zwraca dopisek do komunikatu o błędzie (pusty, gdy nie było czego przenosić)
+    def set_aside(self, filename):
+        moved = self.json_storage.quarantine_files(filename) if self.json_storage else []
+        return f"; pliki przeniesiono: {', '.join(moved)}" if moved else ""
+
+    # Tworzy obiekt zwierzęcia na podstawie rekordu z pliku
+    def animal_from_record(self, animal_id, record):
+        animal = self.species_map[record["species"]](animal_id, record["name"], record["age"])
+        animal.is_adopted = record["is_adopted"]
+        animal.is_vaccinated = record["is_vaccinated"]
+        animal.last_fed = record["last_fed"]
+        animal.admission_date = record["admission_date"]
+        return animal
+
+    # Zamienia obiekt zwierzęcia na rekord zapisywany w pliku
+    def animal_to_record(self, animal):
+        return {
+            "species": animal.species_name,
+            "name": animal.name,
+            "age": animal.age,
+            "is_adopted": animal.is_adopted,
+            "is_vaccinated": animal.is_vaccinated,
+            "last_fed": animal.last_fed,
+            "admission_date": animal.admission_date
+        }
+
+    # Zamienia rekord adopcji z pliku na słownik z datą adopcji jako liczbą sekund; tekst daty w nieprawidłowym
+    # formacie jest zachowywany w invalid_dates (jak w zwierzętach), aby zapis odtworzył go bez zmian
+    def adoption_from_record(self, record):
+        adoption = dict(record)
+        try:
+            adoption["adoption_date"] = parse_timestamp(record["adoption_date"])
+        except (TypeError, ValueError):
+            adoption["adoption_date"] = None
+            if record["adoption_date"]:
+                adoption["invalid_dates"] = {"adoption_date": record["adoption_date"]}
+        return adoption
+
+    # Zamienia adopcję na rekord zapisywany w pliku, z datą w formacie tekstowym
+    def adoption_to_record(self, adoption):
+        record = dict(adoption)
+        record.pop("invalid_dates", None)
+        record["adoption_date"] = format_adoption_date(adoption)
+        return record
 
     # Zapisuje dane zwierząt do pliku JSON
+    @log_action
+    @synchronized
     def save_animals(self, animals, next_id, next_adoption_id):
         try:
-            with open(self.animals_filename, 'w', encoding='utf-8') as f:
-                json.dump({
-                    "animals": {k: {
-                        "species": next(s for s, cls in self.species_map.items() if cls == v.__class__),
-                        "name": v.name,
-                        "age": v.age,
-                        "is_adopted": v.is_adopted,
-                        "is_vaccinated": v.is_vaccinated,
-                        "last_fed": v.last_fed,
-                        "admission_date": v.admission_date
-                    } for k, v in animals.items()},
-                    "next_id": next_id,
-                    "next_adoption_id": next_adoption_id
-                }, f, indent=4, ensure_ascii=False)
-            self.animals = animals
+            self.storage.save_animals({k: self.animal_to_record(v) for k, v in animals.items()},
+                                      {"next_id": next_id, "next_adoption_id": next_adoption_id})
+            count_rows(len(animals))
+            if animals is not self.animals or not isinstance(animals, AnimalStore):
+                self.animals = animals if isinstance(animals, AnimalStore) else AnimalStore(animals)
+                self.index_animals(self.animals)
             self.next_id = next_id
             self.next_adoption_id = next_adoption_id
         except Exception as e:
-            print(f"Błąd zapisu zwierząt: {e}")
+            self.report_error(f"Błąd zapisu zwierząt: {e}")
 
     # Zapisuje dane adopcji do pliku JSON
+    @log_action
+    @synchronized
     def save_adoptions(self, adoptions):
         try:
-            with open(self.adoptions_filename, 'w', encoding='utf-8') as f:
-                json.dump({"adoptions": adoptions}, f, indent=4, ensure_ascii=False)
-            self.adoptions = adoptions
+            self.storage.save_adoptions({k: self.adoption_to_record(v) for k, v in adoptions.items()})
+            count_rows(len(adoptions))
+            if adoptions is not self.adoptions:
+                self.adoptions = adoptions
+                self.index_adoptions()
+        except Exception as e:
+            self.report_error(f"Błąd zapisu adopcji: {e}")
+
+    # Dodaje lub aktualizuje jedno zwierzę i zapisuje tylko tę zmianę; ID musi mieć postać kanoniczną (np. "7", nie "007")
+    @log_action
+    @synchronized
+    def set_animal(self, animal):
+        if not is_canonical_id(animal.id):
+            raise ValueError(f"Nieprawidłowe ID zwierzęcia: {animal.id}")
+        self.put_animal(animal)
+        self.next_id = max(self.next_id, int(animal.id) + 1)
+        self.persist_animals({animal.id: self.animal_to_record(animal)})
+
+    # Usuwa jedno zwierzę i zapisuje tylko tę zmianę
+    @log_action
+    @synchronized
+    def delete_animal(self, animal_id):
+        animal = self.animals[animal_id]
+        index = self.current_animal_index()
+        if index is not None:
+            index.remove(animal)
+        self.animal_stats.remove(animal)
+        del self.animals[animal_id]
+        self.animals_version += 1
+        self.animal_index_version = self.animals_version
+        self.persist_animals({animal_id: None})
+
+    # Dodaje lub aktualizuje jedną adopcję i zapisuje tylko tę zmianę; ID adopcji i zwierzęcia muszą mieć postać kanoniczną
+    @log_action
+    @synchronized
+    def set_adoption(self, adoption_id, adoption):
+        if not is_canonical_id(adoption_id):
+            raise ValueError(f"Nieprawidłowe ID adopcji: {adoption_id}")
+        if not is_canonical_id(adoption["animal_id"]):
+            raise ValueError(f"Nieprawidłowe ID zwierzęcia: {adoption['animal_id']}")
+        self.put_adoption(adoption_id, adoption)
+        self.next_adoption_id = max(self.next_adoption_id, int(adoption_id) + 1)
+        self.persist_adoptions({adoption_id: self.adoption_to_record(adoption)})
+
+    # Usuwa jedną adopcję i zapisuje tylko tę zmianę
+    @log_action
+    @synchronized
+    def delete_adoption(self, adoption_id):
+        index = self.current_adoption_index()
+        adoption = self.adoptions.pop(adoption_id)
+        if index is not None:
+            index.remove(adoption_id, adoption)
+        self.adoptions_version += 1
+        self.adoption_index_version = self.adoptions_version
+        self.persist_adoptions({adoption_id: None})
+
+    # Zapisuje zwierzę w magazynie i aktualizuje indeksy wyszukiwania
+    def put_animal(self, animal):
+        with self.lock:
+            old = self.animals.get(animal.id)
+            index = self.current_animal_index()
+            if old is not None:
+                if index is not None:
+                    index.remove(old)
+                self.animal_stats.remove(old)
+            self.animals[animal.id] = animal
+            self.animals_version += 1
+            if index is not None:
+                index.add(animal)
+                self.animal_index_version = self.animals_version
+            self.animal_stats.add(animal)
+
+    # Przelicza statystyki podanych zwierząt i zwiększa numer wersji danych;
+    # indeks wyszukiwania zostanie zbudowany przy pierwszym użyciu
+    def index_animals(self, animals=None):
+        with self.lock:
+            self.animals_version += 1
+            self.animal_index_cache = None
+            self.animal_index_version = None
+            self.animal_stats = AnimalStats(animals)
+
+    # Usuwa indeks wyszukiwania adopcji i zwiększa numer wersji danych; indeks zostanie zbudowany przy pierwszym użyciu
+    def index_adoptions(self):
+        with self.lock:
+            self.adoptions_version += 1
+            self.adoption_index_cache = None
+            self.adoption_index_version = None
+
+    # Zwraca zbudowany indeks zwierząt, o ile powstał z bieżącej wersji danych; nieaktualny indeks jest porzucany
+    def current_animal_index(self):
+        if self.animal_index_cache is not None and self.animal_index_version != self.animals_version:
+            self.animal_index_cache = None
+        return self.animal_index_cache
+
+    # Zwraca zbudowany indeks adopcji, o ile powstał z bieżącej wersji danych; nieaktualny indeks jest porzucany
+    def current_adoption_index(self):
+        if self.adoption_index_cache is not None and self.adoption_index_version != self.adoptions_version:
+            self.adoption_index_cache = None
+        return self.adoption_index_cache
+
+    # Zwraca indeks wyszukiwania zwierząt, budując go przy pierwszym użyciu lub po zmianie danych,
+    # której nie uwzględniono w indeksie
+    @property
+    def animal_index(self):
+        with self.lock:
+            if self.current_animal_index() is None:
+                self.animal_index_cache = AnimalIndex(self.animals)
+                self.animal_index_version = self.animals_version
+            return self.animal_index_cache
+
+    # Zwraca indeks wyszukiwania adopcji, budując go przy pierwszym użyciu lub po zmianie danych,
+    # której nie uwzględniono w indeksie
+    @property
+    def adoption_index(self):
+        with self.lock:
+            if self.current_adoption_index() is None:
+                self.adoption_index_cache = AdoptionIndex(self.adoptions)
+                self.adoption_index_version = self.adoptions_version
+            return self.adoption_index_cache
+
+    # Zapisuje adopcję w słowniku i aktualizuje indeksy wyszukiwania
+    def put_adoption(self, adoption_id, adoption):
+        with self.lock:
+            index = self.current_adoption_index()
+            old = self.adoptions.get(adoption_id) if index is not None else None
+            if old is not None:
+                index.remove(adoption_id, old)
+            self.adoptions[adoption_id] = adoption
+            self.adoptions_version += 1
+            if index is not None:
+                index.add(adoption_id, adoption)
+                self.adoption_index_version = self.adoptions_version
+
+    # Zwraca posortowane ID adopcji danego zwierzęcia na podstawie indeksu odwrotnego
+    @log_action
+    @synchronized
+    def get_animal_adoptions(self, animal_id):
+        return sorted(self.adoption_index.animal_ids.get(animal_id), key=int)
+
+    # Wyszukuje zwierzęta skompilowanym zapytaniem (lub zapytaniem zbudowanym z warunków) i zwraca posortowane ID;
+    # cancelled pozwala przerwać wyszukiwanie wyjątkiem SearchCancelled (zob. Query.execute)
+    @log_action
+    @synchronized
+    def search_animals(self, query=None, cancelled=None, **filters):
+        found = (query or AnimalQuery(**filters)).run(self.animal_index, self.animals, cancelled)
+        count_rows(len(found))
+        return found
+
+    # Zwraca ID zwierząt w schronisku niekarmionych od co najmniej hours godzin (także bez daty karmienia),
+    # zaczynając od najpilniejszych; now pozwala podać bieżący czas
+    @log_action
+    @synchronized
+    def overdue_feeding(self, hours, now=None):
+        cutoff = (now_timestamp() if now is None else now) - hours * 3600
+        found = [str(animal_id) for animal_id in self.animal_index.feeding.overdue(cutoff)]
+        count_rows(len(found))
+        return found
+
+    # Wyszukuje adopcje skompilowanym zapytaniem (lub zapytaniem zbudowanym z warunków) i zwraca posortowane ID;
+    # cancelled pozwala przerwać wyszukiwanie wyjątkiem SearchCancelled (zob. Query.execute)
+    @log_action
+    @synchronized
+    def search_adoptions(self, query=None, cancelled=None, **filters):
+        found = (query or AdoptionQuery(**filters)).run(self.adoption_index, self.adoptions, cancelled)
+        count_rows(len(found))
+        return found
+
+    # Zapisuje tylko zmienione zwierzęta lub pełny plik, gdy magazyn nie obsługuje zmian przyrostowych
+    @log_action
+    def persist_animals(self, records):
+        count_rows(len(records))
+        if not self.storage.incremental:
+            self.save_animals(self.animals, self.next_id, self.next_adoption_id)
+            return
+        try:
+            entries = self.storage.update_animals(records, {"next_id": self.next_id, "next_adoption_id": self.next_adoption_id})
+        except Exception as e:
+            self.report_error(f"Błąd zapisu zwierząt: {e}")
+            return
+        if entries >= self.compact_threshold:
+            self.save_animals(self.animals, self.next_id, self.next_adoption_id)
+
+    # Zapisuje tylko zmienione adopcje lub pełny plik, gdy magazyn nie obsługuje zmian przyrostowych
+    @log_action
+    def persist_adoptions(self, records):
+        count_rows(len(records))
+        if not self.storage.incremental:
+            self.save_adoptions(self.adoptions)
+            return
+        try:
+            entries = self.storage.update_adoptions(records, self.next_adoption_id)
         except Exception as e:
-            print(f"Błąd zapisu adopcji: {e}")
+            self.report_error(f"Błąd zapisu adopcji: {e}")
+            return
+        if entries >= self.compact_threshold:
+            self.save_adoptions(self.adoptions)
+
+    # Zapisuje świeże migawki obu plików i czyści dzienniki
+    @log_action
+    def compact(self):
+        with self.storage.group():
+            self.save_animals(self.animals, self.next_id, self.next_adoption_id)
+            self.save_adoptions(self.adoptions)
+        self.write_binary_snapshot()
+
+    # Wczytuje dane z plików JSON do bieżącego magazynu danych
+    @log_action
+    @synchronized
+    def import_json(self, animals_filename=None, adoptions_filename=None):
+        source = JsonStorage(animals_filename or self.animals_filename, adoptions_filename or self.adoptions_filename)
+        records, meta = source.load_animals()
+        adoptions, _ = source.load_adoptions()
+        with self.storage.group():
+            self.save_animals({k: self.animal_from_record(k, v) for k, v in records.items()}, meta["next_id"], meta["next_adoption_id"])
+            self.save_adoptions({k: self.adoption_from_record(v) for k, v in adoptions.items()})
+
+    # Zapisuje bieżące dane do plików JSON
+    @log_action
+    def export_json(self, animals_filename=None, adoptions_filename=None):
+        target = JsonStorage(animals_filename or self.animals_filename, adoptions_filename or self.adoptions_filename)
+        with target.group():
+            target.save_animals({k: self.animal_to_record(v) for k, v in self.animals.items()}, {"next_id": self.next_id, "next_adoption_id": self.next_adoption_id})
+            target.save_adoptions({k: self.adoption_to_record(v) for k, v in self.adoptions.items()})
+
+    # Przekazuje komunikat o błędzie do interfejsu lub wypisuje go, gdy nie podano funkcji on_error
+    def report_error(self, message):
+        if self.on_error:
+            self.on_error(message)
+        else:
+            print(message)
+
+    # Czeka na zapisanie wszystkich zmian przez wątek zapisu
+    @log_action
+    def flush(self):
+        if isinstance(self.storage, BackgroundStorage):
+            self.storage.flush()
+
+    # Zapisuje oczekujące zmiany oraz migawkę binarną i zamyka magazyn danych
+    @log_action
+    def close(self):
+        self.write_binary_snapshot()
+        if hasattr(self.storage, "close"):
+            self.storage.close()
+        if self.snapshot is not None:
+            self.snapshot.close()
 
     # Zwraca kolejny dostępny ID dla zwierzęcia lub adopcji
     def get_next_id(self):
@@ -82,165 +474,187 @@ class DataManager:
     def get_next_adoption_id(self):
         return self.next_adoption_id
 
-    # Importuje dane zwierząt z pliku CSV
-    def import_animals_csv(self, file_path, replace=True):
-        errors = []
-        new_animals = {} if replace else self.animals.copy()
-        new_next_id = 1 if replace else self.next_id
+    # Importuje dane zwierząt z pliku CSV jednym przebiegiem; poprawne wiersze trafiają najpierw do słownika,
+    # a bieżące dane i pliki zmieniają się dopiero po przeczytaniu całego pliku, więc przerwany import niczego
+    # nie usuwa; ceną tej niepodzielności jest przechowanie w pamięci wszystkich poprawnych wierszy, a chunk_size
+    # wyznacza tylko częstość raportów postępu i (przy dopisywaniu) wielkość partii zapisywanych w dzienniku;
+    # przy workers > 0 wiersze są sprawdzane równolegle w puli procesów
+    @log_action
+    @synchronized
+    def import_animals_csv(self, file_path, replace=True, chunk_size=1000, progress=None, max_errors=1000, workers=0):
+        errors = ImportErrors(max_errors)
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f, delimiter=';')
-                headers = next(reader)
-                if headers != ["ID", "Imię", "Wiek", "Gatunek", "Zaszczepione", "Ostatnie karmienie", "Data przyjęcia", "Status"]:
+                if next(read_csv_rows(f), (None, None))[1] != ANIMAL_CSV_HEADERS:
                     errors.append("Nieprawidłowe nagłówki pliku CSV")
                     return errors
-                row_index = 0
-                while row_index < len(list(reader)):
-                    f.seek(0)
-                    reader = csv.reader(f, delimiter=';')
-                    next(reader)
-                    for row_index, row in enumerate(reader):
-                        row_errors = []
-                        try:
-                            animal_id = row[0].strip()
-                            name = row[1].strip()
-                            age = int(row[2].strip()) if row[2].strip() else 0
-                            species = row[3].strip()
-                            is_vaccinated = row[4].strip().lower() == "tak"
-                            last_fed = row[5].strip() if row[5].strip() else None
-                            admission_date = row[6].strip() if row[6].strip() else None
-                            is_adopted = row[7].strip().lower() == "adoptowane"
-                            if not name:
-                                row_errors.append("Imię nie może być puste")
-                            if age < 0:
-                                row_errors.append("Wiek musi być nieujemny")
-                            if species not in self.species_map:
-                                row_errors.append(f"Nieprawidłowy gatunek: {species}")
-                            if last_fed:
-                                try:
-                                    datetime.strptime(last_fed, "%Y-%m-%d %H:%M:%S")
-                                except ValueError:
-                                    row_errors.append(f"Nieprawidłowy format daty ostatniego karmienia: {last_fed}")
-                            if admission_date:
-                                try:
-                                    datetime.strptime(admission_date, "%Y-%m-%d %H:%M:%S")
-                                except ValueError:
-                                    row_errors.append(f"Nieprawidłowy format daty przyjęcia: {admission_date}")
-                            if animal_id in new_animals:
-                                row_errors.append(f"Powielone ID zwierzęcia: {animal_id}")
-                            if not row_errors:
-                                animal = self.species_map[species](animal_id, name, age)
-                                animal.is_vaccinated = is_vaccinated
-                                animal.last_fed = last_fed
-                                animal.admission_date = admission_date
-                                animal.is_adopted = is_adopted
-                                new_animals[animal_id] = animal
-                                new_next_id = max(new_next_id, int(animal_id) + 1)
-                            else:
-                                errors.append(f"Wiersz {row_index + 2}: {', '.join(row_errors)}")
-                        except Exception as e:
-                            errors.append(f"Wiersz {row_index + 2}: Błąd: {str(e)}")
-            self.animals = new_animals
-            self.next_id = new_next_id
-            self.save_animals(self.animals, self.next_id, self.next_adoption_id)
+                if workers:
+                    rows = parse_csv_parallel(file_path, workers, parse_animal_row, self.species_map)
+                else:
+                    rows = parse_csv_rows(f, parse_animal_row, self.species_map)
+                size = os.fstat(f.fileno()).st_size
+                staged = {}
+                next_id = 1 if replace else self.next_id
+                row_count = 0
+                for line_number, position, (animal_id, animal, row_errors) in rows:
+                    row_count += 1
+                    try:
+                        if animal_id in staged or (not replace and animal_id in self.animals):
+                            row_errors.append(f"Powielone ID zwierzęcia: {animal_id}")
+                        if not row_errors:
+                            next_id = max(next_id, int(animal_id) + 1)
+                            staged[animal_id] = animal
+                        else:
+                            errors.append(f"Wiersz {line_number}: {', '.join(row_errors)}")
+                    except Exception as e:
+                        errors.append(f"Wiersz {line_number}: Błąd: {str(e)}")
+                    if progress and row_count % chunk_size == 0:
+                        progress(row_count, position, size)
+                count_rows(row_count)
+            if replace:
+                self.save_animals(AnimalStore(staged), next_id, self.next_adoption_id)
+            else:
+                self.append_animals(staged, next_id, chunk_size)
+            if progress:
+                progress(row_count, size, size)
         except Exception as e:
             errors.append(f"Błąd importu: {str(e)}")
-        return errors
+        return errors.finish()
 
-    # Importuje dane adopcji z pliku CSV
-    def import_adoptions_csv(self, file_path, replace=True):
-        errors = []
-        new_adoptions = {} if replace else self.adoptions.copy()
-        new_next_adoption_id = 1 if replace else self.next_adoption_id
+    # Dopisuje zaimportowane zwierzęta do bieżących danych w kolejności ID, zapisując je partiami po chunk_size;
+    # gdy więcej niż chunk_size nowych ID wypada pomiędzy istniejącymi, magazyn jest budowany od nowa jednym
+    # sortowaniem zamiast wstawiania każdego wiersza w środek kolumn
+    def append_animals(self, staged, next_id, chunk_size):
+        self.next_id = next_id
+        ids = sorted(staged, key=int)
+        if len(ids) > chunk_size and len(self.animals) and int(ids[0]) < self.animals.ids[-1]:
+            self.animals = AnimalStore(ChainMap(staged, self.animals))
+            self.index_animals(self.animals)
+        else:
+            for animal_id in ids:
+                self.put_animal(staged[animal_id])
+        journal_entries = 0
+        chunk = {}
+        for animal_id in ids:
+            chunk[animal_id] = staged[animal_id]
+            if len(chunk) == chunk_size:
+                journal_entries = self.commit_animals_chunk(chunk) or journal_entries
+                chunk = {}
+        journal_entries = self.commit_animals_chunk(chunk) or journal_entries
+        if not self.storage.incremental or journal_entries >= self.compact_threshold:
+            self.save_animals(self.animals, self.next_id, self.next_adoption_id)
+
+    # Importuje dane adopcji z pliku CSV jednym przebiegiem; poprawne wiersze trafiają najpierw do osobnego
+    # słownika, a bieżące dane i pliki zmieniają się dopiero po przeczytaniu całego pliku, więc przerwany import
+    # niczego nie usuwa; przy workers > 0 wiersze są sprawdzane równolegle w puli procesów
+    @log_action
+    @synchronized
+    def import_adoptions_csv(self, file_path, replace=True, chunk_size=1000, progress=None, max_errors=1000, workers=0):
+        errors = ImportErrors(max_errors)
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f, delimiter=';')
-                headers = next(reader)
-                if headers != ["ID", "ID zwierzęcia", "Nazwisko", "PESEL", "Numer telefonu", "Data adopcji"]:
+                if next(read_csv_rows(f), (None, None))[1] != ADOPTION_CSV_HEADERS:
                     errors.append("Nieprawidłowe nagłówki pliku CSV")
                     return errors
-                row_index = 0
-                while row_index < len(list(reader)):
-                    f.seek(0)
-                    reader = csv.reader(f, delimiter=';')
-                    next(reader)
-                    for row_index, row in enumerate(reader):
-                        try:
-                            adoption_id = row[0].strip()
-                            animal_id = row[1].strip()
-                            surname = row[2].strip()
-                            pesel = row[3].strip()
-                            phone_number = row[4].strip()
-                            adoption_date = row[5].strip()
-                            if not surname or not pesel.isdigit() or len(pesel) != 11 or not phone_number.isdigit() or len(phone_number) != 9:
-                                errors.append(f"Wiersz {row_index + 2}: Nieprawidłowe dane: nazwisko niepuste, PESEL 11 cyfr, telefon 9 cyfr")
-                                continue
-                            if animal_id not in self.animals:
-                                errors.append(f"Wiersz {row_index + 2}: Nie znaleziono zwierzęcia o ID {animal_id}")
-                                continue
-                            try:
-                                datetime.strptime(adoption_date, "%Y-%m-%d %H:%M:%S")
-                            except ValueError:
-                                errors.append(f"Wiersz {row_index + 2}: Nieprawidłowy format daty adopcji: {adoption_date}")
-                                continue
-                            if adoption_id in new_adoptions:
-                                errors.append(f"Wiersz {row_index + 2}: Powielone ID adopcji: {adoption_id}")
-                                continue
-                            new_adoptions[adoption_id] = {
-                                "animal_id": animal_id,
-                                "surname": surname,
-                                "pesel": pesel,
-                                "phone_number": phone_number,
-                                "adoption_date": adoption_date
-                            }
-                            self.animals[animal_id].is_adopted = True
-                            new_next_adoption_id = max(new_next_adoption_id, int(adoption_id) + 1)
-                        except Exception as e:
-                            errors.append(f"Wiersz {row_index + 2}: Błąd: {str(e)}")
-            self.adoptions = new_adoptions
-            self.next_adoption_id = new_next_adoption_id
-            self.save_adoptions(self.adoptions)
-            self.save_animals(self.animals, self.next_id, self.next_adoption_id)
+                if workers:
+                    rows = parse_csv_parallel(file_path, workers, parse_adoption_row)
+                else:
+                    rows = parse_csv_rows(f, parse_adoption_row)
+                size = os.fstat(f.fileno()).st_size
+                staged = {}
+                next_adoption_id = 1 if replace else self.next_adoption_id
+                row_count = 0
+                for line_number, position, (adoption_id, record, data_error, date_error) in rows:
+                    row_count += 1
+                    try:
+                        if data_error:
+                            errors.append(f"Wiersz {line_number}: {data_error}")
+                        elif record["animal_id"] not in self.animals:
+                            errors.append(f"Wiersz {line_number}: Nie znaleziono zwierzęcia o ID {record['animal_id']}")
+                        elif date_error:
+                            errors.append(f"Wiersz {line_number}: {date_error}")
+                        elif adoption_id in staged or (not replace and adoption_id in self.adoptions):
+                            errors.append(f"Wiersz {line_number}: Powielone ID adopcji: {adoption_id}")
+                        else:
+                            next_adoption_id = max(next_adoption_id, int(adoption_id) + 1)
+                            staged[adoption_id] = record
+                    except Exception as e:
+                        errors.append(f"Wiersz {line_number}: Błąd: {str(e)}")
+                    if progress and row_count % chunk_size == 0:
+                        progress(row_count, position, size)
+                count_rows(row_count)
+            self.commit_adoptions(staged, next_adoption_id, replace, chunk_size)
+            if progress:
+                progress(row_count, size, size)
         except Exception as e:
             errors.append(f"Błąd importu: {str(e)}")
-        return errors
+        return errors.finish()
+
+    # Wprowadza zaimportowane adopcje: zastępuje nimi bieżące adopcje albo dopisuje je partiami po chunk_size,
+    # oznaczając adoptowane zwierzęta
+    def commit_adoptions(self, staged, next_adoption_id, replace, chunk_size):
+        self.next_adoption_id = next_adoption_id
+        if replace:
+            for adoption in staged.values():
+                animal = self.animals[adoption["animal_id"]]
+                animal.is_adopted = True
+                self.put_animal(animal)
+            with self.storage.group():
+                self.save_adoptions(staged)
+                self.save_animals(self.animals, self.next_id, self.next_adoption_id)
+            return
+        journal_entries = 0
+        chunk, adopted_animals = {}, {}
+        for adoption_id, record in staged.items():
+            self.put_adoption(adoption_id, record)
+            animal = self.animals[record["animal_id"]]
+            animal.is_adopted = True
+            self.put_animal(animal)
+            adopted_animals[animal.id] = animal
+            chunk[adoption_id] = record
+            if len(chunk) == chunk_size:
+                journal_entries = self.commit_adoptions_chunk(chunk, adopted_animals) or journal_entries
+                chunk, adopted_animals = {}, {}
+        journal_entries = self.commit_adoptions_chunk(chunk, adopted_animals) or journal_entries
+        if not self.storage.incremental or journal_entries >= self.compact_threshold:
+            with self.storage.group():
+                self.save_adoptions(self.adoptions)
+                self.save_animals(self.animals, self.next_id, self.next_adoption_id)
+
+    # Zapisuje partię zaimportowanych zwierząt i zwraca rozmiar dziennika, jeśli magazyn obsługuje zmiany przyrostowe
+    def commit_animals_chunk(self, animals):
+        if animals and self.storage.incremental:
+            return self.storage.update_animals({k: self.animal_to_record(v) for k, v in animals.items()},
+                                               {"next_id": self.next_id, "next_adoption_id": self.next_adoption_id})
+        return 0
+
+    # Zapisuje partię zaimportowanych adopcji razem ze zmienionym statusem zwierząt i zwraca rozmiar dziennika
+    def commit_adoptions_chunk(self, records, adopted_animals):
+        if records and self.storage.incremental:
+            with self.storage.group():
+                self.storage.update_animals({k: self.animal_to_record(v) for k, v in adopted_animals.items()},
+                                            {"next_id": self.next_id, "next_adoption_id": self.next_adoption_id})
+                return self.storage.update_adoptions({k: self.adoption_to_record(v) for k, v in records.items()}, self.next_adoption_id)
+        return 0
 
-    # Eksportuje dane zwierząt do pliku CSV
-    def export_animals_csv(self, file_path):
+    # Eksportuje dane zwierząt do pliku CSV strumieniowo, wprost z kolumn uporządkowanych po ID;
+    # kompresja gzip lub zstd wynika z rozszerzenia pliku (.gz, .zst), o ile nie podano jej jawnie
+    @log_action
+    def export_animals_csv(self, file_path, compression=None, batch_size=10000):
         try:
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f, delimiter=';')
-                headers = ("ID", "Imię", "Wiek", "Gatunek", "Zaszczepione", "Ostatnie karmienie", "Data przyjęcia", "Status")
-                writer.writerow(headers)
-                for animal_id, animal in sorted(self.animals.items(), key=lambda x: int(x[0])):
-                    writer.writerow([
-                        animal_id,
-                        animal.name,
-                        animal.age,
-                        next(s for s, cls in self.species_map.items() if cls == animal.__class__),
-                        "Tak" if animal.is_vaccinated else "Nie",
-                        animal.last_fed or "",
-                        animal.admission_date or "",
-                        "Adoptowane" if animal.is_adopted else "W schronisku"
-                    ])
+            with open_csv_output(file_path, compression or compression_for(file_path)) as f:
+                count_rows(write_csv(f, ANIMAL_CSV_HEADERS, animal_csv_rows(self.animals, SPECIES_NAMES), batch_size))
+            count_bytes(os.path.getsize(file_path))
         except Exception as e:
-            print(f"Błąd eksportu zwierząt: {e}")
+            self.report_error(f"Błąd eksportu zwierząt: {e}")
 
-    # Eksportuje dane adopcji do pliku CSV
-    def export_adoptions_csv(self, file_path):
+    # Eksportuje dane adopcji do pliku CSV strumieniowo, w kolejności ID;
+    # kompresja gzip lub zstd wynika z rozszerzenia pliku (.gz, .zst), o ile nie podano jej jawnie
+    @log_action
+    def export_adoptions_csv(self, file_path, compression=None, batch_size=10000):
         try:
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f, delimiter=';')
-                headers = ("ID", "ID zwierzęcia", "Nazwisko", "PESEL", "Numer telefonu", "Data adopcji")
-                writer.writerow(headers)
-                for adoption_id, adoption in sorted(self.adoptions.items(), key=lambda x: int(x[0])):
-                    writer.writerow([
-                        adoption_id,
-                        adoption["animal_id"],
-                        adoption["surname"],
-                        adoption["pesel"],
-                        adoption["phone_number"],
-                        adoption["adoption_date"]
-                    ])
+            with open_csv_output(file_path, compression or compression_for(file_path)) as f:
+                count_rows(write_csv(f, ADOPTION_CSV_HEADERS, adoption_csv_rows(self.adoptions), batch_size))
+            count_bytes(os.path.getsize(file_path))
         except Exception as e:
-            print(f"Błąd eksportu adopcji: {e}")
\ No newline at end of file
+            self.report_error(f"Błąd eksportu adopcji: {e}")
@@ -1,7 +1,165 @@
+import atexit
+import json
+import os
+import threading
+import time
 from functools import wraps
 
+# Histogram czasów wykonania operacji: przedziały o granicach będących kolejnymi potęgami dwójki mikrosekund,
+# razem z liczbą wywołań, łącznym czasem, przetworzonymi wierszami i zapisanymi bajtami
+class Histogram:
+    # Inicjalizacja pustego histogramu
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.bytes = 0
+
+    # Dodaje pomiar jednego wywołania; przedział k obejmuje czasy od 2^(k-1) do 2^k mikrosekund
+    def add(self, seconds, rows, written):
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.rows += rows
+        self.bytes += written
+
+    # Zwraca przybliżony percentyl czasu w sekundach (górną granicę przedziału, nie większą niż maksimum)
+    def percentile(self, fraction):
+        target = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(2 ** bucket / 1e6, self.max)
+        return self.max
+
+    # Zwraca podsumowanie histogramu jako słownik gotowy do zapisu w JSON
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "buckets_us": {str(2 ** bucket): n for bucket, n in sorted(self.buckets.items())}
+        }
+
+# Pomiary operacji w obrębie procesu; gdy są wyłączone, dekorator sprawdza tylko jeden atrybut
+class Instrumentation:
+    # Inicjalizacja wyłączonych pomiarów
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    # Włącza lub wyłącza zbieranie pomiarów
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    # Usuwa zebrane pomiary
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+
+    # Zwraca stos liczników [wiersze, bajty] operacji trwających w bieżącym wątku
+    def stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    # Rozpoczyna operację i zwraca jej liczniki
+    def start(self):
+        counters = [0, 0]
+        self.stack().append(counters)
+        return counters
+
+    # Kończy operację: zapisuje pomiar w histogramie i dolicza jej liczniki do operacji nadrzędnej
+    def finish(self, name, seconds, counters):
+        stack = self.stack()
+        stack.pop()
+        if stack:
+            stack[-1][0] += counters[0]
+            stack[-1][1] += counters[1]
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds, counters[0], counters[1])
+
+    # Dolicza przetworzone wiersze lub zapisane bajty do bieżącej operacji
+    def count(self, rows=0, written=0):
+        stack = self.stack()
+        if stack:
+            stack[-1][0] += rows
+            stack[-1][1] += written
+
+    # Zwraca podsumowanie wszystkich operacji jako słownik {nazwa: podsumowanie}
+    def summary(self):
+        with self.lock:
+            return {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())}
+
+    # Zwraca tabelę czasów operacji posortowaną malejąco według łącznego czasu
+    def report(self):
+        lines = [f"{'Operacja':<40} {'Wywołania':>9} {'Razem ms':>11} {'Średnio ms':>11} {'p95 ms':>9} {'Maks. ms':>9} {'Wiersze':>10} {'Bajty':>12}"]
+        for name, data in sorted(self.summary().items(), key=lambda item: -item[1]["total"]):
+            lines.append(f"{name:<40} {data['count']:>9} {data['total'] * 1000:>11.2f} {data['mean'] * 1000:>11.3f} "
+                         f"{data['p95'] * 1000:>9.3f} {data['max'] * 1000:>9.3f} {data['rows']:>10} {data['bytes']:>12}")
+        return "\n".join(lines)
+
+    # Zapisuje pomiary do pliku: JSON dla rozszerzenia .json, w pozostałych przypadkach tabelę tekstową
+    def export(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            if filename.endswith(".json"):
+                json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+            else:
+                f.write(self.report() + "\n")
+
+instrumentation = Instrumentation()
+
+# Dolicza przetworzone wiersze do bieżącej operacji (bez kosztu, gdy pomiary są wyłączone)
+def count_rows(rows):
+    if instrumentation.enabled:
+        instrumentation.count(rows=rows)
+
+# Dolicza zapisane bajty do bieżącej operacji (bez kosztu, gdy pomiary są wyłączone)
+def count_bytes(written):
+    if instrumentation.enabled:
+        instrumentation.count(written=written)
+
+# Mierzy czas wykonania funkcji oraz przetworzone wiersze i zapisane bajty, gdy pomiary są włączone
 def log_action(func):
+    name = func.__qualname__
     @wraps(func)
     def wrapper(*args, **kwargs):
-        return func(*args, **kwargs)
-    return wrapper
\ No newline at end of file
+        if not instrumentation.enabled:
+            return func(*args, **kwargs)
+        counters = instrumentation.start()
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            instrumentation.finish(name, time.perf_counter() - started, counters)
+    return wrapper
+
+# Wykonuje metodę pod blokadą obiektu (self.lock), aby inny wątek nie odczytywał danych w trakcie ich zmiany
+def synchronized(func):
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return func(self, *args, **kwargs)
+    return wrapper
+
+# Zmienna środowiskowa SCHRONISKO_METRICS z nazwą pliku włącza pomiary i zapisuje je do niego przy zamknięciu programu
+if os.environ.get("SCHRONISKO_METRICS"):
+    instrumentation.enable()
+    atexit.register(instrumentation.export, os.environ["SCHRONISKO_METRICS"])
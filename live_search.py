@@ -0,0 +1,150 @@
+import queue
+import threading
+from query import CANCEL_CHECK, SearchCancelled
+
+DEBOUNCE_MS = 250
+POLL_MS = 20
+
+# Wyszukiwanie w trakcie pisania: zapytania są wykonywane w osobnym wątku, a wyniki odbierane w wątku Tk
+# przez after(); nowsze zapytanie unieważnia starsze (numer generacji), a zapytanie, które tylko zawęża
+# poprzednie, jest sprawdzane na poprzednich wynikach zamiast w indeksach; wątek czyta dane tylko pod blokadą
+# lock, pod którą są też zmieniane, a wynik obliczony dla nieaktualnej wersji danych jest liczony ponownie;
+# wyszukiwanie jest przerywane co CANCEL_CHECK rekordów, gdy pojawi się nowsze zapytanie, więc nie trzyma blokady
+# dłużej niż potrzeba; nie jest przerywana tylko jednorazowa budowa indeksu po masowej zmianie danych
+class LiveSearch:
+    # Inicjalizacja z funkcją wyszukiwania search(query, cancelled), funkcją zwracającą przeszukiwane rekordy, numerem wersji danych
+    # i blokadą danych; widget, on_result i on_error są potrzebne tylko w interfejsie graficznym
+    def __init__(self, search, records, version, lock, widget=None, on_result=None, on_error=None, delay=DEBOUNCE_MS):
+        self.search = search
+        self.records = records
+        self.version = version
+        self.lock = lock
+        self.widget = widget
+        self.on_result = on_result
+        self.on_error = on_error
+        self.delay = delay
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.generation = 0
+        self.delivered = 0
+        self.previous = None
+        self.job = None
+        self.polling = False
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name="LiveSearch", daemon=True)
+        self.thread.start()
+        if widget is not None:
+            widget.bind("<Destroy>", lambda event: self.close(), add="+")
+
+    # Planuje wyszukiwanie po upływie opóźnienia; każde kolejne wywołanie (naciśnięcie klawisza) odsuwa je
+    def schedule(self, compile_query):
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+        self.job = self.widget.after(self.delay, lambda: self.start(compile_query))
+
+    # Od razu zleca wyszukiwanie zapytania zbudowanego przez compile_query (None oznacza błędny formularz)
+    # i zaczyna odbierać wyniki
+    def start(self, compile_query):
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+        query = compile_query()
+        if query is None or self.closed:
+            return
+        self.submit(query)
+        if not self.polling:
+            self.polling = True
+            self.poll()
+
+    # Zleca wątkowi wyszukiwanie i zwraca numer generacji zapytania; starsze zapytania przestają być potrzebne
+    def submit(self, query):
+        self.generation += 1
+        self.requests.put((self.generation, query))
+        return self.generation
+
+    # Odbiera wyniki w wątku Tk, przekazuje najnowsze do on_result i ponawia sprawdzanie do nadejścia wyniku ostatniego zapytania
+    def poll(self):
+        if self.closed:
+            self.polling = False
+            return
+        found = self.take()
+        if isinstance(found, Exception):
+            self.on_error(found)
+        elif found is not None:
+            self.on_result(found)
+        if self.delivered < self.generation:
+            self.widget.after(POLL_MS, self.poll)
+        else:
+            self.polling = False
+
+    # Zwraca wyniki najnowszego zapytania (lub zgłoszony przy nim wyjątek), jeśli już nadeszły, inaczej None;
+    # przy podanym timeout czeka na nie najwyżej tyle sekund; wyniki starszych zapytań są pomijane, a wynik
+    # obliczony dla wersji danych, która zdążyła się zmienić, powoduje ponowne zlecenie tego samego zapytania
+    def take(self, timeout=None):
+        latest = None
+        while True:
+            try:
+                generation, version, query, found = self.results.get(block=latest is None and timeout is not None, timeout=timeout)
+            except queue.Empty:
+                return latest
+            if generation != self.generation:
+                continue
+            if version is not None and version != self.version():
+                self.submit(query)
+                continue
+            self.delivered = generation
+            latest = found
+
+    # Pętla wątku: pomija zapytania, które zostały już zastąpione nowszymi, i oddaje wyniki pozostałych
+    def run(self):
+        while True:
+            request = self.requests.get()
+            while request is not None and not self.requests.empty():
+                request = self.requests.get()
+            if request is None:
+                return
+            generation, query = request
+            if generation != self.generation:
+                continue
+            try:
+                version, found = self.evaluate(generation, query)
+            except Exception as e:
+                version, found = None, e
+            if found is not None:
+                self.results.put((generation, version, query, found))
+
+    # Wykonuje zapytanie pod blokadą danych i zwraca (wersja danych, wyniki): zawężenie poprzedniego zapytania
+    # dla tej samej wersji danych sprawdza tylko poprzednie wyniki, inne przez indeksy;
+    # wyniki są None, gdy w trakcie pojawiło się nowsze zapytanie
+    def evaluate(self, generation, query):
+        cancelled = lambda: generation != self.generation
+        with self.lock:
+            version = self.version()
+            previous = self.previous
+            if previous is not None and previous[1] == version and query.refines(previous[0]):
+                records = self.records()
+                found = []
+                for position, key in enumerate(previous[2]):
+                    if position % CANCEL_CHECK == 0 and cancelled():
+                        return version, None
+                    if query.matches(records, key):
+                        found.append(key)
+            else:
+                try:
+                    found = self.search(query, cancelled)
+                except SearchCancelled:
+                    return version, None
+        if generation != self.generation:
+            return version, None
+        self.previous = (query, version, found)
+        return version, found
+
+    # Zatrzymuje wątek i planowane wyszukiwanie
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+        self.requests.put(None)
@@ -1,13 +1,25 @@
 import tkinter as tk
 from tkinter import messagebox, ttk, filedialog
 from tkcalendar import DateEntry
-from animal_manager import Dog, Cat, Bird, Rabbit, Hamster, Turtle
+from animal_manager import SPECIES_BY_NAME, SPECIES_NAMES, format_adoption_date, now_timestamp, to_timestamp
 from data_manager import DataManager
+from storage import SqliteStorage
+from query import AnimalQuery, AdoptionQuery, ResultPages
+from virtual_tree import VirtualTreeview
+from paged_tree import PagedTreeview
+from live_search import LiveSearch
+from sorted_view import SortedViewCache, animal_column_keys, adoption_column_keys, animal_row_key, adoption_row_key, row_order
+from report_chart import draw_report
 from decorators import log_action
 from datetime import datetime, time
+import os
+import queue
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+FEEDING_HOURS = 12
+FEEDING_REFRESH_MS = 60000
+
 
 # Klasa zarządzająca aplikacją schroniska
 class ShelterApp:
@@ -17,7 +29,10 @@ class ShelterApp:
         self.root.title("System Schroniska")
         self.root.geometry("1200x800")
         self.root.minsize(1200, 800)
-        self.data_manager = DataManager("zwierzeta.json", "adopcje.json")
+        self.storage_errors = queue.Queue()
+        database = os.environ.get("SCHRONISKO_SQLITE")
+        storage = SqliteStorage(database) if database else None
+        self.data_manager = DataManager("zwierzeta.json", "adopcje.json", journal=True, storage=storage, background=True, on_error=self.storage_errors.put, binary=True, lazy=True)
         self.animals = self.data_manager.animals
         self.adoptions = self.data_manager.adoptions
         self.next_id = self.data_manager.get_next_id()
@@ -30,11 +45,28 @@ class ShelterApp:
         self.adoptions_sort_default = True
         self.filtered_animals = None
         self.filtered_adoptions = None
-        self.species_map = {"Pies": Dog, "Kot": Cat, "Ptak": Bird, "Królik": Rabbit, "Chomik": Hamster, "Żółw": Turtle}
-        self.species_options = list(self.species_map.keys())
+        self.animals_order = SortedViewCache(animal_column_keys)
+        self.adoptions_order = SortedViewCache(adoption_column_keys)
+        self.species_map = SPECIES_BY_NAME
+        self.species_options = SPECIES_NAMES
         self.setup_ui()
         self.refresh_animals_tree()
         self.refresh_adoptions_tree()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.show_storage_errors()
+
+    # Pokazuje błędy zgłoszone przez wątek zapisu i ponownie planuje sprawdzenie
+    def show_storage_errors(self):
+        while not self.storage_errors.empty():
+            messagebox.showerror("Błąd zapisu", self.storage_errors.get())
+        self.root.after(200, self.show_storage_errors)
+
+    # Zapisuje oczekujące zmiany przed zamknięciem okna
+    def close(self):
+        self.data_manager.close()
+        while not self.storage_errors.empty():
+            messagebox.showerror("Błąd zapisu", self.storage_errors.get())
+        self.root.destroy()
 
     # Konfiguracja interfejsu graficznego
     def setup_ui(self):
@@ -57,15 +89,16 @@ class ShelterApp:
             self.animals_tree.heading(col, text=col, command=lambda c=col: self.sort_column(c, False))
             self.animals_tree.column(col, width=100 if col in ["ID", "Wiek", "Gatunek", "Zaszczepione", "Status"] else 150)
         self.animals_tree.grid(row=0, column=0, sticky="wens")
-        animals_scrollbar = ttk.Scrollbar(animals_frame, orient=tk.VERTICAL, command=self.animals_tree.yview)
+        animals_scrollbar = ttk.Scrollbar(animals_frame, orient=tk.VERTICAL)
         animals_scrollbar.grid(row=0, column=1, sticky="ns")
-        self.animals_tree.configure(yscrollcommand=animals_scrollbar.set)
+        self.animals_view = VirtualTreeview(self.animals_tree, animals_scrollbar, self.animal_row_values)
         animals_buttons_frame = ttk.Frame(animals_frame)
         animals_buttons_frame.grid(row=1, column=0, columnspan=2, pady=10)
         animals_buttons_frame.grid_columnconfigure(10, weight=1)
         ttk.Button(animals_buttons_frame, text="Adoptuj", command=self.open_adopt_window).grid(row=0, column=0, padx=5)
         ttk.Button(animals_buttons_frame, text="Nakarm", command=self.mark_fed).grid(row=0, column=1, padx=5)
-        ttk.Button(animals_buttons_frame, text="Odśwież", command=self.refresh_animals_tree).grid(row=0, column=8, padx=5, sticky="e")
+        ttk.Button(animals_buttons_frame, text="Do nakarmienia", command=self.open_feeding_window).grid(row=0, column=2, padx=5)
+        ttk.Button(animals_buttons_frame, text="Odśwież", command=self.clear_filters).grid(row=0, column=8, padx=5, sticky="e")
         ttk.Button(animals_buttons_frame, text="Raporty", command=self.open_report_window).grid(row=0, column=7, padx=5)
         ttk.Button(animals_buttons_frame, text="Wyszukaj", command=self.open_animal_search_window).grid(row=0, column=6, padx=5)
         ttk.Button(animals_buttons_frame, text="Usuń", command=self.delete_animal).grid(row=0, column=5, padx=5)
@@ -82,9 +115,9 @@ class ShelterApp:
             self.adoptions_tree.heading(col, text=col, command=lambda c=col: self.sort_column(c, True))
             self.adoptions_tree.column(col, width=100 if col == "ID" else 150)
         self.adoptions_tree.grid(row=0, column=0, sticky="wens")
-        adoptions_scrollbar = ttk.Scrollbar(adoptions_frame, orient=tk.VERTICAL, command=self.adoptions_tree.yview)
+        adoptions_scrollbar = ttk.Scrollbar(adoptions_frame, orient=tk.VERTICAL)
         adoptions_scrollbar.grid(row=0, column=1, sticky="ns")
-        self.adoptions_tree.configure(yscrollcommand=adoptions_scrollbar.set)
+        self.adoptions_view = VirtualTreeview(self.adoptions_tree, adoptions_scrollbar, self.adoption_row_values)
         adoptions_buttons_frame = ttk.Frame(adoptions_frame)
         adoptions_buttons_frame.grid(row=1, column=0, columnspan=2, pady=10)
         adoptions_buttons_frame.grid_columnconfigure(5, weight=1)
@@ -107,8 +140,8 @@ class ShelterApp:
         age_entry = ttk.Entry(add_window, width=10)
         age_entry.grid(row=1, column=1, padx=2, pady=5)
         ttk.Label(add_window, text="Gatunek:").grid(row=2, column=0, padx=2, pady=5, sticky="w")
-        species_var = tk.StringVar(value="Pies")
-        ttk.OptionMenu(add_window, species_var, "Pies", *self.species_options).grid(row=2, column=1, padx=2, pady=5)
+        species_var = tk.StringVar(value=self.species_options[0])
+        ttk.OptionMenu(add_window, species_var, self.species_options[0], *self.species_options).grid(row=2, column=1, padx=2, pady=5)
         ttk.Label(add_window, text="Zaszczepione:").grid(row=3, column=0, padx=2, pady=5, sticky="w")
         vaccinated_var = tk.BooleanVar()
         ttk.Checkbutton(add_window, variable=vaccinated_var).grid(row=3, column=1, padx=2, pady=5)
@@ -126,10 +159,9 @@ class ShelterApp:
                 animal_class = self.species_map[species]
                 animal = animal_class(animal_id, name, age)
                 animal.is_vaccinated = vaccinated_var.get()
-                animal.admission_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                self.animals[animal_id] = animal
-                self.data_manager.save_animals(self.animals, self.next_id, self.next_adoption_id)
-                self.refresh_animals_tree()
+                animal.admission_ts = now_timestamp()
+                self.data_manager.set_animal(animal)
+                self.update_animal_row(animal_id)
                 add_window.destroy()
                 messagebox.showinfo("Sukces", f"Dodano {species.lower()} o imieniu {name}")
             except (ValueError, AssertionError):
@@ -138,11 +170,11 @@ class ShelterApp:
 
     # Otwiera okno do edycji danych zwierzęcia
     def open_edit_animal_window(self):
-        selected = self.animals_tree.selection()
+        selected = self.animals_view.selection()
         if not selected:
             messagebox.showerror("Błąd", "Wybierz zwierzę")
             return
-        animal_id = str(self.animals_tree.item(selected[0])["values"][0])
+        animal_id = selected[0]
         animal = self.animals.get(animal_id)
         if not animal:
             messagebox.showerror("Błąd", f"Nie znaleziono zwierzęcia o ID {animal_id}")
@@ -162,7 +194,7 @@ class ShelterApp:
         age_entry.insert(0, str(animal.age))
         age_entry.grid(row=2, column=1, padx=2, pady=5)
         ttk.Label(edit_window, text="Gatunek:").grid(row=3, column=0, padx=2, pady=5, sticky="w")
-        species_var = tk.StringVar(value=next(k for k, v in self.species_map.items() if v == animal.__class__))
+        species_var = tk.StringVar(value=animal.species_name)
         ttk.OptionMenu(edit_window, species_var, species_var.get(), *self.species_options).grid(row=3, column=1, padx=2, pady=5)
         ttk.Label(edit_window, text="Zaszczepione:").grid(row=4, column=0, padx=2, pady=5, sticky="w")
         vaccinated_var = tk.BooleanVar(value=animal.is_vaccinated)
@@ -178,22 +210,20 @@ class ShelterApp:
                 species = species_var.get()
                 is_vaccinated = vaccinated_var.get()
                 is_adopted = adopted_var.get()
+                animal = self.animals[animal_id]
                 animal_class = self.species_map[species]
                 new_animal = animal_class(animal_id, name, age)
                 new_animal.is_vaccinated = is_vaccinated
-                new_animal.last_fed = animal.last_fed
-                new_animal.admission_date = animal.admission_date
+                new_animal.last_fed_ts = animal.last_fed_ts
+                new_animal.admission_ts = animal.admission_ts
+                new_animal.invalid_dates = animal.invalid_dates
                 new_animal.is_adopted = is_adopted
                 if not is_adopted and animal.is_adopted:
-                    for adoption_id, adoption in list(self.adoptions.items()):
-                        if adoption["animal_id"] == animal_id:
-                            del self.adoptions[adoption_id]
-                            break
-                self.animals[animal_id] = new_animal
-                self.data_manager.save_animals(self.animals, self.next_id, self.next_adoption_id)
-                self.data_manager.save_adoptions(self.adoptions)
-                self.refresh_animals_tree()
-                self.refresh_adoptions_tree()
+                    for adoption_id in self.data_manager.get_animal_adoptions(animal_id)[:1]:
+                        self.data_manager.delete_adoption(adoption_id)
+                        self.update_adoption_row(adoption_id)
+                self.data_manager.set_animal(new_animal)
+                self.update_animal_row(animal_id)
                 edit_window.destroy()
                 messagebox.showinfo("Sukces", "Zaktualizowano dane")
             except (ValueError, AssertionError):
@@ -202,27 +232,91 @@ class ShelterApp:
 
     # Oznacza zwierzę jako nakarmione
     def mark_fed(self):
-        selected = self.animals_tree.selection()
+        selected = self.animals_view.selection()
         if not selected:
             messagebox.showerror("Błąd", "Wybierz zwierzę")
             return
-        animal_id = str(self.animals_tree.item(selected[0])["values"][0])
+        animal_id = selected[0]
         animal = self.animals.get(animal_id)
         if not animal:
             messagebox.showerror("Błąd", f"Nie znaleziono zwierzęcia o ID {animal_id}")
             return
-        animal.last_fed = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.data_manager.save_animals(self.animals, self.next_id, self.next_adoption_id)
-        self.refresh_animals_tree()
+        self.feed_animal(animal)
         messagebox.showinfo("Sukces", f"Oznaczono karmienie dla {animal.name}")
 
+    # Zapisuje bieżący czas jako ostatnie karmienie zwierzęcia i aktualizuje jego wiersz w tabeli
+    def feed_animal(self, animal):
+        animal.last_fed_ts = now_timestamp()
+        self.data_manager.set_animal(animal)
+        self.update_animal_row(animal.id)
+
+    # Otwiera okno zwierząt do nakarmienia: zwierzęta w schronisku niekarmione od podanej liczby godzin,
+    # od najpilniejszych; lista jest odświeżana co minutę z kolejki karmienia, bez przeglądania wszystkich zwierząt
+    def open_feeding_window(self):
+        feeding_window = tk.Toplevel(self.root)
+        feeding_window.title("Do nakarmienia")
+        feeding_window.geometry("800x500")
+        feeding_window.minsize(800, 500)
+        feeding_window.grid_rowconfigure(1, weight=1)
+        feeding_window.grid_columnconfigure(0, weight=1)
+        controls = ttk.Frame(feeding_window)
+        controls.grid(row=0, column=0, columnspan=2, sticky="we", padx=5, pady=5)
+        ttk.Label(controls, text="Niekarmione od (godziny):").grid(row=0, column=0, padx=2, sticky="w")
+        hours_var = tk.StringVar(value=str(FEEDING_HOURS))
+        ttk.Spinbox(controls, from_=1, to=168, width=5, textvariable=hours_var).grid(row=0, column=1, padx=2)
+        count_label = ttk.Label(controls, text="")
+        count_label.grid(row=0, column=2, padx=10, sticky="w")
+        feeding_tree = ttk.Treeview(feeding_window, columns=("ID", "Imię", "Gatunek", "Ostatnie karmienie", "Status karmienia"), show="headings")
+        for col in feeding_tree["columns"]:
+            feeding_tree.heading(col, text=col)
+            feeding_tree.column(col, width=100 if col in ["ID", "Gatunek"] else 180)
+        feeding_tree.grid(row=1, column=0, sticky="wens", padx=5)
+        feeding_scrollbar = ttk.Scrollbar(feeding_window, orient=tk.VERTICAL)
+        feeding_scrollbar.grid(row=1, column=1, sticky="ns")
+        now = [now_timestamp()]
+        # Zwraca wartości wiersza, licząc czas od karmienia względem jednego czasu odświeżenia
+        def row_values(animal_id):
+            animal = self.animals[animal_id]
+            return (animal_id, animal.name, animal.species_name, animal.last_fed or "", animal.get_feeding_status(now[0]))
+        feeding_view = VirtualTreeview(feeding_tree, feeding_scrollbar, row_values)
+        timer = [None]
+        # Pobiera listę zwierząt do nakarmienia i planuje kolejne odświeżenie, dopóki okno jest otwarte
+        def refresh():
+            if not feeding_window.winfo_exists():
+                return
+            if timer[0] is not None:
+                feeding_window.after_cancel(timer[0])
+            try:
+                hours = int(hours_var.get())
+            except ValueError:
+                hours = FEEDING_HOURS
+            now[0] = now_timestamp()
+            found = self.data_manager.overdue_feeding(hours, now[0])
+            feeding_view.set_keys(found)
+            count_label.configure(text=f"Do nakarmienia: {len(found)}")
+            timer[0] = feeding_window.after(FEEDING_REFRESH_MS, refresh)
+        # Oznacza karmienie zaznaczonego zwierzęcia i usuwa je z listy
+        def feed_selected():
+            selected = feeding_view.selection()
+            if not selected:
+                messagebox.showerror("Błąd", "Wybierz zwierzę")
+                return
+            self.feed_animal(self.animals[selected[0]])
+            refresh()
+        hours_var.trace_add("write", lambda *args: refresh())
+        buttons = ttk.Frame(feeding_window)
+        buttons.grid(row=2, column=0, columnspan=2, pady=10)
+        ttk.Button(buttons, text="Nakarm", command=feed_selected).grid(row=0, column=0, padx=5)
+        ttk.Button(buttons, text="Odśwież", command=refresh).grid(row=0, column=1, padx=5)
+        refresh()
+
     # Otwiera okno do adopcji zwierzęcia
     def open_adopt_window(self):
-        selected = self.animals_tree.selection()
+        selected = self.animals_view.selection()
         if not selected:
             messagebox.showerror("Błąd", "Wybierz zwierzę")
             return
-        animal_id = str(self.animals_tree.item(selected[0])["values"][0])
+        animal_id = selected[0]
         animal = self.animals.get(animal_id)
         if not animal or animal.is_adopted:
             messagebox.showerror("Błąd", f"Zwierzę {animal.name if animal else 'nie istnieje'} już adoptowane lub nie istnieje")
@@ -248,20 +342,20 @@ class ShelterApp:
                 pesel = pesel_entry.get().strip()
                 phone = phone_entry.get().strip()
                 assert surname and pesel.isdigit() and len(pesel) == 11 and phone.isdigit() and len(phone) == 9
+                animal = self.animals[animal_id]
                 animal.is_adopted = True
                 adoption_id = str(self.next_adoption_id)
                 self.next_adoption_id += 1
-                self.adoptions[adoption_id] = {
+                self.data_manager.set_adoption(adoption_id, {
                     "animal_id": animal_id,
                     "surname": surname,
                     "pesel": pesel,
                     "phone_number": phone,
-                    "adoption_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-                self.data_manager.save_animals(self.animals, self.next_id, self.next_adoption_id)
-                self.data_manager.save_adoptions(self.adoptions)
-                self.refresh_animals_tree()
-                self.refresh_adoptions_tree()
+                    "adoption_date": now_timestamp()
+                })
+                self.data_manager.set_animal(animal)
+                self.update_animal_row(animal_id)
+                self.update_adoption_row(adoption_id)
                 adopt_window.destroy()
                 messagebox.showinfo("Sukces", f"Zwierzę {animal.name} adoptowane")
             except AssertionError:
@@ -270,11 +364,11 @@ class ShelterApp:
 
     # Otwiera okno do edycji danych adopcji
     def open_edit_adoption_window(self):
-        selected = self.adoptions_tree.selection()
+        selected = self.adoptions_view.selection()
         if not selected:
             messagebox.showerror("Błąd", "Wybierz adopcję")
             return
-        adoption_id = str(self.adoptions_tree.item(selected[0])["values"][0])
+        adoption_id = selected[0]
         adoption = self.adoptions.get(adoption_id)
         if not adoption:
             messagebox.showerror("Błąd", f"Nie znaleziono adopcji o ID {adoption_id}")
@@ -305,15 +399,8 @@ class ShelterApp:
                 pesel = pesel_entry.get().strip()
                 phone = phone_entry.get().strip()
                 assert surname and pesel.isdigit() and len(pesel) == 11 and phone.isdigit() and len(phone) == 9
-                self.adoptions[adoption_id] = {
-                    "animal_id": adoption["animal_id"],
-                    "surname": surname,
-                    "pesel": pesel,
-                    "phone_number": phone,
-                    "adoption_date": adoption["adoption_date"]
-                }
-                self.data_manager.save_adoptions(self.adoptions)
-                self.refresh_adoptions_tree()
+                self.data_manager.set_adoption(adoption_id, dict(adoption, surname=surname, pesel=pesel, phone_number=phone))
+                self.update_adoption_row(adoption_id)
                 edit_window.destroy()
                 messagebox.showinfo("Sukces", "Zaktualizowano adopcję")
             except AssertionError:
@@ -362,58 +449,58 @@ class ShelterApp:
         results_tree.grid(row=0, column=0, sticky="wens")
         results_scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=results_tree.yview)
         results_scrollbar.grid(row=0, column=1, sticky="ns")
-        results_tree.configure(yscrollcommand=results_scrollbar.set)
+        results_status = ttk.Label(results_frame, text="")
+        results_status.grid(row=1, column=0, sticky="w")
+        more_button = ttk.Button(results_frame, text="Wczytaj więcej")
+        more_button.grid(row=1, column=0, columnspan=2, sticky="e")
+        results_view = PagedTreeview(results_tree, results_scrollbar, results_status, more_button, self.animal_row_values)
         def validate_date(entry):
             try:
                 date = entry.get_date()
-                return datetime.combine(date, time(0, 0) if entry == admission_from_entry else time(23, 59, 59))
+                return to_timestamp(datetime.combine(date, time(0, 0) if entry == admission_from_entry else time(23, 59, 59)))
             except ValueError:
                 return None
-        # Wykonuje wyszukiwanie zwierząt na podstawie filtrów
+        # Kompiluje filtry formularza w zapytanie; zwraca None, gdy wiek nie jest liczbą
+        def compile_query():
+            age_query = age_entry.get().strip()
+            vaccinated_query = vaccinated_var.get()
+            status_query = status_var.get()
+            age = None
+            if age_query:
+                try:
+                    age = int(age_query)
+                except ValueError:
+                    messagebox.showerror("Błąd", "Wiek musi być liczbą")
+                    return None
+            return AnimalQuery(
+                animal_id=id_entry.get().strip() or None,
+                name=name_entry.get().strip(),
+                age=age,
+                species=self.species_map.get(species_var.get()),
+                vaccinated=None if vaccinated_query == "Wszystkie" else vaccinated_query == "Tak",
+                adopted=None if status_query == "Wszystkie" else status_query == "Adoptowane",
+                admission_from=validate_date(admission_from_entry),
+                admission_to=validate_date(admission_to_entry)
+            )
+        # Pokazuje błąd wyszukiwania zgłoszony przez wątek wyszukiwania
+        def show_error(e):
+            messagebox.showerror("Błąd", f"Wystąpił błąd: {str(e)}")
+        # Indeks jest budowany w wątku Tk, zanim zacznie z niego korzystać wątek wyszukiwania
+        self.data_manager.animal_index
+        live_search = LiveSearch(self.data_manager.search_animals, lambda: self.data_manager.animals, lambda: self.data_manager.animals_version, self.data_manager.lock,
+                                 results_tree, lambda found: results_view.show(ResultPages(found)), show_error)
+        name_entry.bind("<KeyRelease>", lambda event: live_search.schedule(compile_query))
+        # Wykonuje wyszukiwanie zwierząt na podstawie filtrów i wyświetla wyniki stronami
         def perform_search():
-            try:
-                id_query = id_entry.get().strip()
-                name_query = name_entry.get().strip().lower()
-                age_query = age_entry.get().strip()
-                species_query = species_var.get()
-                vaccinated_query = vaccinated_var.get()
-                status_query = status_var.get()
-                admission_from = validate_date(admission_from_entry)
-                admission_to = validate_date(admission_to_entry)
-                for item in results_tree.get_children():
-                    results_tree.delete(item)
-                filtered = list(self.animals.items())
-                if id_query:
-                    filtered = [(k, v) for k, v in filtered if id_query == k]
-                if name_query:
-                    filtered = list(filter(lambda x: name_query in x[1].name.lower(), filtered))
-                if age_query:
-                    try:
-                        age = int(age_query)
-                        filtered = [(k, v) for k, v in filtered if v.age == age]
-                    except ValueError:
-                        messagebox.showerror("Błąd", "Wiek musi być liczbą")
-                        return
-                if species_query != "Wszystkie":
-                    filtered = [(k, v) for k, v in filtered if next(k for k, cls in self.species_map.items() if cls == v.__class__) == species_query]
-                if vaccinated_query != "Wszystkie":
-                    filtered = [(k, v) for k, v in filtered if v.is_vaccinated == (vaccinated_query == "Tak")]
-                if status_query != "Wszystkie":
-                    filtered = [(k, v) for k, v in filtered if v.is_adopted == (status_query == "Adoptowane")]
-                if admission_from and admission_to:
-                    filtered = [(k, v) for k, v in filtered if v.admission_date and admission_from <= datetime.strptime(v.admission_date, "%Y-%m-%d %H:%M:%S") <= admission_to]
-                for animal_id, animal in filtered:
-                    results_tree.insert("", "end", values=(
-                        animal_id, animal.name, animal.age,
-                        next(k for k, v in self.species_map.items() if v == animal.__class__),
-                        "Tak" if animal.is_vaccinated else "Nie",
-                        animal.get_feeding_status(),
-                        animal.admission_date or "",
-                        "Adoptowane" if animal.is_adopted else "W schronisku"
-                    ))
-            except Exception as e:
-                messagebox.showerror("Błąd", f"Wystąpił błąd: {str(e)}")
-        ttk.Button(search_window, text="Szukaj", command=perform_search).grid(row=8, column=0, columnspan=2, pady=10)
+            live_search.start(compile_query)
+        # Ogranicza główną tabelę zwierząt do rekordów spełniających zapytanie
+        def filter_table():
+            query = compile_query()
+            if query is not None:
+                self.filtered_animals = query
+                self.refresh_animals_tree()
+        ttk.Button(search_window, text="Szukaj", command=perform_search).grid(row=8, column=0, pady=10)
+        ttk.Button(search_window, text="Filtruj tabelę", command=filter_table).grid(row=8, column=1, pady=10)
 
     # Otwiera okno wyszukiwania adopcji
     def open_adoption_search_window(self):
@@ -454,53 +541,46 @@ class ShelterApp:
         results_tree.grid(row=0, column=0, sticky="wens")
         results_scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=results_tree.yview)
         results_scrollbar.grid(row=0, column=1, sticky="ns")
-        results_tree.configure(yscrollcommand=results_scrollbar.set)
+        results_status = ttk.Label(results_frame, text="")
+        results_status.grid(row=1, column=0, sticky="w")
+        more_button = ttk.Button(results_frame, text="Wczytaj więcej")
+        more_button.grid(row=1, column=0, columnspan=2, sticky="e")
+        results_view = PagedTreeview(results_tree, results_scrollbar, results_status, more_button, self.adoption_row_values)
         def validate_date(entry):
             try:
                 date = entry.get_date()
-                return datetime.combine(date, time(0, 0) if entry == adoption_from_entry else time(23, 59, 59))
+                return to_timestamp(datetime.combine(date, time(0, 0) if entry == adoption_from_entry else time(23, 59, 59)))
             except ValueError:
                 return None
-        # Wykonuje wyszukiwanie adopcji na podstawie filtrów
+        # Kompiluje filtry formularza w zapytanie
+        def compile_query():
+            return AdoptionQuery(
+                adoption_id=id_entry.get().strip() or None,
+                animal_id=animal_id_entry.get().strip() or None,
+                surname=surname_entry.get().strip(),
+                pesel=pesel_entry.get().strip(),
+                phone_number=phone_entry.get().strip(),
+                adoption_from=validate_date(adoption_from_entry),
+                adoption_to=validate_date(adoption_to_entry)
+            )
+        # Pokazuje błąd wyszukiwania zgłoszony przez wątek wyszukiwania
+        def show_error(e):
+            messagebox.showerror("Błąd", f"Wystąpił błąd: {str(e)}")
+        # Indeks jest budowany w wątku Tk, zanim zacznie z niego korzystać wątek wyszukiwania
+        self.data_manager.adoption_index
+        live_search = LiveSearch(self.data_manager.search_adoptions, lambda: self.data_manager.adoptions, lambda: self.data_manager.adoptions_version, self.data_manager.lock,
+                                 results_tree, lambda found: results_view.show(ResultPages(found)), show_error)
+        for entry in (surname_entry, pesel_entry, phone_entry):
+            entry.bind("<KeyRelease>", lambda event: live_search.schedule(compile_query))
+        # Wykonuje wyszukiwanie adopcji na podstawie filtrów i wyświetla wyniki stronami
         def perform_search():
-            try:
-                id_query = id_entry.get().strip()
-                animal_id_query = animal_id_entry.get().strip()
-                surname_query = surname_entry.get().strip().lower()
-                pesel_query = pesel_entry.get().strip()
-                phone_query = phone_entry.get().strip()
-                adoption_from = validate_date(adoption_from_entry)
-                adoption_to = validate_date(adoption_to_entry)
-                for item in results_tree.get_children():
-                    results_tree.delete(item)
-                filtered = list(self.adoptions.items())
-                if id_query:
-                    filtered = [(k, v) for k, v in filtered if id_query == k]
-                if animal_id_query:
-                    filtered = [(k, v) for k, v in filtered if animal_id_query == v["animal_id"]]
-                if surname_query:
-                    filtered = [(k, v) for k, v in filtered if surname_query in v["surname"].lower()]
-                if pesel_query:
-                    filtered = [(k, v) for k, v in filtered if pesel_query in v["pesel"]]
-                if phone_query:
-                    filtered = [(k, v) for k, v in filtered if phone_query in v["phone_number"]]
-                if adoption_from and adoption_to:
-                    filtered = [(k, v) for k, v in filtered if adoption_from <= datetime.strptime(v["adoption_date"], "%Y-%m-%d %H:%M:%S") <= adoption_to]
-                for adoption_id, adoption in filtered:
-                    results_tree.insert("", "end", values=(
-                        adoption_id, adoption["animal_id"], adoption["surname"],
-                        adoption["pesel"], adoption["phone_number"], adoption["adoption_date"]
-                    ))
-            except Exception as e:
-                messagebox.showerror("Błąd", f"Wystąpił błąd: {str(e)}")
-        ttk.Button(search_window, text="Szukaj", command=perform_search).grid(row=7, column=0, columnspan=2, pady=10)
-
-    # Zlicza zwierzęta danego typu rekurencyjnie
-    def count_animals_by_type(self, animals, animal_class, index=0):
-        if index >= len(animals):
-            return 0
-        count = 1 if isinstance(animals[index][1], animal_class) and not animals[index][1].is_adopted else 0
-        return count + self.count_animals_by_type(animals, animal_class, index + 1)
+            live_search.start(compile_query)
+        # Ogranicza główną tabelę adopcji do rekordów spełniających zapytanie
+        def filter_table():
+            self.filtered_adoptions = compile_query()
+            self.refresh_adoptions_tree()
+        ttk.Button(search_window, text="Szukaj", command=perform_search).grid(row=7, column=0, pady=10)
+        ttk.Button(search_window, text="Filtruj tabelę", command=filter_table).grid(row=7, column=1, pady=10)
 
     # Otwiera okno z raportami i wykresami
     def open_report_window(self):
@@ -519,30 +599,7 @@ class ShelterApp:
         ttk.OptionMenu(report_window, chart_data_var, "Szczepienia", "Szczepienia", "Gatunki").grid(row=1, column=3, padx=2, pady=5)
         # Generuje wykres na podstawie wybranych danych
         def generate_report():
-            animals_list = list(self.animals.items())
-            vaccinated = len(list(filter(lambda x: x[1].is_vaccinated and not x[1].is_adopted, animals_list)))
-            not_vaccinated = len(list(filter(lambda x: not x[1].is_vaccinated and not x[1].is_adopted, animals_list)))
-            dogs = self.count_animals_by_type(animals_list, Dog)
-            cats = self.count_animals_by_type(animals_list, Cat)
-            birds = self.count_animals_by_type(animals_list, Bird)
-            rabbits = self.count_animals_by_type(animals_list, Rabbit)
-            hamsters = self.count_animals_by_type(animals_list, Hamster)
-            turtles = self.count_animals_by_type(animals_list, Turtle)
-            ax.clear()
-            if chart_data_var.get() == "Szczepienia":
-                labels, data = ["Zaszczepione", "Niezaszczepione"], [vaccinated, not_vaccinated]
-            else:
-                labels = ["Psy", "Koty", "Ptaki", "Króliki", "Chomiki", "Żółwie"]
-                data = [dogs, cats, birds, rabbits, hamsters, turtles]
-            if chart_type_var.get() == "Słupkowy":
-                bars = ax.bar(labels, data, color=['#ff9999', '#66b3ff', '#99ff99', '#ffcc99', '#cc99ff', '#99cccc'])
-                for bar in bars:
-                    ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.1, str(bar.get_height()), ha='center', fontsize=10)
-                ax.set_ylabel("Liczba zwierząt")
-            else:
-                ax.pie(data, labels=labels, colors=['#ff9999', '#66b3ff', '#99ff99', '#ffcc99', '#cc99ff', '#99cccc'], autopct='%1.0f%%', textprops={'fontsize': 10})
-                ax.set_ylabel("Procent zwierząt")
-            ax.set_title(f"Statystyki - {chart_data_var.get()}")
+            draw_report(ax, self.data_manager.animal_stats, chart_data_var.get(), chart_type_var.get())
             fig.tight_layout()
             canvas.draw()
         # Zapisuje wykres do pliku
@@ -579,107 +636,107 @@ class ShelterApp:
             tree.heading(header_col, text=header_text + (" ↓" if header_col == col and not current_default and current_reverse else " ↑" if header_col == col and not current_default else ""))
         if is_adoption:
             self.adoptions_sort_column, self.adoptions_sort_reverse, self.adoptions_sort_default = current_column, current_reverse, current_default
-            items = self.adoptions
-            get_key = lambda x: int(x[0]) if col == "ID" else x[1]["animal_id"] if col == "ID zwierzęcia" else x[1][{"Nazwisko": "surname", "PESEL": "pesel", "Numer telefonu": "phone_number", "Data adopcji": "adoption_date"}.get(col, "surname")]
+            self.refresh_adoptions_tree()
         else:
             self.animals_sort_column, self.animals_sort_reverse, self.animals_sort_default = current_column, current_reverse, current_default
-            items = self.animals
-            get_key = lambda x: int(x[0]) if col == "ID" else x[1].name if col == "Imię" else x[1].age if col == "Wiek" else next(k for k, v in self.species_map.items() if v == x[1].__class__) if col == "Gatunek" else ("Tak" if x[1].is_vaccinated else "Nie") if col == "Zaszczepione" else x[1].last_fed or "" if col == "Ostatnie karmienie" else x[1].admission_date or "" if col == "Data przyjęcia" else "Adoptowane" if x[1].is_adopted else "W schronisku"
-        sorted_items = sorted(items.items(), key=lambda x: int(x[0]) if current_default else get_key(x), reverse=current_reverse if not current_default else False)
-        for item in tree.get_children():
-            tree.delete(item)
-        for item_id, data in sorted_items:
-            values = (item_id, data["animal_id"], data["surname"], data["pesel"], data["phone_number"], data["adoption_date"]) if is_adoption else (item_id, data.name, data.age, next(k for k, v in self.species_map.items() if v == data.__class__), "Tak" if data.is_vaccinated else "Nie", data.get_feeding_status(), data.admission_date or "", "Adoptowane" if data.is_adopted else "W schronisku")
-            tree.insert("", tk.END, values=values)
+            self.refresh_animals_tree()
 
-    # Odświeża tabelę zwierząt
+    # Usuwa filtry zapytań z obu tabel i pokazuje wszystkie rekordy
+    def clear_filters(self):
+        self.filtered_animals = None
+        self.filtered_adoptions = None
+        self.refresh_animals_tree()
+        self.refresh_adoptions_tree()
+
+    # Odświeża tabelę zwierząt, biorąc kolejność wierszy z pamięci podręcznej, odnawianej tylko po zmianie danych
     def refresh_animals_tree(self):
-        items = self.filtered_animals or self.animals
-        def get_key(x):
-            if self.animals_sort_default:
-                return int(x[0])
-            if self.animals_sort_column == "ID":
-                return int(x[0])
-            elif self.animals_sort_column == "Imię":
-                return x[1].name
-            elif self.animals_sort_column == "Wiek":
-                return x[1].age
-            elif self.animals_sort_column == "Gatunek":
-                return next(k for k, v in self.species_map.items() if v == x[1].__class__)
-            elif self.animals_sort_column == "Zaszczepione":
-                return "Tak" if x[1].is_vaccinated else "Nie"
-            elif self.animals_sort_column == "Ostatnie karmienie":
-                return x[1].last_fed or ""
-            elif self.animals_sort_column == "Data przyjęcia":
-                return x[1].admission_date or ""
-            else:
-                return "Adoptowane" if x[1].is_adopted else "W schronisku"
-        sorted_items = sorted(items.items(), key=get_key, reverse=self.animals_sort_reverse if not self.animals_sort_default else False)
-        for item in self.animals_tree.get_children():
-            self.animals_tree.delete(item)
-        for animal_id, animal in sorted_items:
-            self.animals_tree.insert("", "end", values=(
-                animal_id, animal.name, animal.age,
-                next(k for k, v in self.species_map.items() if v == animal.__class__),
-                "Tak" if animal.is_vaccinated else "Nie",
-                animal.get_feeding_status(),
-                animal.admission_date or "",
-                "Adoptowane" if animal.is_adopted else "W schronisku"
-            ))
+        column = None if self.animals_sort_default else self.animals_sort_column
+        order = self.animals_order.order(self.animals, self.data_manager.animals_version, column, self.animals_sort_reverse and not self.animals_sort_default)
+        if self.filtered_animals is not None:
+            found = set(self.data_manager.search_animals(self.filtered_animals))
+            order = [animal_id for animal_id in order if animal_id in found]
+        self.animals_view.set_keys(order)
 
-    # Odświeża tabelę adopcji
+    # Aktualizuje w tabeli tylko wiersz podanego zwierzęcia, bez sortowania i przebudowy całej tabeli
+    def update_animal_row(self, animal_id):
+        if animal_id in self.animals and (self.filtered_animals is None or self.filtered_animals.matches(self.animals, animal_id)):
+            row_key = animal_row_key(self.animals, None if self.animals_sort_default else self.animals_sort_column)
+            self.animals_view.update_key(animal_id, row_order(row_key, self.animals_sort_reverse and not self.animals_sort_default))
+        else:
+            self.animals_view.remove_key(animal_id)
+
+    # Zwraca wartości wiersza tabeli zwierząt dla podanego ID
+    def animal_row_values(self, animal_id):
+        animal = self.animals[animal_id]
+        return (
+            animal_id, animal.name, animal.age,
+            animal.species_name,
+            "Tak" if animal.is_vaccinated else "Nie",
+            animal.get_feeding_status(),
+            animal.admission_date or "",
+            "Adoptowane" if animal.is_adopted else "W schronisku"
+        )
+
+    # Odświeża tabelę adopcji, biorąc kolejność wierszy z pamięci podręcznej, odnawianej tylko po zmianie danych
     def refresh_adoptions_tree(self):
-        items = self.filtered_adoptions or self.adoptions
-        get_key = lambda x: int(x[0]) if self.adoptions_sort_default else (int(x[0]) if self.adoptions_sort_column == "ID" else x[1]["animal_id"] if self.adoptions_sort_column == "ID zwierzęcia" else x[1][{"Nazwisko": "surname", "PESEL": "pesel", "Numer telefonu": "phone_number", "Data adopcji": "adoption_date"}.get(self.adoptions_sort_column, "surname")])
-        sorted_items = sorted(items.items(), key=get_key, reverse=self.adoptions_sort_reverse if not self.adoptions_sort_default else False)
-        for item in self.adoptions_tree.get_children():
-            self.adoptions_tree.delete(item)
-        for adoption_id, adoption in sorted_items:
-            self.adoptions_tree.insert("", "end", values=(
-                adoption_id, adoption["animal_id"], adoption["surname"],
-                adoption["pesel"], adoption["phone_number"], adoption["adoption_date"]
-            ))
+        column = None if self.adoptions_sort_default else self.adoptions_sort_column
+        order = self.adoptions_order.order(self.adoptions, self.data_manager.adoptions_version, column, self.adoptions_sort_reverse and not self.adoptions_sort_default)
+        if self.filtered_adoptions is not None:
+            found = set(self.data_manager.search_adoptions(self.filtered_adoptions))
+            order = [adoption_id for adoption_id in order if adoption_id in found]
+        self.adoptions_view.set_keys(order)
+
+    # Aktualizuje w tabeli tylko wiersz podanej adopcji, bez sortowania i przebudowy całej tabeli
+    def update_adoption_row(self, adoption_id):
+        if adoption_id in self.adoptions and (self.filtered_adoptions is None or self.filtered_adoptions.matches(self.adoptions, adoption_id)):
+            row_key = adoption_row_key(self.adoptions, None if self.adoptions_sort_default else self.adoptions_sort_column)
+            self.adoptions_view.update_key(adoption_id, row_order(row_key, self.adoptions_sort_reverse and not self.adoptions_sort_default))
+        else:
+            self.adoptions_view.remove_key(adoption_id)
+
+    # Zwraca wartości wiersza tabeli adopcji dla podanego ID
+    def adoption_row_values(self, adoption_id):
+        adoption = self.adoptions[adoption_id]
+        return (
+            adoption_id, adoption["animal_id"], adoption["surname"],
+            adoption["pesel"], adoption["phone_number"], format_adoption_date(adoption)
+        )
 
     # Usuwa wybrane zwierzę
     @log_action
     def delete_animal(self):
-        selected = self.animals_tree.selection()
+        selected = self.animals_view.selection()
         if not selected:
             messagebox.showerror("Błąd", "Wybierz zwierzę")
             return
-        animal_id = str(self.animals_tree.item(selected[0])["values"][0])
+        animal_id = selected[0]
         animal = self.animals.get(animal_id)
         if animal:
-            if any(adoption["animal_id"] == animal_id for adoption in self.adoptions.values()):
+            if self.data_manager.get_animal_adoptions(animal_id):
                 messagebox.showerror("Błąd", f"Zwierzę {animal.name} jest adoptowane")
                 return
             print(f"Usunięto zwierzę: {animal.name} (ID: {animal_id})")
-            del self.animals[animal_id]
-            self.filtered_animals = None
-            self.data_manager.save_animals(self.animals, self.next_id, self.next_adoption_id)
-            self.refresh_animals_tree()
+            self.data_manager.delete_animal(animal_id)
+            self.update_animal_row(animal_id)
             messagebox.showinfo("Sukces", f"Usunięto zwierzę {animal.name}")
 
     # Usuwa wybraną adopcję
     @log_action
     def delete_adoption(self):
-        selected = self.adoptions_tree.selection()
+        selected = self.adoptions_view.selection()
         if not selected:
             messagebox.showerror("Błąd", "Wybierz adopcję")
             return
-        adoption_id = str(self.adoptions_tree.item(selected[0])["values"][0])
+        adoption_id = selected[0]
         adoption = self.adoptions.get(adoption_id)
         if adoption:
             animal = self.animals.get(adoption["animal_id"])
             if animal:
                 animal.is_adopted = False
-                self.filtered_animals = None
-                self.data_manager.save_animals(self.animals, self.next_id, self.next_adoption_id)
-            del self.adoptions[adoption_id]
-            self.filtered_adoptions = None
-            self.data_manager.save_adoptions(self.adoptions)
-            self.refresh_animals_tree()
-            self.refresh_adoptions_tree()
+                self.data_manager.set_animal(animal)
+                self.update_animal_row(animal.id)
+            self.data_manager.delete_adoption(adoption_id)
+            self.update_adoption_row(adoption_id)
             messagebox.showinfo("Sukces", f"Usunięto adopcję o ID {adoption_id}")
 
     # Importuje dane zwierząt z pliku CSV
@@ -690,14 +747,20 @@ class ShelterApp:
             return
         choice_window = tk.Toplevel(self.root)
         choice_window.title("Opcje importu")
-        choice_window.geometry("400x200")
-        choice_window.minsize(400, 200)
+        choice_window.geometry("400x250")
+        choice_window.minsize(400, 250)
         ttk.Label(choice_window, text="Wybierz tryb importu:").grid(row=0, column=0, columnspan=2, padx=10, pady=10, sticky="w")
         replace_var = tk.BooleanVar(value=True)
         ttk.Radiobutton(choice_window, text="Zastąp dane", variable=replace_var, value=True).grid(row=1, column=0, columnspan=2, padx=10, pady=5)
         ttk.Radiobutton(choice_window, text="Dopisz dane", variable=replace_var, value=False).grid(row=2, column=0, columnspan=2, padx=10, pady=5)
+        progress_bar = ttk.Progressbar(choice_window, mode="determinate", maximum=100)
+        progress_bar.grid(row=4, column=0, columnspan=2, padx=10, pady=5, sticky="we")
+        # Pokazuje postęp importu na podstawie przeczytanej części pliku
+        def show_progress(rows, position, size):
+            progress_bar["value"] = position * 100 / size if size else 100
+            choice_window.update_idletasks()
         def confirm_import():
-            errors = self.data_manager.import_animals_csv(file_path, replace_var.get())
+            errors = self.data_manager.import_animals_csv(file_path, replace_var.get(), progress=show_progress)
             choice_window.destroy()
             if errors:
                 messagebox.showerror("Błąd importu", "\n".join(errors))
@@ -716,14 +779,20 @@ class ShelterApp:
             return
         choice_window = tk.Toplevel(self.root)
         choice_window.title("Opcje importu")
-        choice_window.geometry("400x200")
-        choice_window.minsize(400, 200)
+        choice_window.geometry("400x250")
+        choice_window.minsize(400, 250)
         ttk.Label(choice_window, text="Wybierz tryb importu:").grid(row=0, column=0, columnspan=2, padx=10, pady=10, sticky="w")
         replace_var = tk.BooleanVar(value=True)
         ttk.Radiobutton(choice_window, text="Zastąp dane", variable=replace_var, value=True).grid(row=1, column=0, columnspan=2, padx=10, pady=5)
         ttk.Radiobutton(choice_window, text="Dopisz dane", variable=replace_var, value=False).grid(row=2, column=0, columnspan=2, padx=10, pady=5)
+        progress_bar = ttk.Progressbar(choice_window, mode="determinate", maximum=100)
+        progress_bar.grid(row=4, column=0, columnspan=2, padx=10, pady=5, sticky="we")
+        # Pokazuje postęp importu na podstawie przeczytanej części pliku
+        def show_progress(rows, position, size):
+            progress_bar["value"] = position * 100 / size if size else 100
+            choice_window.update_idletasks()
         def confirm_import():
-            errors = self.data_manager.import_adoptions_csv(file_path, replace_var.get())
+            errors = self.data_manager.import_adoptions_csv(file_path, replace_var.get(), progress=show_progress)
             choice_window.destroy()
             if errors:
                 messagebox.showerror("Błąd importu", "\n".join(errors))
@@ -740,7 +809,7 @@ class ShelterApp:
     # Eksportuje dane zwierząt do pliku CSV
     @log_action
     def export_animals_csv(self):
-        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv"), ("CSV gzip", "*.csv.gz"), ("CSV zstd", "*.csv.zst")])
         if file_path:
             self.data_manager.export_animals_csv(file_path)
             messagebox.showinfo("Sukces", f"Zwierzęta wyeksportowano do {file_path}")
@@ -748,7 +817,7 @@ class ShelterApp:
     # Eksportuje dane adopcji do pliku CSV
     @log_action
     def export_adoptions_csv(self):
-        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv"), ("CSV gzip", "*.csv.gz"), ("CSV zstd", "*.csv.zst")])
         if file_path:
             self.data_manager.export_adoptions_csv(file_path)
             messagebox.showinfo("Sukces", f"Adopcje wyeksportowano do {file_path}")
@@ -0,0 +1,62 @@
+# Wyświetlanie wyników wyszukiwania w ttk.Treeview stronami: najpierw liczba wyników, potem pierwsza strona
+# wstawiana partiami w wywołaniach after(), aby okno nie blokowało się przy dużej liczbie wyników;
+# kolejne strony są doczytywane przyciskiem lub po przewinięciu do końca listy
+class PagedTreeview:
+    # Inicjalizacja z drzewem, paskiem przewijania, etykietą liczby wyników, przyciskiem "więcej"
+    # i funkcją zwracającą wartości wiersza
+    def __init__(self, tree, scrollbar, status_label, more_button, get_values, batch_size=100):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.status_label = status_label
+        self.more_button = more_button
+        self.get_values = get_values
+        self.batch_size = batch_size
+        self.pages = None
+        self.pending = []
+        self.job = None
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        self.tree.bind("<Destroy>", lambda event: self.cancel())
+        self.more_button.configure(command=self.load_more, state="disabled")
+
+    # Pokazuje nowe wyniki: przerywa wstawianie poprzednich, czyści drzewo i zaczyna od pierwszej strony
+    def show(self, pages):
+        self.cancel()
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.pages = pages
+        self.status_label.configure(text=f"Znaleziono: {len(pages)}")
+        self.load_more()
+
+    # Przerywa wstawianie zaplanowane w after()
+    def cancel(self):
+        if self.job is not None:
+            self.tree.after_cancel(self.job)
+            self.job = None
+        self.pending = []
+
+    # Pobiera kolejną stronę wyników i planuje jej wstawienie, o ile poprzednia została już wstawiona
+    def load_more(self):
+        if self.pages is None or self.pending or not self.pages.has_more():
+            return
+        self.pending = self.pages.next_page()
+        self.more_button.configure(state="disabled")
+        self.insert_batch()
+
+    # Wstawia jedną partię wierszy bieżącej strony i planuje następną
+    def insert_batch(self):
+        self.job = None
+        batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+        for key in batch:
+            self.tree.insert("", "end", iid=key, values=self.get_values(key))
+        if self.pending:
+            self.job = self.tree.after(1, self.insert_batch)
+        else:
+            self.status_label.configure(text=f"Znaleziono: {len(self.pages)}, wyświetlono: {self.pages.loaded}")
+            self.more_button.configure(state="normal" if self.pages.has_more() else "disabled")
+
+    # Przekazuje położenie widoku do paska przewijania i doczytuje stronę po dojściu do końca listy
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= 1.0 and float(first) > 0.0:
+            self.load_more()
@@ -0,0 +1,205 @@
+from animal_manager import AnimalStore, is_canonical_id
+
+ROW_TEST_COST = 32
+CANCEL_CHECK = 1024
+
+# Wyjątek przerywający wykonanie zapytania, które przestało być potrzebne (np. zastąpione nowszym)
+class SearchCancelled(Exception):
+    pass
+
+# Warunek planu zapytania: oszacowana liczba pasujących rekordów, funkcja zwracająca zbiór ID z indeksu,
+# test pojedynczego rekordu oraz opcjonalny gotowy zbiór ID z indeksu haszującego (sprawdzany bez odczytu rekordu)
+class Criterion:
+    # Inicjalizacja warunku
+    def __init__(self, estimate, candidates, test, members=None):
+        self.estimate = estimate
+        self.candidates = candidates
+        self.test = test
+        self.members = members
+
+# Skompilowane zapytanie: warunki formularza zamienione raz na testy rekordów, a przy wykonaniu na plan
+# zaczynający od najbardziej selektywnego warunku indeksu; ROW_TEST_COST to przybliżony koszt odczytu
+# i sprawdzenia jednego rekordu względem dodania jednego ID do zbioru z indeksu
+class Query:
+    # Zwraca posortowane ID rekordów spełniających wszystkie warunki: kandydatów daje najbardziej selektywny warunek,
+    # tańsze zbiory indeksów są z nimi przecinane, a pozostałe warunki sprawdzane w jednym przebiegu po rekordach;
+    # funkcja cancelled jest sprawdzana co CANCEL_CHECK rekordów i zwrócenie przez nią True przerywa wykonanie
+    # wyjątkiem SearchCancelled
+    def execute(self, index, fetch, cancelled=None):
+        criteria = sorted(self.criteria(index), key=lambda criterion: criterion.estimate)
+        if not criteria:
+            return index.ids
+        candidates = criteria[0].candidates()
+        tests = []
+        for criterion in criteria[1:]:
+            if not candidates:
+                break
+            if criterion.members is not None:
+                candidates = candidates.intersection(criterion.members)
+            elif criterion.estimate <= ROW_TEST_COST * len(candidates):
+                candidates = candidates.intersection(criterion.candidates())
+            else:
+                tests.append(criterion.test)
+        if not tests:
+            return candidates
+        found = []
+        for position, record_id in enumerate(candidates):
+            if cancelled and position % CANCEL_CHECK == 0 and cancelled():
+                raise SearchCancelled()
+            row = fetch(record_id)
+            if row is not None and all(test(row) for test in tests):
+                found.append(record_id)
+        return found
+
+    # Sprawdza pojedynczy rekord wszystkimi testami, bez użycia indeksów
+    def test_row(self, row):
+        return row is not None and all(test(row) for test in self.tests)
+
+    # Sprawdza, czy wyniki zapytania są podzbiorem wyników poprzedniego zapytania: pozostałe warunki są takie same,
+    # a pola tekstowe zostały tylko wydłużone (fragment nadal zawiera poprzedni, prefiks zaczyna się od poprzedniego)
+    def refines(self, previous):
+        if type(previous) is not type(self):
+            return False
+        if any(getattr(self, field) != getattr(previous, field) for field in self.exact_fields):
+            return False
+        for field in self.substring_fields + self.prefix_fields:
+            old, new = getattr(previous, field), getattr(self, field)
+            if old and not (new and (new.startswith(old) if field in self.prefix_fields else old in new)):
+                return False
+        return True
+
+# Zapytanie o zwierzęta; krotki rekordów mają format AnimalStore.rows()
+class AnimalQuery(Query):
+    exact_fields = ("animal_id", "age", "species", "vaccinated", "adopted", "admission")
+    substring_fields = ("name",)
+    prefix_fields = ()
+
+    # Kompiluje warunki wyszukiwania zwierząt (None lub pusty tekst oznacza brak warunku)
+    def __init__(self, animal_id=None, name=None, age=None, species=None, vaccinated=None, adopted=None, admission_from=None, admission_to=None):
+        self.animal_id = None
+        if animal_id is not None:
+            self.animal_id = int(animal_id) if is_canonical_id(animal_id) else -1
+        self.name = name.lower() if name else None
+        self.age = age
+        self.species = species
+        self.vaccinated = vaccinated
+        self.adopted = adopted
+        self.admission = (admission_from, admission_to) if admission_from is not None and admission_to is not None else None
+        self.tests = [criterion.test for criterion in self.criteria(None)]
+
+    # Zwraca warunki zapytania; przy index=None tylko testy rekordów (bez oszacowań i zbiorów z indeksu)
+    def criteria(self, index):
+        criteria = []
+        if self.animal_id is not None:
+            animal_id = self.animal_id
+            ids = {animal_id} & index.ids if index else None
+            criteria.append(Criterion(len(ids) if index else 0, lambda: ids, lambda row: row[0] == animal_id))
+        if self.name:
+            name = self.name
+            estimate = index and index.names.estimate(name)
+            criteria.append(Criterion(len(index.ids) if index and estimate is None else estimate,
+                                      lambda: index.names.search(name), lambda row: name in row[1].lower()))
+        for value, column, position in ((self.age, "ages", 2), (self.species, "species", 3), (self.vaccinated, "vaccinated", 4), (self.adopted, "adopted", 5)):
+            if value is not None:
+                members = getattr(index, column).get(value) if index else None
+                criteria.append(Criterion(len(members) if index else 0, lambda members=members: members,
+                                          lambda row, value=value, position=position: row[position] == value, members))
+        if self.admission:
+            low, high = self.admission
+            criteria.append(Criterion(index.admission_dates.count(low, high) if index else 0, lambda: index.admission_dates.search(low, high),
+                                      lambda row: row[6] is not None and low <= row[6] <= high))
+        return criteria
+
+    # Zwraca posortowane ID zwierząt spełniających zapytanie
+    def run(self, index, animals, cancelled=None):
+        fetch = animals.row if isinstance(animals, AnimalStore) else lambda animal_id: animal_row(animals.get(str(animal_id)))
+        return [str(animal_id) for animal_id in sorted(self.execute(index, fetch, cancelled))]
+
+    # Sprawdza, czy zwierzę o podanym ID spełnia zapytanie
+    def matches(self, animals, animal_id):
+        return self.test_row(animals.row(animal_id) if isinstance(animals, AnimalStore) else animal_row(animals.get(animal_id)))
+
+# Zapytanie o adopcje; rekordami są słowniki adopcji
+class AdoptionQuery(Query):
+    exact_fields = ("adoption_id", "animal_id", "adoption")
+    substring_fields = ("surname",)
+    prefix_fields = ("pesel", "phone_number")
+
+    # Kompiluje warunki wyszukiwania adopcji (None lub pusty tekst oznacza brak warunku)
+    def __init__(self, adoption_id=None, animal_id=None, surname=None, pesel=None, phone_number=None, adoption_from=None, adoption_to=None):
+        self.adoption_id = adoption_id
+        self.animal_id = animal_id
+        self.surname = surname.lower() if surname else None
+        self.pesel = pesel or None
+        self.phone_number = phone_number or None
+        self.adoption = (adoption_from, adoption_to) if adoption_from is not None and adoption_to is not None else None
+        self.tests = [criterion.test for criterion in self.criteria(None)]
+
+    # Zwraca warunki zapytania; przy index=None tylko testy rekordów (bez oszacowań i zbiorów z indeksu)
+    def criteria(self, index):
+        criteria = []
+        if self.adoption_id is not None:
+            adoption_id = self.adoption_id
+            ids = {adoption_id} & index.ids if index else None
+            criteria.append(Criterion(len(ids) if index else 0, lambda: ids, lambda adoption: adoption["id"] == adoption_id))
+        if self.animal_id is not None:
+            animal_id = self.animal_id
+            members = index.animal_ids.get(animal_id) if index else None
+            criteria.append(Criterion(len(members) if index else 0, lambda: members, lambda adoption: adoption["animal_id"] == animal_id, members))
+        if self.surname:
+            surname = self.surname
+            estimate = index and index.surnames.estimate(surname)
+            criteria.append(Criterion(len(index.ids) if index and estimate is None else estimate,
+                                      lambda: index.surnames.search(surname), lambda adoption: surname in adoption["surname"].lower()))
+        for prefix, column, field in ((self.pesel, "pesels", "pesel"), (self.phone_number, "phone_numbers", "phone_number")):
+            if prefix:
+                prefix_index = getattr(index, column) if index else None
+                criteria.append(Criterion(prefix_index.estimate(prefix) if index else 0, lambda prefix=prefix, prefix_index=prefix_index: prefix_index.search(prefix),
+                                          lambda adoption, prefix=prefix, field=field: adoption[field].startswith(prefix)))
+        if self.adoption:
+            low, high = self.adoption
+            criteria.append(Criterion(index.adoption_dates.count(low, high) if index else 0, lambda: index.adoption_dates.search(low, high),
+                                      lambda adoption: adoption["adoption_date"] is not None and low <= adoption["adoption_date"] <= high))
+        return criteria
+
+    # Zwraca posortowane ID adopcji spełniających zapytanie
+    def run(self, index, adoptions, cancelled=None):
+        return sorted(self.execute(index, lambda adoption_id: adoption_row(adoptions, adoption_id), cancelled), key=int)
+
+    # Sprawdza, czy adopcja o podanym ID spełnia zapytanie
+    def matches(self, adoptions, adoption_id):
+        return self.test_row(adoption_row(adoptions, adoption_id))
+
+# Zwraca krotkę zwierzęcia w formacie AnimalStore.rows() lub None, gdy zwierzęcia nie ma
+def animal_row(animal):
+    if animal is None:
+        return None
+    return (int(animal.id), animal.name, animal.age, animal.__class__, bool(animal.is_vaccinated), bool(animal.is_adopted), animal.admission_ts, animal.last_fed_ts)
+
+# Zwraca adopcję razem z jej ID (potrzebnym w teście ID) lub None, gdy adopcji nie ma
+def adoption_row(adoptions, adoption_id):
+    adoption = adoptions.get(adoption_id)
+    return None if adoption is None else dict(adoption, id=adoption_id)
+
+# Wyniki wyszukiwania udostępniane stronami: liczba wyników jest znana od razu, a kolejne strony ID
+# są wydawane dopiero na żądanie
+class ResultPages:
+    # Inicjalizacja z posortowaną listą ID wyników i rozmiarem strony
+    def __init__(self, ids, page_size=500):
+        self.ids = ids
+        self.page_size = page_size
+        self.loaded = 0
+
+    # Zwraca liczbę wszystkich wyników
+    def __len__(self):
+        return len(self.ids)
+
+    # Sprawdza, czy zostały jeszcze niewydane wyniki
+    def has_more(self):
+        return self.loaded < len(self.ids)
+
+    # Zwraca kolejną stronę ID (pustą listę, gdy wszystkie zostały wydane)
+    def next_page(self):
+        page = self.ids[self.loaded:self.loaded + self.page_size]
+        self.loaded += len(page)
+        return page
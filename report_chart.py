@@ -0,0 +1,23 @@
+from animal_manager import SPECIES_CLASSES, SPECIES_PLURALS
+
+CHART_COLORS = ['#ff9999', '#66b3ff', '#99ff99', '#ffcc99', '#cc99ff', '#99cccc']
+
+# Zwraca etykiety i liczby zwierząt w schronisku dla wybranych danych ("Szczepienia" lub "Gatunki")
+def report_data(stats, chart_data):
+    if chart_data == "Szczepienia":
+        return ["Zaszczepione", "Niezaszczepione"], [stats.count(vaccinated=True, adopted=False), stats.count(vaccinated=False, adopted=False)]
+    return list(SPECIES_PLURALS), [stats.count(species=cls, adopted=False) for cls in SPECIES_CLASSES]
+
+# Rysuje wykres słupkowy lub kołowy na podanych osiach; nie zależy od Tk, więc działa też bez ekranu
+def draw_report(ax, stats, chart_data, chart_type):
+    labels, data = report_data(stats, chart_data)
+    ax.clear()
+    if chart_type == "Słupkowy":
+        bars = ax.bar(labels, data, color=CHART_COLORS)
+        for bar in bars:
+            ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.1, str(bar.get_height()), ha='center', fontsize=10)
+        ax.set_ylabel("Liczba zwierząt")
+    else:
+        ax.pie(data, labels=labels, colors=CHART_COLORS, autopct='%1.0f%%', textprops={'fontsize': 10})
+        ax.set_ylabel("Procent zwierząt")
+    ax.set_title(f"Statystyki - {chart_data}")
@@ -0,0 +1,425 @@
+from bisect import bisect_left, insort
+from animal_manager import is_canonical_id
+
+NGRAM_SIZE = 3
+
+# Zwraca część wspólną zbiorów, zaczynając od najmniejszego; bez warunków zwraca wszystkie ID
+def intersect(sets, all_ids):
+    if not sets:
+        return all_ids
+    sets.sort(key=len)
+    return sets[0].intersection(*sets[1:])
+
+# Indeks haszujący: wartość -> zbiór ID rekordów o tej wartości
+class HashIndex:
+    # Inicjalizacja pustego indeksu
+    def __init__(self):
+        self.buckets = {}
+
+    # Dodaje ID rekordu do zbioru dla wartości
+    def add(self, value, record_id):
+        bucket = self.buckets.get(value)
+        if bucket is None:
+            bucket = self.buckets[value] = set()
+        bucket.add(record_id)
+
+    # Dodaje do pustego indeksu wiele par (wartość, ID) naraz
+    def build(self, pairs):
+        buckets = self.buckets
+        for value, record_id in pairs:
+            bucket = buckets.get(value)
+            if bucket is None:
+                buckets[value] = {record_id}
+            else:
+                bucket.add(record_id)
+
+    # Usuwa ID rekordu ze zbioru dla wartości; zwraca True, gdy zbiór stał się pusty
+    def remove(self, value, record_id):
+        bucket = self.buckets.get(value)
+        if bucket is None:
+            return False
+        bucket.discard(record_id)
+        if not bucket:
+            del self.buckets[value]
+            return True
+        return False
+
+    # Zwraca zbiór ID rekordów o podanej wartości
+    def get(self, value):
+        return self.buckets.get(value, set())
+
+# Indeks n-gramowy do wyszukiwania podciągów bez rozróżniania wielkości liter;
+# n-gramy wskazują różne wartości tekstowe, a dopiero te wskazują ID rekordów
+class NgramIndex:
+    # Inicjalizacja pustego indeksu
+    def __init__(self):
+        self.values = HashIndex()
+        self.grams = {}
+
+    # Dodaje tekst rekordu do indeksu
+    def add(self, text, record_id):
+        text = text.lower()
+        if text not in self.values.buckets:
+            for gram in self.ngrams(text):
+                self.grams.setdefault(gram, set()).add(text)
+        self.values.add(text, record_id)
+
+    # Dodaje do pustego indeksu wiele par (tekst, ID) naraz, licząc n-gramy raz dla każdego różnego tekstu
+    def build(self, pairs):
+        self.values.build((text.lower(), record_id) for text, record_id in pairs)
+        grams = self.grams
+        for text in self.values.buckets:
+            for gram in self.ngrams(text):
+                texts = grams.get(gram)
+                if texts is None:
+                    grams[gram] = {text}
+                else:
+                    texts.add(text)
+
+    # Usuwa tekst rekordu z indeksu, a n-gramy tylko wtedy, gdy żaden rekord nie ma już tego tekstu
+    def remove(self, text, record_id):
+        text = text.lower()
+        if self.values.remove(text, record_id):
+            for gram in self.ngrams(text):
+                texts = self.grams[gram]
+                texts.discard(text)
+                if not texts:
+                    del self.grams[gram]
+
+    # Zwraca zbiór ID rekordów, których tekst zawiera podany fragment
+    def search(self, query):
+        query = query.lower()
+        if len(query) < NGRAM_SIZE:
+            candidates = self.values.buckets
+        else:
+            sets = sorted((self.grams.get(gram, set()) for gram in self.ngrams(query)), key=len)
+            candidates = sets[0].intersection(*sets[1:])
+        result = set()
+        for text in candidates:
+            if query in text:
+                result |= self.values.buckets[text]
+        return result
+
+    # Zwraca górne oszacowanie liczby rekordów zawierających fragment (na podstawie najrzadszego n-gramu)
+    # lub None, gdy fragment jest zbyt krótki, aby skorzystać z n-gramów
+    def estimate(self, query):
+        query = query.lower()
+        if len(query) < NGRAM_SIZE:
+            return None
+        texts = min((self.grams.get(gram, ()) for gram in self.ngrams(query)), key=len)
+        return sum(len(self.values.buckets[text]) for text in texts)
+
+    # Zwraca zbiór n-gramów tekstu
+    @staticmethod
+    def ngrams(text):
+        return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+# Posortowana lista podzielona na bloki, dzięki czemu wstawianie i usuwanie przesuwa tylko jeden mały blok
+class SortedList:
+    BLOCK_SIZE = 1000
+
+    # Inicjalizacja listy z opcjonalnymi elementami początkowymi
+    def __init__(self, items=()):
+        items = sorted(items)
+        self.blocks = [items[i:i + self.BLOCK_SIZE] for i in range(0, len(items), self.BLOCK_SIZE)]
+        self.maxes = [block[-1] for block in self.blocks]
+
+    # Wstawia element w kolejności, dzieląc zbyt duży blok na dwa
+    def add(self, item):
+        if not self.blocks:
+            self.blocks.append([item])
+            self.maxes.append(item)
+            return
+        i = min(bisect_left(self.maxes, item), len(self.blocks) - 1)
+        block = self.blocks[i]
+        insort(block, item)
+        self.maxes[i] = block[-1]
+        if len(block) > 2 * self.BLOCK_SIZE:
+            self.blocks[i:i + 1] = [block[:self.BLOCK_SIZE], block[self.BLOCK_SIZE:]]
+            self.maxes[i:i + 1] = [block[self.BLOCK_SIZE - 1], block[-1]]
+
+    # Usuwa element, jeśli jest na liście
+    def remove(self, item):
+        i = bisect_left(self.maxes, item)
+        if i == len(self.blocks):
+            return
+        block = self.blocks[i]
+        j = bisect_left(block, item)
+        if j < len(block) and block[j] == item:
+            del block[j]
+            if block:
+                self.maxes[i] = block[-1]
+            else:
+                del self.blocks[i]
+                del self.maxes[i]
+
+    # Zwraca kolejne elementy z przedziału [low, high)
+    def irange(self, low, high):
+        for i in range(bisect_left(self.maxes, low), len(self.blocks)):
+            block = self.blocks[i]
+            for item in block[bisect_left(block, low) if block[0] < low else 0:]:
+                if not item < high:
+                    return
+                yield item
+
+    # Zwraca liczbę elementów z przedziału [low, high), sumując długości bloków zamiast przechodzić po elementach
+    def count(self, low, high):
+        blocks = self.blocks
+        first = bisect_left(self.maxes, low)
+        last = bisect_left(self.maxes, high)
+        if first == len(blocks):
+            return 0
+        if first == last:
+            return bisect_left(blocks[first], high) - bisect_left(blocks[first], low)
+        total = len(blocks[first]) - bisect_left(blocks[first], low)
+        total += sum(len(block) for block in blocks[first + 1:last])
+        if last < len(blocks):
+            total += bisect_left(blocks[last], high)
+        return total
+
+    # Zwraca liczbę elementów
+    def __len__(self):
+        return sum(len(block) for block in self.blocks)
+
+# Indeks prefiksowy: posortowana lista różnych wartości przeszukiwana metodą bisekcji
+class PrefixIndex:
+    # Inicjalizacja pustego indeksu
+    def __init__(self):
+        self.values = HashIndex()
+        self.sorted_values = SortedList()
+
+    # Dodaje wartość rekordu do indeksu
+    def add(self, value, record_id):
+        if value not in self.values.buckets:
+            self.sorted_values.add(value)
+        self.values.add(value, record_id)
+
+    # Dodaje do pustego indeksu wiele par (wartość, ID) naraz, sortując różne wartości jeden raz
+    def build(self, pairs):
+        self.values.build(pairs)
+        self.sorted_values = SortedList(self.values.buckets)
+
+    # Usuwa wartość rekordu z indeksu
+    def remove(self, value, record_id):
+        if self.values.remove(value, record_id):
+            self.sorted_values.remove(value)
+
+    # Zwraca oszacowanie liczby rekordów z podanym prefiksem: liczbę pasujących różnych wartości
+    # (numery PESEL i telefonów są zwykle unikalne, więc to zwykle dokładna liczba rekordów)
+    def estimate(self, prefix):
+        return self.sorted_values.count(prefix, prefix + "\U0010ffff")
+
+    # Zwraca zbiór ID rekordów, których wartość zaczyna się od podanego prefiksu
+    def search(self, prefix):
+        result = set()
+        for value in self.sorted_values.irange(prefix, prefix + "\U0010ffff"):
+            result |= self.values.buckets[value]
+        return result
+
+# Indeks zakresowy: pary (znacznik czasu, ID) na posortowanej liście blokowej
+class RangeIndex:
+    # Inicjalizacja pustego indeksu
+    def __init__(self):
+        self.entries = SortedList()
+
+    # Dodaje znacznik czasu rekordu (rekordy bez daty są pomijane)
+    def add(self, key, record_id):
+        if key is not None:
+            self.entries.add((key, record_id))
+
+    # Dodaje do pustego indeksu wiele par (znacznik czasu, ID) naraz, sortując je jeden raz
+    def build(self, pairs):
+        self.entries = SortedList((key, record_id) for key, record_id in pairs if key is not None)
+
+    # Usuwa znacznik czasu rekordu
+    def remove(self, key, record_id):
+        if key is not None:
+            self.entries.remove((key, record_id))
+
+    # Zwraca liczbę rekordów ze znacznikiem czasu w przedziale domkniętym bez tworzenia zbioru ID
+    def count(self, low, high):
+        return self.entries.count((low,), (high + 1,))
+
+    # Zwraca zbiór ID rekordów ze znacznikiem czasu w przedziale domkniętym
+    def search(self, low, high):
+        return {record_id for key, record_id in self.entries.irange((low,), (high + 1,))}
+
+# Kolejka karmienia zwierząt w schronisku (adoptowane są pomijane): pary (ostatnie karmienie, ID) na posortowanej
+# liście blokowej, od najdawniej karmionych; zwierzęta bez daty karmienia są trzymane osobno jako najpilniejsze
+class FeedingSchedule:
+    # Inicjalizacja pustej kolejki
+    def __init__(self):
+        self.entries = SortedList()
+        self.unfed = set()
+
+    # Dodaje zwierzę do kolejki
+    def add(self, last_fed, adopted, record_id):
+        if adopted:
+            return
+        if last_fed is None:
+            self.unfed.add(record_id)
+        else:
+            self.entries.add((last_fed, record_id))
+
+    # Buduje pustą kolejkę z wielu trójek (ostatnie karmienie, adoptowane, ID) naraz, sortując je jeden raz
+    def build(self, triples):
+        pairs = []
+        for last_fed, adopted, record_id in triples:
+            if adopted:
+                continue
+            if last_fed is None:
+                self.unfed.add(record_id)
+            else:
+                pairs.append((last_fed, record_id))
+        self.entries = SortedList(pairs)
+
+    # Usuwa zwierzę z kolejki
+    def remove(self, last_fed, adopted, record_id):
+        if adopted:
+            return
+        if last_fed is None:
+            self.unfed.discard(record_id)
+        else:
+            self.entries.remove((last_fed, record_id))
+
+    # Zwraca liczbę zwierząt karmionych ostatnio nie później niż cutoff (razem z tymi bez daty karmienia)
+    def count(self, cutoff):
+        return len(self.unfed) + self.entries.count((), (cutoff + 1,))
+
+    # Zwraca kolejno ID zwierząt karmionych ostatnio nie później niż cutoff: najpierw bez daty karmienia,
+    # potem od najdawniej karmionych; koszt zależy tylko od liczby zwróconych zwierząt
+    def overdue(self, cutoff):
+        yield from sorted(self.unfed)
+        for last_fed, record_id in self.entries.irange((), (cutoff + 1,)):
+            yield record_id
+
+# Indeksy wyszukiwania zwierząt utrzymywane razem z magazynem zwierząt
+class AnimalIndex:
+    # Inicjalizacja indeksów i opcjonalne zbudowanie ich dla istniejących zwierząt
+    def __init__(self, animals=None):
+        self.ids = set()
+        self.names = NgramIndex()
+        self.ages = HashIndex()
+        self.species = HashIndex()
+        self.vaccinated = HashIndex()
+        self.adopted = HashIndex()
+        self.admission_dates = RangeIndex()
+        self.feeding = FeedingSchedule()
+        if animals:
+            self.build(animals)
+
+    # Buduje indeksy dla wielu zwierząt naraz; magazyn kolumnowy jest czytany wprost z kolumn
+    def build(self, animals):
+        if hasattr(animals, "rows"):
+            rows = list(animals.rows())
+        else:
+            rows = [(int(a.id), a.name, a.age, a.__class__, bool(a.is_vaccinated), bool(a.is_adopted), a.admission_ts, a.last_fed_ts) for a in animals.values()]
+        self.ids = {row[0] for row in rows}
+        self.names.build((row[1], row[0]) for row in rows)
+        self.ages.build((row[2], row[0]) for row in rows)
+        self.species.build((row[3], row[0]) for row in rows)
+        self.vaccinated.build((row[4], row[0]) for row in rows)
+        self.adopted.build((row[5], row[0]) for row in rows)
+        self.admission_dates.build((row[6], row[0]) for row in rows)
+        self.feeding.build((row[7], row[5], row[0]) for row in rows)
+
+    # Dodaje zwierzę do wszystkich indeksów
+    def add(self, animal):
+        animal_id = int(animal.id)
+        self.ids.add(animal_id)
+        self.names.add(animal.name, animal_id)
+        self.ages.add(animal.age, animal_id)
+        self.species.add(animal.__class__, animal_id)
+        self.vaccinated.add(bool(animal.is_vaccinated), animal_id)
+        self.adopted.add(bool(animal.is_adopted), animal_id)
+        self.admission_dates.add(animal.admission_ts, animal_id)
+        self.feeding.add(animal.last_fed_ts, bool(animal.is_adopted), animal_id)
+
+    # Usuwa zwierzę ze wszystkich indeksów
+    def remove(self, animal):
+        animal_id = int(animal.id)
+        self.ids.discard(animal_id)
+        self.names.remove(animal.name, animal_id)
+        self.ages.remove(animal.age, animal_id)
+        self.species.remove(animal.__class__, animal_id)
+        self.vaccinated.remove(bool(animal.is_vaccinated), animal_id)
+        self.adopted.remove(bool(animal.is_adopted), animal_id)
+        self.admission_dates.remove(animal.admission_ts, animal_id)
+        self.feeding.remove(animal.last_fed_ts, bool(animal.is_adopted), animal_id)
+
+    # Zwraca posortowane ID zwierząt spełniających wszystkie podane warunki (None oznacza brak warunku)
+    def search(self, animal_id=None, name=None, age=None, species=None, vaccinated=None, adopted=None, admission_from=None, admission_to=None):
+        sets = []
+        if animal_id is not None:
+            sets.append({int(animal_id)} & self.ids if is_canonical_id(animal_id) else set())
+        if name:
+            sets.append(self.names.search(name))
+        if age is not None:
+            sets.append(self.ages.get(age))
+        if species is not None:
+            sets.append(self.species.get(species))
+        if vaccinated is not None:
+            sets.append(self.vaccinated.get(vaccinated))
+        if adopted is not None:
+            sets.append(self.adopted.get(adopted))
+        if admission_from is not None and admission_to is not None:
+            sets.append(self.admission_dates.search(admission_from, admission_to))
+        return [str(i) for i in sorted(intersect(sets, self.ids))]
+
+# Indeksy wyszukiwania adopcji utrzymywane razem ze słownikiem adopcji
+class AdoptionIndex:
+    # Inicjalizacja indeksów i opcjonalne zbudowanie ich dla istniejących adopcji
+    def __init__(self, adoptions=None):
+        self.ids = set()
+        self.animal_ids = HashIndex()
+        self.surnames = NgramIndex()
+        self.pesels = PrefixIndex()
+        self.phone_numbers = PrefixIndex()
+        self.adoption_dates = RangeIndex()
+        if adoptions:
+            self.build(adoptions)
+
+    # Buduje indeksy dla wielu adopcji naraz
+    def build(self, adoptions):
+        items = list(adoptions.items())
+        self.ids = set(adoptions)
+        self.animal_ids.build((adoption["animal_id"], adoption_id) for adoption_id, adoption in items)
+        self.surnames.build((adoption["surname"], adoption_id) for adoption_id, adoption in items)
+        self.pesels.build((adoption["pesel"], adoption_id) for adoption_id, adoption in items)
+        self.phone_numbers.build((adoption["phone_number"], adoption_id) for adoption_id, adoption in items)
+        self.adoption_dates.build((adoption["adoption_date"], adoption_id) for adoption_id, adoption in items)
+
+    # Dodaje adopcję do wszystkich indeksów
+    def add(self, adoption_id, adoption):
+        self.ids.add(adoption_id)
+        self.animal_ids.add(adoption["animal_id"], adoption_id)
+        self.surnames.add(adoption["surname"], adoption_id)
+        self.pesels.add(adoption["pesel"], adoption_id)
+        self.phone_numbers.add(adoption["phone_number"], adoption_id)
+        self.adoption_dates.add(adoption["adoption_date"], adoption_id)
+
+    # Usuwa adopcję ze wszystkich indeksów
+    def remove(self, adoption_id, adoption):
+        self.ids.discard(adoption_id)
+        self.animal_ids.remove(adoption["animal_id"], adoption_id)
+        self.surnames.remove(adoption["surname"], adoption_id)
+        self.pesels.remove(adoption["pesel"], adoption_id)
+        self.phone_numbers.remove(adoption["phone_number"], adoption_id)
+        self.adoption_dates.remove(adoption["adoption_date"], adoption_id)
+
+    # Zwraca posortowane ID adopcji spełniających wszystkie podane warunki (None oznacza brak warunku)
+    def search(self, adoption_id=None, animal_id=None, surname=None, pesel=None, phone_number=None, adoption_from=None, adoption_to=None):
+        sets = []
+        if adoption_id is not None:
+            sets.append({adoption_id} & self.ids)
+        if animal_id is not None:
+            sets.append(self.animal_ids.get(animal_id))
+        if surname:
+            sets.append(self.surnames.search(surname))
+        if pesel:
+            sets.append(self.pesels.search(pesel))
+        if phone_number:
+            sets.append(self.phone_numbers.search(phone_number))
+        if adoption_from is not None and adoption_to is not None:
+            sets.append(self.adoption_dates.search(adoption_from, adoption_to))
+        return sorted(intersect(sets, self.ids), key=int)
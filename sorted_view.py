@@ -0,0 +1,125 @@
+from animal_manager import AnimalStore, SPECIES_NAMES, VACCINATED, ADOPTED, INVALID_TIMESTAMP, NO_TIMESTAMP, timestamp_key
+
+# Zwraca klucz sortowania wartości kolumny dat magazynu, w którym brak daty (również nieprawidłowej) jest najwcześniejszy
+def stored_timestamp_key(seconds):
+    return NO_TIMESTAMP if seconds <= INVALID_TIMESTAMP else seconds
+
+# Reguły sortowania kolumn tabeli zwierząt: kolumna magazynu i funkcja zamieniająca jej wartość na klucz (None oznacza
+# samą wartość); z tych samych reguł korzystają klucze całych kolumn i klucze pojedynczych wierszy
+ANIMAL_SORT_KEYS = {
+    "Imię": ("names", None),
+    "Wiek": ("ages", None),
+    "Gatunek": ("species", SPECIES_NAMES.__getitem__),
+    "Zaszczepione": ("flags", lambda flags: "Tak" if flags & VACCINATED else "Nie"),
+    "Ostatnie karmienie": ("last_fed", stored_timestamp_key),
+    "Data przyjęcia": ("admission_dates", stored_timestamp_key),
+    "Status": ("flags", lambda flags: "Adoptowane" if flags & ADOPTED else "W schronisku")
+}
+
+# Reguły sortowania kolumn tabeli adopcji: funkcja zwracająca klucz adopcji
+ADOPTION_SORT_KEYS = {
+    "ID zwierzęcia": lambda adoption: adoption["animal_id"],
+    "Nazwisko": lambda adoption: adoption["surname"],
+    "PESEL": lambda adoption: adoption["pesel"],
+    "Numer telefonu": lambda adoption: adoption["phone_number"],
+    "Data adopcji": lambda adoption: timestamp_key(adoption["adoption_date"])
+}
+
+# Zwraca ID zwierząt w kolejności rosnącej i klucze sortowania kolumny tabeli zwierząt, czytane wprost z kolumn
+# magazynu (None oznacza domyślną kolejność ID)
+def animal_column_keys(animals, column):
+    store = animals if isinstance(animals, AnimalStore) else AnimalStore(animals)
+    ids = [str(animal_id) for animal_id in store.ids]
+    if column is None or column == "ID":
+        return ids, None
+    name, key = ANIMAL_SORT_KEYS.get(column, ANIMAL_SORT_KEYS["Status"])
+    values = getattr(store, name)
+    return ids, list(values) if key is None else [key(value) for value in values]
+
+# Zwraca funkcję dającą klucz sortowania kolumny tabeli zwierząt dla pojedynczego ID, zgodny z animal_column_keys
+def animal_row_key(animals, column):
+    if column is None or column == "ID":
+        return int
+    store = animals if isinstance(animals, AnimalStore) else AnimalStore(animals)
+    name, key = ANIMAL_SORT_KEYS.get(column, ANIMAL_SORT_KEYS["Status"])
+    values = getattr(store, name)
+    if key is None:
+        return lambda animal_id: values[store.find(animal_id)]
+    return lambda animal_id: key(values[store.find(animal_id)])
+
+# Zwraca ID adopcji w kolejności rosnącej i klucze sortowania kolumny tabeli adopcji (None oznacza domyślną kolejność ID)
+def adoption_column_keys(adoptions, column):
+    ids = sorted(adoptions, key=int)
+    if column is None or column == "ID":
+        return ids, None
+    key = ADOPTION_SORT_KEYS.get(column, ADOPTION_SORT_KEYS["Nazwisko"])
+    return ids, [key(adoptions[adoption_id]) for adoption_id in ids]
+
+# Zwraca funkcję dającą klucz sortowania kolumny tabeli adopcji dla pojedynczego ID, zgodny z adoption_column_keys
+def adoption_row_key(adoptions, column):
+    if column is None or column == "ID":
+        return int
+    key = ADOPTION_SORT_KEYS.get(column, ADOPTION_SORT_KEYS["Nazwisko"])
+    return lambda adoption_id: key(adoptions[adoption_id])
+
+# Zwraca funkcję porównującą dwa ID według klucza wiersza; remisy rozstrzyga rosnące ID, jak w SortedViewCache
+def row_order(row_key, reverse):
+    def before(a, b):
+        key_a, key_b = row_key(a), row_key(b)
+        if key_a == key_b:
+            return int(a) < int(b)
+        return key_a > key_b if reverse else key_a < key_b
+    return before
+
+# Odwraca kolejność rosnącą bez ponownego sortowania; grupy równych kluczy zachowują kolejność rosnących ID,
+# tak jak przy sortowaniu z reverse=True
+def reverse_order(order, keys):
+    if len(order) < 2:
+        return list(order)
+    starts = [0]
+    starts.extend(i for i in range(1, len(keys)) if keys[i] != keys[i - 1])
+    if len(starts) == len(order):
+        return order[::-1]
+    result = []
+    end = len(order)
+    for start in reversed(starts):
+        result.extend(order[start:end])
+        end = start
+    return result
+
+# Pamięć podręczna kolejności wierszy tabeli: dla każdej kolumny przechowuje klucze i kolejność rosnącą,
+# a kolejność malejącą tworzy przez odwrócenie; zmiana danych (inny zbiór lub numer wersji) czyści pamięć
+class SortedViewCache:
+    # Inicjalizacja z funkcją zwracającą (ID w kolejności rosnącej, klucze kolumny) dla zbioru danych
+    def __init__(self, column_keys):
+        self.column_keys = column_keys
+        self.source = None
+        self.version = None
+        self.ascending = {}
+        self.orders = {}
+
+    # Zwraca listę ID posortowaną według kolumny (None oznacza kolejność ID); remisy rozstrzyga rosnące ID
+    def order(self, collection, version, column, reverse=False):
+        if collection is not self.source or version != self.version:
+            self.source = collection
+            self.version = version
+            self.ascending = {}
+            self.orders = {}
+        order = self.orders.get((column, reverse))
+        if order is None:
+            if column not in self.ascending:
+                ids, keys = self.column_keys(collection, column)
+                if keys is not None:
+                    positions = sorted(range(len(ids)), key=keys.__getitem__)
+                    ids = [ids[i] for i in positions]
+                    keys = [keys[i] for i in positions]
+                self.ascending[column] = ids, keys
+            ids, keys = self.ascending[column]
+            if not reverse:
+                order = ids
+            elif keys is None:
+                order = ids[::-1]
+            else:
+                order = reverse_order(ids, keys)
+            self.orders[(column, reverse)] = order
+        return order
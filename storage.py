@@ -0,0 +1,507 @@
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from decorators import log_action, count_bytes
+
+# Błąd zgłaszany, gdy migawki ani jej kopii zapasowej nie da się odczytać lub suma kontrolna się nie zgadza
+class SnapshotError(ValueError):
+    pass
+
+
+# Klasa zapisująca dane schroniska w plikach JSON z opcjonalnym dziennikiem zmian; migawki są zapisywane
+# atomowo (plik tymczasowy, fsync, zmiana nazwy) z sumą kontrolną i kopią zapasową poprzedniej wersji
+class JsonStorage:
+    # Inicjalizacja magazynu z nazwami plików, trybem dziennika i funkcją zgłaszania odzyskania kopii zapasowej
+    def __init__(self, animals_filename, adoptions_filename, journal=False, on_error=None):
+        self.animals_filename = animals_filename
+        self.adoptions_filename = adoptions_filename
+        self.incremental = journal
+        self.animals_journal_filename = animals_filename + ".journal"
+        self.adoptions_journal_filename = adoptions_filename + ".journal"
+        self.animals_journal_entries = 0
+        self.adoptions_journal_entries = 0
+        self.on_error = on_error
+        self.group_depth = 0
+        self.unsynced = set()
+
+    # Wczytuje migawkę zwierząt i nakłada na nią wpisy z dziennika
+    @log_action
+    def load_animals(self):
+        data = self.read_snapshot(self.animals_filename)
+        animals = {str(k): v for k, v in data["animals"].items()}
+        meta = {"next_id": data.get("next_id", 1), "next_adoption_id": data.get("next_adoption_id", 1)}
+        self.animals_journal_entries = 0
+        for entry in self.read_journal(self.animals_journal_filename):
+            self.apply_entry(animals, entry)
+            meta["next_id"] = entry.get("next_id", meta["next_id"])
+            meta["next_adoption_id"] = entry.get("next_adoption_id", meta["next_adoption_id"])
+            self.animals_journal_entries += 1
+        return animals, meta
+
+    # Wczytuje migawkę adopcji i nakłada na nią wpisy z dziennika
+    @log_action
+    def load_adoptions(self):
+        data = self.read_snapshot(self.adoptions_filename)
+        adoptions = {str(k): v for k, v in data.get("adoptions", {}).items()}
+        next_adoption_id = None
+        self.adoptions_journal_entries = 0
+        for entry in self.read_journal(self.adoptions_journal_filename):
+            self.apply_entry(adoptions, entry)
+            next_adoption_id = entry.get("next_adoption_id", next_adoption_id)
+            self.adoptions_journal_entries += 1
+        return adoptions, next_adoption_id
+
+    # Zapisuje pełną migawkę zwierząt i czyści dziennik zwierząt
+    @log_action
+    def save_animals(self, records, meta):
+        self.write_snapshot(self.animals_filename, {"animals": records, **meta})
+        self.clear_journal(self.animals_journal_filename)
+        self.animals_journal_entries = 0
+
+    # Zapisuje pełną migawkę adopcji i czyści dziennik adopcji
+    @log_action
+    def save_adoptions(self, records):
+        self.write_snapshot(self.adoptions_filename, {"adoptions": records})
+        self.clear_journal(self.adoptions_journal_filename)
+        self.adoptions_journal_entries = 0
+
+    # Dopisuje zmienione lub usunięte (None) rekordy zwierząt do dziennika
+    @log_action
+    def update_animals(self, records, meta):
+        self.append_journal(self.animals_journal_filename, [{"id": k, "data": v, **meta} for k, v in records.items()])
+        self.animals_journal_entries += len(records)
+        return self.animals_journal_entries
+
+    # Dopisuje zmienione lub usunięte (None) rekordy adopcji do dziennika
+    @log_action
+    def update_adoptions(self, records, next_adoption_id):
+        self.append_journal(self.adoptions_journal_filename, [{"id": k, "data": v, "next_adoption_id": next_adoption_id} for k, v in records.items()])
+        self.adoptions_journal_entries += len(records)
+        return self.adoptions_journal_entries
+
+    # Ustawia liczby wpisów w dziennikach, gdy dane wczytano z migawki binarnej zamiast z plików JSON
+    def restore_journal_entries(self, animals_entries, adoptions_entries):
+        self.animals_journal_entries = animals_entries
+        self.adoptions_journal_entries = adoptions_entries
+
+    # Grupuje zapisy: synchronizacja dzienników i katalogów z dyskiem odbywa się raz, na końcu grupy
+    @contextmanager
+    def group(self):
+        self.group_depth += 1
+        try:
+            yield
+        finally:
+            self.group_depth -= 1
+            if not self.group_depth:
+                self.sync_pending()
+
+    # Zapisuje migawkę do pliku tymczasowego, utrwala ją na dysku i podmienia plik docelowy,
+    # zachowując poprzednią wersję jako kopię zapasową
+    def write_snapshot(self, filename, document):
+        document = dict(document, checksum=self.checksum(document))
+        temp_filename = filename + ".tmp"
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+            count_bytes(f.tell())
+        if os.path.exists(filename):
+            os.replace(filename, filename + ".bak")
+        os.replace(temp_filename, filename)
+        self.sync_later(os.path.dirname(os.path.abspath(filename)))
+
+    # Odczytuje migawkę i sprawdza sumę kontrolną; przy błędzie lub braku pliku po przerwanej podmianie
+    # wczytuje kopię zapasową; gdy i jej nie da się odczytać, odkłada pliki jako .corrupt, aby kolejne
+    # zapisy ich nie nadpisały, i zgłasza SnapshotError
+    def read_snapshot(self, filename):
+        backup_filename = filename + ".bak"
+        try:
+            return self.load_document(filename)
+        except FileNotFoundError:
+            if not os.path.exists(backup_filename):
+                raise
+            error = None
+        except ValueError as e:
+            error = e
+        try:
+            document = self.load_document(backup_filename)
+        except (OSError, ValueError) as e:
+            moved = self.quarantine_files(filename)
+            raise SnapshotError(f"Uszkodzony plik {filename} ({error or e}) bez czytelnej kopii zapasowej; pliki przeniesiono: {', '.join(moved)}")
+        if error is not None:
+            self.quarantine(filename)
+            if self.on_error:
+                self.on_error(f"Uszkodzony plik {filename} ({error}), wczytano kopię zapasową")
+        return document
+
+    # Odkłada migawkę, jej kopię zapasową i dziennik jako .corrupt i zwraca nowe nazwy przeniesionych plików
+    def quarantine_files(self, filename):
+        moved = (self.quarantine(filename + suffix) for suffix in ("", ".bak", ".journal"))
+        return [target for target in moved if target]
+
+    # Przenosi plik pod pierwszą wolną nazwę .corrupt (.corrupt.1, .corrupt.2, ...), nie nadpisując wcześniej
+    # odłożonych plików, i zwraca nową nazwę (None, gdy pliku nie ma)
+    @staticmethod
+    def quarantine(filename):
+        if not os.path.exists(filename):
+            return None
+        target = filename + ".corrupt"
+        number = 0
+        while os.path.exists(target):
+            number += 1
+            target = f"{filename}.corrupt.{number}"
+        os.replace(filename, target)
+        return target
+
+    # Wczytuje dokument JSON i weryfikuje jego sumę kontrolną (pliki bez sumy są akceptowane)
+    def load_document(self, filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        checksum = document.pop("checksum", None)
+        if checksum is not None and checksum != self.checksum(document):
+            raise SnapshotError("Nieprawidłowa suma kontrolna")
+        return document
+
+    # Zwraca sumę kontrolną SHA-256 dokumentu w postaci kanonicznej
+    @staticmethod
+    def checksum(document):
+        return hashlib.sha256(json.dumps(document, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode('utf-8')).hexdigest()
+
+    # Oznacza plik lub katalog do utrwalenia na dysku; poza grupą utrwala go od razu
+    def sync_later(self, path):
+        self.unsynced.add(path)
+        if not self.group_depth:
+            self.sync_pending()
+
+    # Utrwala na dysku oznaczone pliki dziennika i katalogi (katalogi tylko w systemach POSIX)
+    def sync_pending(self):
+        paths, self.unsynced = self.unsynced, set()
+        for path in paths:
+            if os.path.isdir(path):
+                if os.name != "posix":
+                    continue
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            elif os.path.exists(path):
+                with open(path, 'a') as f:
+                    os.fsync(f.fileno())
+
+    # Nakłada pojedynczy wpis dziennika na słownik rekordów
+    @staticmethod
+    def apply_entry(records, entry):
+        if entry["data"] is None:
+            records.pop(str(entry["id"]), None)
+        else:
+            records[str(entry["id"])] = entry["data"]
+
+    # Odczytuje wpisy dziennika i obcina urwany ostatni wiersz po awarii
+    @staticmethod
+    def read_journal(filename):
+        if not os.path.exists(filename):
+            return []
+        entries = []
+        valid_size = 0
+        with open(filename, 'rb+') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("Urwany wpis dziennika")
+                    entries.append(json.loads(line.decode('utf-8')))
+                except ValueError:
+                    f.truncate(valid_size)
+                    break
+                valid_size += len(line)
+        return entries
+
+    # Dopisuje wpisy na końcu pliku dziennika, po jednym wierszu JSON na zmianę, i planuje ich utrwalenie
+    def append_journal(self, filename, entries):
+        data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries).encode('utf-8')
+        with open(filename, 'ab') as f:
+            f.write(data)
+        count_bytes(len(data))
+        self.sync_later(filename)
+
+    # Usuwa plik dziennika po zapisaniu świeżej migawki
+    @staticmethod
+    def clear_journal(filename):
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+# Klasa zapisująca dane schroniska w bazie SQLite z aktualizacją pojedynczych wierszy; aplikacja wczytuje dane
+# do pamięci i wyszukuje w indeksach w pamięci, a indeksy SQL służą zapytaniom narzędzi zewnętrznych
+# (raporty, zapytania ad hoc) do tej samej bazy
+class SqliteStorage:
+    incremental = True
+
+    # Inicjalizacja połączenia z bazą i utworzenie tabel oraz indeksów
+    def __init__(self, database_filename):
+        self.database_filename = database_filename
+        self.connection = sqlite3.connect(database_filename, check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS animals (
+                id INTEGER PRIMARY KEY,
+                species TEXT NOT NULL,
+                name TEXT NOT NULL,
+                age INTEGER NOT NULL,
+                is_adopted INTEGER NOT NULL,
+                is_vaccinated INTEGER NOT NULL,
+                last_fed TEXT,
+                admission_date TEXT
+            );
+            CREATE TABLE IF NOT EXISTS adoptions (
+                id INTEGER PRIMARY KEY,
+                animal_id INTEGER NOT NULL,
+                surname TEXT NOT NULL,
+                pesel TEXT NOT NULL,
+                phone_number TEXT NOT NULL,
+                adoption_date TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS animals_species ON animals (species);
+            CREATE INDEX IF NOT EXISTS animals_is_adopted ON animals (is_adopted);
+            CREATE INDEX IF NOT EXISTS animals_admission_date ON animals (admission_date);
+            CREATE INDEX IF NOT EXISTS adoptions_surname ON adoptions (surname);
+            CREATE INDEX IF NOT EXISTS adoptions_pesel ON adoptions (pesel);
+            CREATE INDEX IF NOT EXISTS adoptions_animal_id ON adoptions (animal_id);
+        """)
+
+    # Wczytuje wszystkie zwierzęta i liczniki identyfikatorów
+    @log_action
+    def load_animals(self):
+        rows = self.connection.execute("SELECT id, species, name, age, is_adopted, is_vaccinated, last_fed, admission_date FROM animals")
+        animals = {str(row[0]): {
+            "species": row[1],
+            "name": row[2],
+            "age": row[3],
+            "is_adopted": bool(row[4]),
+            "is_vaccinated": bool(row[5]),
+            "last_fed": row[6],
+            "admission_date": row[7]
+        } for row in rows}
+        meta = {"next_id": 1, "next_adoption_id": 1}
+        meta.update(self.connection.execute("SELECT key, value FROM meta"))
+        return animals, meta
+
+    # Wczytuje wszystkie adopcje
+    @log_action
+    def load_adoptions(self):
+        rows = self.connection.execute("SELECT id, animal_id, surname, pesel, phone_number, adoption_date FROM adoptions")
+        adoptions = {str(row[0]): {
+            "animal_id": str(row[1]),
+            "surname": row[2],
+            "pesel": row[3],
+            "phone_number": row[4],
+            "adoption_date": row[5]
+        } for row in rows}
+        return adoptions, None
+
+    # Zastępuje zawartość tabeli zwierząt pełnym zestawem rekordów
+    @log_action
+    def save_animals(self, records, meta):
+        with self.connection:
+            self.connection.execute("DELETE FROM animals")
+            self.insert_animals(records)
+            self.save_meta(meta)
+
+    # Zastępuje zawartość tabeli adopcji pełnym zestawem rekordów
+    @log_action
+    def save_adoptions(self, records):
+        with self.connection:
+            self.connection.execute("DELETE FROM adoptions")
+            self.insert_adoptions(records)
+
+    # Aktualizuje lub usuwa (None) pojedyncze wiersze zwierząt
+    @log_action
+    def update_animals(self, records, meta):
+        with self.connection:
+            self.connection.executemany("DELETE FROM animals WHERE id = ?", [(int(k),) for k, v in records.items() if v is None])
+            self.insert_animals({k: v for k, v in records.items() if v is not None})
+            self.save_meta(meta)
+        return 0
+
+    # Aktualizuje lub usuwa (None) pojedyncze wiersze adopcji
+    @log_action
+    def update_adoptions(self, records, next_adoption_id):
+        with self.connection:
+            self.connection.executemany("DELETE FROM adoptions WHERE id = ?", [(int(k),) for k, v in records.items() if v is None])
+            self.insert_adoptions({k: v for k, v in records.items() if v is not None})
+            self.save_meta({"next_adoption_id": next_adoption_id})
+        return 0
+
+    # Wstawia lub nadpisuje wiersze zwierząt
+    def insert_animals(self, records):
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO animals (id, species, name, age, is_adopted, is_vaccinated, last_fed, admission_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(int(k), v["species"], v["name"], v["age"], v["is_adopted"], v["is_vaccinated"], v["last_fed"], v["admission_date"]) for k, v in records.items()]
+        )
+
+    # Wstawia lub nadpisuje wiersze adopcji
+    def insert_adoptions(self, records):
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO adoptions (id, animal_id, surname, pesel, phone_number, adoption_date) VALUES (?, ?, ?, ?, ?, ?)",
+            [(int(k), int(v["animal_id"]), v["surname"], v["pesel"], v["phone_number"], v["adoption_date"]) for k, v in records.items()]
+        )
+
+    # Zapisuje liczniki identyfikatorów
+    def save_meta(self, meta):
+        self.connection.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", meta.items())
+
+    # Zwraca pusty kontekst grupowania; SQLite sam utrwala każdą transakcję
+    def group(self):
+        return nullcontext()
+
+    # Zamyka połączenie z bazą
+    def close(self):
+        self.connection.close()
+
+
+# Klasa przekazująca zapisy innego magazynu do osobnego wątku; zmiany zgłoszone w trakcie zapisu
+# lub w krótkim odstępie czasu są łączone w jeden zapis
+class BackgroundStorage:
+    # Inicjalizacja z magazynem docelowym, funkcją zgłaszania błędów i czasem oczekiwania na kolejne zmiany
+    def __init__(self, storage, on_error=None, delay=0.1):
+        self.storage = storage
+        self.incremental = storage.incremental
+        self.on_error = on_error
+        self.delay = delay
+        self.counts_entries = hasattr(storage, "animals_journal_entries")
+        self.entries = {"animals": 0, "adoptions": 0}
+        self.pending = self.empty_pending()
+        self.dirty = False
+        self.writing = False
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name="BackgroundStorage", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    # Zwraca pusty zestaw oczekujących zmian dla obu tabel
+    @staticmethod
+    def empty_pending():
+        return {table: {"snapshot": None, "updates": {}, "meta": None} for table in ("animals", "adoptions")}
+
+    # Zapisuje wszystkie oczekujące zmiany i wczytuje migawkę zwierząt
+    def load_animals(self):
+        self.flush()
+        result = self.storage.load_animals()
+        self.entries["animals"] = getattr(self.storage, "animals_journal_entries", 0)
+        return result
+
+    # Zapisuje wszystkie oczekujące zmiany i wczytuje migawkę adopcji
+    def load_adoptions(self):
+        self.flush()
+        result = self.storage.load_adoptions()
+        self.entries["adoptions"] = getattr(self.storage, "adoptions_journal_entries", 0)
+        return result
+
+    # Ustawia liczby wpisów w dziennikach magazynu docelowego i ich szacunki w wątku zapisu
+    def restore_journal_entries(self, animals_entries, adoptions_entries):
+        self.flush()
+        self.storage.restore_journal_entries(animals_entries, adoptions_entries)
+        if self.counts_entries:
+            self.entries = {"animals": animals_entries, "adoptions": adoptions_entries}
+
+    # Planuje zapis pełnej migawki zwierząt, zastępując oczekujące zmiany pojedynczych rekordów
+    def save_animals(self, records, meta):
+        self.schedule("animals", snapshot=(records, meta))
+
+    # Planuje zapis pełnej migawki adopcji, zastępując oczekujące zmiany pojedynczych rekordów
+    def save_adoptions(self, records):
+        self.schedule("adoptions", snapshot=(records,))
+
+    # Planuje zapis zmienionych lub usuniętych (None) rekordów zwierząt i zwraca szacowany rozmiar dziennika
+    def update_animals(self, records, meta):
+        return self.schedule("animals", records, meta)
+
+    # Planuje zapis zmienionych lub usuniętych (None) rekordów adopcji i zwraca szacowany rozmiar dziennika
+    def update_adoptions(self, records, next_adoption_id):
+        return self.schedule("adoptions", records, next_adoption_id)
+
+    # Dodaje zmianę do oczekujących, nadpisując wcześniejsze zmiany tych samych rekordów, i budzi wątek zapisu
+    def schedule(self, table, records=None, meta=None, snapshot=None):
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Magazyn danych został zamknięty")
+            pending = self.pending[table]
+            if snapshot is not None:
+                pending["snapshot"] = snapshot
+                pending["updates"] = {}
+                self.entries[table] = 0
+            else:
+                pending["updates"].update(records)
+                pending["meta"] = meta
+                if self.counts_entries:
+                    self.entries[table] += len(records)
+            self.dirty = True
+            self.condition.notify_all()
+            return self.entries[table]
+
+    # Pętla wątku zapisu: czeka na zmiany, odczekuje chwilę na kolejne i zapisuje je razem
+    def run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.dirty or self.closed)
+                if not self.dirty:
+                    return
+                self.condition.wait_for(lambda: self.closed, timeout=self.delay)
+                pending, self.pending = self.pending, self.empty_pending()
+                self.dirty = False
+                self.writing = True
+            try:
+                with self.storage.group():
+                    self.write("animals", pending["animals"], self.storage.save_animals, self.storage.update_animals, "Błąd zapisu zwierząt")
+                    self.write("adoptions", pending["adoptions"], self.storage.save_adoptions, self.storage.update_adoptions, "Błąd zapisu adopcji")
+            except Exception as e:
+                self.report(f"Błąd zapisu: {e}")
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+
+    # Zapisuje migawkę i zmiany jednej tabeli, zgłaszając błąd zamiast przerywać wątek
+    def write(self, table, pending, save, update, error_message):
+        try:
+            if pending["snapshot"] is not None:
+                save(*pending["snapshot"])
+            if pending["updates"]:
+                update(pending["updates"], pending["meta"])
+        except Exception as e:
+            self.report(f"{error_message}: {e}")
+
+    # Przekazuje komunikat o błędzie do funkcji on_error lub go wypisuje
+    def report(self, message):
+        if self.on_error:
+            self.on_error(message)
+        else:
+            print(message)
+
+    # Zwraca pusty kontekst grupowania; każda partia wątku zapisu jest już jedną grupą
+    def group(self):
+        return nullcontext()
+
+    # Czeka, aż wszystkie oczekujące zmiany zostaną zapisane
+    def flush(self):
+        with self.condition:
+            self.condition.wait_for(lambda: not (self.dirty or self.writing) or not self.thread.is_alive())
+
+    # Zapisuje oczekujące zmiany, kończy wątek zapisu i zamyka magazyn docelowy
+    def close(self):
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+        atexit.unregister(self.close)
+        if hasattr(self.storage, "close"):
+            self.storage.close()
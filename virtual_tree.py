@@ -0,0 +1,148 @@
+from tkinter import ttk
+
+# Wirtualna lista dla ttk.Treeview: przechowuje tylko kolejność kluczy,
+# a w drzewie tworzy wiersze wyłącznie dla widocznego fragmentu listy
+class VirtualTreeview:
+    # Inicjalizacja listy z drzewem, paskiem przewijania i funkcją zwracającą wartości wiersza
+    def __init__(self, tree, scrollbar, get_values, buffer=5):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.get_values = get_values
+        self.buffer = buffer
+        self.keys = []
+        self.positions = None
+        self.first = 0
+        self.window = []
+        self.selected_key = None
+        self.tree.configure(selectmode="browse", yscrollcommand="")
+        self.scrollbar.configure(command=self.yview)
+        self.tree.bind("<Configure>", lambda event: self.render())
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-3 if event.delta > 0 else 3, "units"))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3, "units"))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3, "units"))
+        self.tree.bind("<Up>", lambda event: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self.move_selection(-self.visible_rows()))
+        self.tree.bind("<Next>", lambda event: self.move_selection(self.visible_rows()))
+        self.tree.bind("<Home>", lambda event: self.move_selection(-len(self.keys)))
+        self.tree.bind("<End>", lambda event: self.move_selection(len(self.keys)))
+
+    # Ustawia nową kolejność kluczy i odświeża widoczny fragment
+    def set_keys(self, keys):
+        self.keys = list(keys)
+        self.positions = None
+        if self.selected_key is not None and self.index(self.selected_key) is None:
+            self.selected_key = None
+        self.render()
+
+    # Zwraca pozycję klucza na liście lub None, gdy go nie ma
+    def index(self, key):
+        if self.positions is None:
+            self.positions = {k: i for i, k in enumerate(self.keys)}
+        return self.positions.get(key)
+
+    # Zwraca pozycję klucza, sprawdzając najpierw wyświetlany fragment listy
+    def locate(self, key):
+        if key in self.window:
+            return self.first + self.window.index(key)
+        return self.index(key)
+
+    # Aktualizuje pojedynczy klucz: odświeża jego wiersz, a gdy zmieniła się kolejność, przenosi go
+    # na właściwą pozycję; before(a, b) zwraca True, gdy klucz a powinien być przed kluczem b
+    def update_key(self, key, before):
+        position = self.locate(key)
+        if position is not None:
+            keys = self.keys
+            if (position == 0 or before(keys[position - 1], key)) and (position == len(keys) - 1 or before(key, keys[position + 1])):
+                if key in self.window:
+                    self.tree.item(key, values=self.get_values(key))
+                return
+            del keys[position]
+        low, high = 0, len(self.keys)
+        while low < high:
+            middle = (low + high) // 2
+            if before(self.keys[middle], key):
+                low = middle + 1
+            else:
+                high = middle
+        self.keys.insert(low, key)
+        self.positions = None
+        self.render()
+
+    # Usuwa pojedynczy klucz z listy
+    def remove_key(self, key):
+        position = self.locate(key)
+        if position is None:
+            return
+        del self.keys[position]
+        self.positions = None
+        if self.selected_key == key:
+            self.selected_key = None
+        self.render()
+
+    # Zwraca liczbę wierszy mieszczących się w widocznej części drzewa
+    def visible_rows(self):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        return max(int(self.tree.cget("height")), self.tree.winfo_height() // row_height - 1, 1)
+
+    # Tworzy w drzewie wiersze dla widocznego fragmentu listy i ustawia pasek przewijania
+    def render(self):
+        visible = self.visible_rows()
+        self.first = max(0, min(self.first, len(self.keys) - visible))
+        window = self.window = self.keys[self.first:self.first + visible + self.buffer]
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        for key in window:
+            self.tree.insert("", "end", iid=key, values=self.get_values(key))
+        if self.selected_key in window:
+            self.tree.selection_set(self.selected_key)
+            self.tree.focus(self.selected_key)
+        self.tree.yview_moveto(0)
+        total = len(self.keys)
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # Obsługuje polecenia paska przewijania ("moveto" i "scroll")
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.keys))
+            self.render()
+        elif args[0] == "scroll":
+            self.scroll(int(args[1]), args[2])
+
+    # Przewija listę o podaną liczbę wierszy lub stron
+    def scroll(self, amount, unit):
+        self.first += amount * self.visible_rows() if unit == "pages" else amount
+        self.render()
+        return "break"
+
+    # Zapamiętuje zaznaczony klucz, także gdy wiersz zostanie przewinięty poza widok
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            self.selected_key = selection[0]
+        elif self.selected_key in self.tree.get_children():
+            self.selected_key = None
+
+    # Przesuwa zaznaczenie o podaną liczbę wierszy, przewijając listę w razie potrzeby
+    def move_selection(self, offset):
+        if not self.keys:
+            return "break"
+        current = self.index(self.selected_key) if self.selected_key is not None else None
+        position = max(0, min(len(self.keys) - 1, (self.first if current is None else current + offset)))
+        self.selected_key = self.keys[position]
+        visible = self.visible_rows()
+        if position < self.first:
+            self.first = position
+        elif position >= self.first + visible:
+            self.first = position - visible + 1
+        self.render()
+        return "break"
+
+    # Zwraca zaznaczony klucz w postaci zgodnej z Treeview.selection()
+    def selection(self):
+        return (self.selected_key,) if self.selected_key is not None else ()